@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк истории оценок жизненных областей и трендов для /status
+
+Заполняет AssessmentHistory ежедневными оценками всех областей за N лет,
+замеряет запись, загрузку с диска, тренды (среднее за неделю и месяц,
+минимум/максимум, изменение к прошлой неделе) и скользящее среднее по всей
+истории. Результаты сверяются с наивным подсчетом по списку кортежей.
+Затем проверяет обрезку колонок после оборванной записи и заполнение
+истории из существующего current.md в MemoryService, в том числе при
+параллельных трендах и сохранении.
+
+Запуск: python benchmarks/bench_assessment_trends.py [лет]
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services.assessment_history import DAY, MONTH, WEEK, AssessmentHistory
+from bot.services.memory_service import MemoryService
+
+AREAS = ["Здоровье", "Карьера", "Отношения", "Финансы", "Личностный рост",
+         "Отдых", "Окружение", "Духовность"]
+TREND_QUERIES = 1000
+
+
+def generate(years: int, now: int) -> list:
+    rng = random.Random(42)
+    start = now - years * 365 * DAY
+    points = []
+    for area in AREAS:
+        score = 5
+        for day in range(years * 365):
+            score = min(10, max(1, score + rng.choice((-1, 0, 0, 1))))
+            points.append((area, start + day * DAY + rng.randrange(12 * 3600), score))
+    return points
+
+
+def naive_mean(points: list, start: int, end: int):
+    window = [score for ts, score in points if start < ts <= end]
+    return sum(window) / len(window) if window else None
+
+
+def naive_trend(points: list, now: int) -> tuple:
+    week = naive_mean(points, now - WEEK, now)
+    previous = naive_mean(points, now - 2 * WEEK, now - WEEK)
+    month = [score for ts, score in points if now - MONTH < ts <= now]
+    return (week, naive_mean(points, now - MONTH, now), min(month), max(month),
+            week - previous if week is not None and previous is not None else None)
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, result
+
+
+async def memory_service_checks(workdir: str) -> None:
+    service = MemoryService(os.path.join(workdir, "memory"))
+    with open(service.assessment_path, "w", encoding="utf-8") as f:
+        f.write("- Здоровье: 6/10 (2024-01-01 10:00)\n- Карьера: 8/10 (2024-01-02 11:00)")
+    await service.save_life_area_score("Здоровье", 9)
+    trends = {trend.area: trend for trend in await service.get_life_area_trends()}
+    assert trends["Здоровье"].count == 2 and trends["Здоровье"].last == 9
+    assert trends["Карьера"].count == 1 and trends["Карьера"].last == 8
+
+    # После перезапуска история читается с диска, current.md повторно не импортируется
+    restarted = MemoryService(os.path.join(workdir, "memory"))
+    await restarted.save_life_area_score("Карьера", 7)
+    trends = {trend.area: trend for trend in await restarted.get_life_area_trends()}
+    assert trends["Здоровье"].count == 2 and trends["Карьера"].count == 2
+    print("MemoryService: импорт current.md в пустую историю и запись каждой оценки: OK")
+
+    # Тренды и сохранение одновременно на пустой истории: current.md импортируется один раз
+    racing = MemoryService(os.path.join(workdir, "racing"))
+    with open(racing.assessment_path, "w", encoding="utf-8") as f:
+        f.write("- Здоровье: 6/10 (2024-01-01 10:00)\n- Карьера: 8/10 (2024-01-02 11:00)")
+    await asyncio.gather(racing.get_life_area_trends(), racing.save_life_area_score("Отдых", 5))
+    trends = {trend.area: trend for trend in await racing.get_life_area_trends()}
+    assert {area: trend.count for area, trend in trends.items()} == {"Здоровье": 1, "Карьера": 1, "Отдых": 1}
+    print("Параллельные тренды и сохранение не дублируют импорт current.md: OK")
+
+
+def main():
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    logging.disable(logging.CRITICAL)
+    now = int(datetime(2025, 1, 1).timestamp())
+    points = generate(years, now)
+    by_area = {area: [(ts, score) for a, ts, score in points if a == area] for area in AREAS}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        directory = os.path.join(workdir, "history")
+        history = AssessmentHistory(directory).load()
+        write, _ = timed(lambda: [history.append(*point) for point in points])
+
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        jsonl = sum(len(json.dumps({"area": a, "ts": ts, "score": s}, ensure_ascii=False)) + 1
+                    for a, ts, s in points)
+        load, history = timed(lambda: AssessmentHistory(directory).load())
+
+        print(f"{years} лет ежедневных оценок, {len(AREAS)} областей: {len(points)} точек")
+        print(f"Запись: {write:.2f} с ({write / len(points) * 1e6:.0f} мкс на оценку), "
+              f"на диске {size / 1024:.0f} КБ (JSONL: {jsonl / 1024:.0f} КБ)")
+        print(f"Загрузка с диска: {load * 1000:.1f} мс")
+
+        # Тренды всех областей в случайные моменты истории
+        rng = random.Random(1)
+        moments = [now - rng.randrange(years * 365 - 30) * DAY for _ in range(TREND_QUERIES)]
+        columnar, results = timed(lambda: [history.trends(moment) for moment in moments])
+        naive_points = min(TREND_QUERIES, 20)
+        naive, expected = timed(lambda: [
+            [naive_trend(by_area[area], moment) for area in AREAS] for moment in moments[:naive_points]
+        ])
+        for trends, expected_trends in zip(results, expected):
+            for trend, (week, month, low, high, delta) in zip(trends, expected_trends):
+                assert abs(trend.week_mean - week) < 1e-9 and abs(trend.month_mean - month) < 1e-9
+                assert (trend.month_min, trend.month_max) == (low, high)
+                assert (trend.week_delta is None) == (delta is None)
+                assert delta is None or abs(trend.week_delta - delta) < 1e-9
+        print(f"Тренды всех областей: {columnar / TREND_QUERIES * 1000:.3f} мс на запрос "
+              f"(наивно по списку: {naive / naive_points * 1000:.1f} мс)")
+
+        # Скользящее среднее за 7 дней по всей истории одной области
+        series = history.series(AREAS[0])
+        start = now - years * 365 * DAY
+        rolling, curve = timed(lambda: series.rolling_mean(WEEK, DAY, start, now))
+        for point, value in curve[::97]:
+            expected_value = naive_mean(by_area[AREAS[0]], point - WEEK, point)
+            assert (value is None and expected_value is None) or abs(value - expected_value) < 1e-9
+        print(f"Скользящее среднее за неделю, {len(curve)} точек: {rolling * 1000:.1f} мс")
+
+        # Оборванная запись: лишние байты в колонке времени отбрасываются
+        with open(os.path.join(directory, "0.ts"), "ab") as f:
+            f.write(b"\x01\x02\x03")
+        with open(os.path.join(directory, "0.ts"), "ab") as f:
+            f.write(b"\x00" * 8)
+        reloaded = AssessmentHistory(directory).load()
+        assert len(reloaded.series(AREAS[0])) == len(by_area[AREAS[0]])
+        print("Неполная запись обрезается при загрузке: OK")
+
+        asyncio.run(memory_service_checks(workdir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк: детали сообщений Gmail по одному и batch-запросами
+
+Сравнивает последовательные messages.get (старое поведение
+get_recent_messages) с get_messages_details на 10/50/100 сообщениях против
+локальной заглушки с искусственной задержкой.
+
+Запуск: python benchmarks/bench_gmail_batch.py [задержка_мс]
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services.gmail_service import GmailService
+from benchmarks.fake_gmail import FakeGmail
+
+
+async def main():
+    latency = (float(sys.argv[1]) if len(sys.argv) > 1 else 20.0) / 1000
+    logging.disable(logging.INFO)
+
+    fake = FakeGmail(message_count=200, latency=latency)
+    await fake.start()
+    gmail = GmailService(cache_path=None, quota_units_per_second=0)
+    fake.connect(gmail)
+
+    print(f"Задержка сервера: {latency * 1000:.0f} мс на запрос")
+    print(f"{'писем':>6} {'по одному, с':>13} {'batch, с':>9} {'HTTP-запросов':>14}")
+    try:
+        for count in (10, 50, 100):
+            ids = fake.order[:count]
+
+            started = time.perf_counter()
+            serial = [await gmail.get_message_details(message_id) for message_id in ids]
+            serial_time = time.perf_counter() - started
+
+            requests_before = fake.request_count
+            started = time.perf_counter()
+            batched = await gmail.get_messages_details(ids)
+            batch_time = time.perf_counter() - started
+            batch_requests = fake.request_count - requests_before
+
+            assert batched == serial
+            print(f"{count:>6} {serial_time:>13.3f} {batch_time:>9.3f} {count:>6} -> {batch_requests}")
+    finally:
+        gmail.close()
+        await fake.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
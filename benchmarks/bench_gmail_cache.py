@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк: "последние сообщения" с локальным кэшем метаданных и history.list
+
+Сравнивает повторные get_recent_messages без кэша (каждый раз messages.list и
+batch по всем id) и с кэшем (history.list и batch только по новым письмам),
+пока в ящик приходят новые письма. Заодно проверяет вытеснение LRU и
+восстановление после устаревшего historyId.
+
+Запуск: python benchmarks/bench_gmail_cache.py [задержка_мс]
+"""
+
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services.gmail_service import GmailService
+from benchmarks.fake_gmail import FakeGmail
+
+ROUNDS = 20
+RECENT = 50
+
+
+async def run(fake: FakeGmail, gmail: GmailService) -> tuple:
+    """ROUNDS запросов последних писем, между ними приходит по 2 новых письма"""
+    requests_before, gets_before = fake.request_count, fake.get_count
+    started = time.perf_counter()
+    for i in range(ROUNDS):
+        messages = await gmail.get_recent_messages(RECENT)
+        assert [m['id'] for m in messages] == fake.order[:RECENT]
+        fake.add_message(f"Новое {i}a")
+        fake.add_message(f"Новое {i}b")
+    return time.perf_counter() - started, fake.request_count - requests_before, fake.get_count - gets_before
+
+
+async def main():
+    latency = (float(sys.argv[1]) if len(sys.argv) > 1 else 20.0) / 1000
+    logging.disable(logging.INFO)
+
+    fake = FakeGmail(message_count=500, latency=latency)
+    await fake.start()
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = GmailService(cache_path=None, quota_units_per_second=0)
+        cached = GmailService(cache_path=str(Path(tmp) / "metadata.db"), cache_size=200,
+                              quota_units_per_second=0)
+        fake.connect(plain)
+        fake.connect(cached)
+        try:
+            print(f"Задержка сервера: {latency * 1000:.0f} мс; {ROUNDS} запросов по {RECENT} писем")
+            print(f"{'режим':>10} {'время, с':>9} {'HTTP':>6} {'messages.get':>13}")
+            for name, gmail in (("без кэша", plain), ("кэш", cached)):
+                elapsed, requests, gets = await run(fake, gmail)
+                print(f"{name:>10} {elapsed:>9.3f} {requests:>6} {gets:>13}")
+
+            stats = cached.get_cache_stats()
+            print(f"Кэш: {stats['hits']} попаданий, {stats['misses']} промахов "
+                  f"(hit rate {stats['hit_rate']:.0%}), записей {stats['entries']}")
+
+            await cached.get_messages_details(fake.order[:400])
+            assert cached.get_cache_stats()["entries"] <= 200, "LRU не ограничил размер кэша"
+
+            fake.expire_history()
+            fake.add_message("После сброса истории")
+            messages = await cached.get_recent_messages(RECENT)
+            assert [m['id'] for m in messages] == fake.order[:RECENT]
+            print("Вытеснение LRU и полное обновление после устаревшего historyId: OK")
+        finally:
+            plain.close()
+            cached.close()
+            await fake.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк: холодный старт GmailService.connect()
+
+"до" повторяет прежний connect(): чтение token.json и build('gmail', 'v1'),
+"после" — текущий connect() с закэшированным discovery-документом и
+учетными данными в памяти. Холодный старт меряется в отдельном процессе
+(первый connect после импорта), повторные подключения — в том же процессе.
+Токен — фиктивный token.json с неистекшим сроком, сеть не используется.
+
+Запуск: python benchmarks/bench_gmail_connect.py [повторов]
+"""
+
+import asyncio
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services import gmail_service
+from bot.services.gmail_service import GmailService, SCOPES
+
+
+def write_token(path: Path) -> None:
+    expiry = datetime.utcnow() + timedelta(hours=1)
+    path.write_text(json.dumps({
+        "token": "fake-access-token",
+        "refresh_token": "fake-refresh-token",
+        "client_id": "fake-client-id",
+        "client_secret": "fake-client-secret",
+        "scopes": SCOPES,
+        "expiry": expiry.strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }))
+
+
+async def connect_before(gmail: GmailService) -> None:
+    gmail.creds = await gmail._run_blocking(gmail._authorize)
+    gmail.service = await gmail._run_blocking(
+        gmail_service.build, 'gmail', 'v1', credentials=gmail.creds
+    )
+
+
+async def connect_after(gmail: GmailService) -> None:
+    await gmail.connect()
+
+
+async def child(mode: str, repeats: int) -> None:
+    """Замеры внутри свежего процесса: первый connect и последующие"""
+    logging.disable(logging.INFO)
+    connect = connect_before if mode == "before" else connect_after
+    gmail = GmailService(cache_path=None)
+    timings = []
+    for _ in range(repeats + 1):
+        started = time.perf_counter()
+        await connect(gmail)
+        timings.append(time.perf_counter() - started)
+    gmail.close()
+    print(json.dumps({"cold": timings[0], "warm": sum(timings[1:]) / repeats}))
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        gmail_service.TOKEN_PATH = sys.argv[4]
+        asyncio.run(child(sys.argv[2], int(sys.argv[3])))
+        return
+
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    processes = 5
+    with tempfile.TemporaryDirectory() as tmp:
+        token_path = Path(tmp) / "token.json"
+        write_token(token_path)
+
+        print(f"{'режим':>8} {'холодный, мс':>13} {'повторный, мс':>14}")
+        for mode, title in (("before", "до"), ("after", "после")):
+            runs = [
+                json.loads(subprocess.run(
+                    [sys.executable, __file__, "--child", mode, str(repeats), str(token_path)],
+                    capture_output=True, text=True, check=True,
+                ).stdout)
+                for _ in range(processes)
+            ]
+            cold = min(run["cold"] for run in runs) * 1000
+            warm = min(run["warm"] for run in runs) * 1000
+            print(f"{title:>8} {cold:>13.2f} {warm:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
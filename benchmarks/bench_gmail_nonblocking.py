@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Проверка: медленный Gmail не блокирует цикл событий
+
+Подменяет googleapiclient медленной заглушкой (каждый execute() спит) и
+параллельно обслуживает "обновления" — короткие корутины каждые 10 мс.
+Если вызовы Gmail блокируют цикл, обработанных обновлений почти не будет.
+
+Запуск: python benchmarks/bench_gmail_nonblocking.py [задержка_с]
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services.gmail_service import GmailService
+
+
+class SlowRequest:
+    def __init__(self, delay: float, result: dict):
+        self.delay = delay
+        self.result = result
+
+    def execute(self, http=None):
+        time.sleep(self.delay)
+        return self.result
+
+
+class SlowMessages:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def list(self, **kwargs):
+        return SlowRequest(self.delay, {"messages": [{"id": "m1"}, {"id": "m2"}]})
+
+    def get(self, **kwargs):
+        headers = [{"name": "Subject", "value": "Тест"}, {"name": "From", "value": "a@b.c"}]
+        return SlowRequest(self.delay, {"id": kwargs["id"], "payload": {"headers": headers}})
+
+
+class SlowGmailBackend:
+    def __init__(self, delay: float):
+        self._messages = SlowMessages(delay)
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self._messages
+
+
+async def serve_updates(stop: asyncio.Event) -> int:
+    """Имитация обработки обновлений Telegram"""
+    served = 0
+    while not stop.is_set():
+        await asyncio.sleep(0.01)
+        served += 1
+    return served
+
+
+async def main():
+    delay = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    logging.disable(logging.INFO)
+
+    gmail = GmailService(cache_path=None)
+    gmail.service = SlowGmailBackend(delay)
+
+    stop = asyncio.Event()
+    updates = asyncio.create_task(serve_updates(stop))
+    started = time.perf_counter()
+    listed = await gmail.list_messages(2)
+    messages = [await gmail.get_message_details(message['id']) for message in listed]
+    elapsed = time.perf_counter() - started
+    stop.set()
+    served = await updates
+    gmail.close()
+
+    expected = int(elapsed / 0.01)
+    print(f"Gmail: {len(messages)} сообщений за {elapsed:.2f} с (3 вызова по {delay} с)")
+    print(f"Обновлений обработано параллельно: {served} (максимум ~{expected})")
+    assert served > expected * 0.5, "цикл событий был заблокирован вызовами Gmail"
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк: потоковый поиск Gmail против сбора всей выдачи списком
+
+Для большой выдачи сравнивает search_messages (весь список сразу) и
+iter_search_messages (страницы с опережающей загрузкой): время до первого
+результата, общее время при медленном потребителе (отправка страницы в
+Telegram) и пиковую память Python по tracemalloc.
+
+Запуск: python benchmarks/bench_gmail_search.py [писем] [задержка_мс]
+"""
+
+import asyncio
+import logging
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services.gmail_service import GMAIL_BATCH_SIZE, GmailService
+from benchmarks.fake_gmail import FakeGmail
+
+CONSUMER_DELAY = 0.03  # обработка одной страницы результатов
+
+
+async def consume_list(gmail: GmailService, count: int, keep: bool = True) -> tuple:
+    started = time.perf_counter()
+    messages = await gmail.search_messages("in:inbox", max_results=count)
+    first = time.perf_counter() - started
+    ids = []
+    for offset in range(0, len(messages), GMAIL_BATCH_SIZE):
+        await asyncio.sleep(CONSUMER_DELAY)
+        if keep:
+            ids.extend(m['id'] for m in messages[offset:offset + GMAIL_BATCH_SIZE])
+    return first, time.perf_counter() - started, ids
+
+
+async def consume_stream(gmail: GmailService, count: int, keep: bool = True) -> tuple:
+    started = time.perf_counter()
+    first = None
+    ids = []
+    seen = 0
+    async for message in gmail.iter_search_messages("in:inbox", max_results=count):
+        if first is None:
+            first = time.perf_counter() - started
+        if keep:
+            ids.append(message['id'])
+        seen += 1
+        if seen % GMAIL_BATCH_SIZE == 0:
+            await asyncio.sleep(CONSUMER_DELAY)
+    return first, time.perf_counter() - started, ids
+
+
+async def measure(consumer, gmail: GmailService, count: int) -> tuple:
+    """Время без трассировки, затем отдельный прогон (без сбора id) для пика памяти"""
+    first, total, ids = await consumer(gmail, count)
+    tracemalloc.start()
+    await consumer(gmail, count, keep=False)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first, total, ids, peak
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 20.0) / 1000
+    logging.disable(logging.INFO)
+
+    fake = FakeGmail(message_count=count, latency=latency)
+    await fake.start()
+    gmail = GmailService(cache_path=None, quota_units_per_second=0)
+    fake.connect(gmail)
+
+    print(f"Писем: {count}, задержка сервера {latency * 1000:.0f} мс, "
+          f"обработка страницы {CONSUMER_DELAY * 1000:.0f} мс")
+    print(f"{'режим':>8} {'первый, с':>10} {'всего, с':>9} {'пик памяти, КБ':>15}")
+    try:
+        results = {}
+        for name, consumer in (("список", consume_list), ("поток", consume_stream)):
+            first, total, ids, peak = await measure(consumer, gmail, count)
+            results[name] = ids
+            print(f"{name:>8} {first:>10.3f} {total:>9.3f} {peak / 1024:>15.0f}")
+        assert results["список"] == results["поток"] == fake.order[:count]
+
+        # Ранний выход из генератора не оставляет висящих запросов
+        stream = gmail.iter_search_messages("in:inbox")
+        try:
+            async for _ in stream:
+                break
+        finally:
+            await stream.aclose()
+        await asyncio.sleep(latency * 4)
+    finally:
+        gmail.close()
+        await fake.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк и сверка индекса серий привычек на синтетическом многолетнем журнале
+
+Строит журнал из нескольких привычек за N лет (с пропусками и отметками в
+прошлое), сверяет HabitStreakIndex с наивным подсчетом по множеству дней и
+замеряет время запросов.
+
+Запуск: python benchmarks/bench_habit_streaks.py [лет]
+"""
+
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services.habit_streaks import HabitStreakIndex
+
+HABITS = {"exercise": 0.8, "reading": 0.5, "meditation": 0.95, "vitamins": 0.3}
+QUERIES = 10_000
+
+
+def generate(years: int, today: date) -> list:
+    rng = random.Random(42)
+    start = today - timedelta(days=365 * years)
+    events = []
+    for offset in range((today - start).days + 1):
+        day = start + timedelta(days=offset)
+        for habit, probability in HABITS.items():
+            if rng.random() < probability:
+                # Иногда несколько отметок в день
+                events.extend([(habit, day)] * rng.choice((1, 1, 1, 2)))
+    # Немного отметок "задним числом" в конце журнала
+    events.extend((habit, start + timedelta(days=rng.randrange(365 * years))) for habit in HABITS)
+    return events
+
+
+def reference(days: set, today: date, start: date) -> tuple:
+    current = 0
+    cursor = today if today in days else today - timedelta(days=1)
+    while cursor in days:
+        current += 1
+        cursor -= timedelta(days=1)
+
+    longest = run = 0
+    previous = None
+    for day in sorted(days):
+        run = run + 1 if previous and day == previous + timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+
+    completed = sum(1 for day in days if start <= day <= today)
+    return current, longest, completed
+
+
+def main():
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    today = date(2025, 6, 30)
+    events = generate(years, today)
+
+    started = time.perf_counter()
+    index = HabitStreakIndex()
+    for habit, day in events:
+        index.add(habit, day)
+    build = time.perf_counter() - started
+    print(f"Событий: {len(events)} за {years} лет, построение индекса {build * 1000:.1f} мс")
+
+    rng = random.Random(7)
+    for habit in HABITS:
+        days = {day for name, day in events if name == habit}
+        window_start = today - timedelta(days=rng.randrange(1, 365 * years))
+        expected = reference(days, today, window_start)
+        actual = (
+            index.current_streak(habit, today),
+            index.longest_streak(habit),
+            index.completed_days(habit, window_start, today),
+        )
+        assert actual == expected, (habit, actual, expected)
+
+    windows = [(today - timedelta(days=rng.randrange(1, 365 * years)), today) for _ in range(QUERIES)]
+    started = time.perf_counter()
+    for start, end in windows:
+        index.current_streak("exercise", end)
+        index.longest_streak("exercise")
+        index.completion_rate("exercise", start, end)
+    per_query = (time.perf_counter() - started) / QUERIES
+    print(f"Сверка с наивным подсчетом: OK; запрос (серия + рекорд + доля) {per_query * 1e6:.2f} мкс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Стресс-проверка сохранения оценок жизненных областей (assessments/current.md)
+
+Сотни одновременных save_life_area_score по нескольким областям плюс
+читатели, которые в это время перечитывают файл. Прежняя реализация
+(чтение, перезапись строк, запись с усечением open('w')) сравнивается с
+текущей (блокировка на файл, словарь область -> строка в памяти, атомарная
+запись через временный файл + fsync + rename).
+
+Проверяется: ни одно обновление не потеряно (у каждой области последняя
+отправленная оценка), читатели ни разу не видели пустой или неполный файл,
+заголовок файла сохранен, временных файлов не осталось.
+
+Запуск: python benchmarks/bench_life_area_scores.py [обновлений] [областей]
+"""
+
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services.memory_service import LifeAreaSnapshot, MemoryService
+
+HEADER = "# Текущие оценки"
+
+
+async def legacy_save_life_area_score(service: MemoryService, area: str, score: int,
+                                      notes: Optional[str] = None) -> None:
+    """Прежняя реализация save_life_area_score"""
+    assessment_path = os.path.join(service.assessments_path, "current.md")
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+
+    lines = []
+    if os.path.exists(assessment_path):
+        async with aiofiles.open(assessment_path, 'r', encoding='utf-8') as f:
+            lines = (await f.read()).split('\n')
+
+    area_updated = False
+    new_lines = []
+    for line in lines:
+        if line.strip().startswith(f'- {area}:'):
+            new_line = f"- {area}: {score}/10 ({timestamp})"
+            if notes:
+                new_line += f" - {notes}"
+            new_lines.append(new_line)
+            area_updated = True
+        else:
+            new_lines.append(line)
+
+    if not area_updated:
+        new_line = f"- {area}: {score}/10 ({timestamp})"
+        if notes:
+            new_line += f" - {notes}"
+        new_lines.append(new_line)
+
+    async with aiofiles.open(assessment_path, 'w', encoding='utf-8') as f:
+        await f.write('\n'.join(new_lines))
+
+
+async def reader(path: str, stop: asyncio.Event, seen_areas: int) -> int:
+    """Перечитывать файл во время записи, вернуть число "порванных" чтений"""
+    torn = 0
+    while not stop.is_set():
+        async with aiofiles.open(path, 'r', encoding='utf-8') as f:
+            content = await f.read()
+        snapshot = LifeAreaSnapshot.parse(content)
+        if not content.startswith(HEADER) or len(snapshot.scores) < seen_areas:
+            torn += 1
+        await asyncio.sleep(0)
+    return torn
+
+
+async def run(name: str, save, updates: int, areas: int) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        service = MemoryService(workdir)
+        path = os.path.join(service.assessments_path, "current.md")
+        names = [f"Область {i}" for i in range(areas)]
+        # Исходный файл: заголовок и все области, чтобы читатели могли проверять полноту
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("\n".join([HEADER, ""] + [f"- {area}: 5/10 (2024-01-01 00:00)" for area in names]))
+
+        rng = random.Random(7)
+        plan = [(names[i % areas], rng.randint(1, 10)) for i in range(updates)]
+        expected = {area: score for area, score in plan}
+
+        stop = asyncio.Event()
+        readers = [asyncio.create_task(reader(path, stop, areas)) for _ in range(4)]
+        started = time.perf_counter()
+        results = await asyncio.gather(*(save(service, area, score) for area, score in plan),
+                                       return_exceptions=True)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        torn = sum(await asyncio.gather(*readers))
+
+        errors = sum(isinstance(result, Exception) for result in results)
+        with open(path, encoding='utf-8') as f:
+            content = f.read()
+        final = LifeAreaSnapshot.parse(content).scores
+        lost = sum(final.get(area) != score for area, score in expected.items())
+        leftovers = [name for name in os.listdir(service.assessments_path) if name.endswith(".tmp")]
+
+        print(f"{name:>8} {elapsed:>8.2f} {errors:>7} {lost:>9} {torn:>9} "
+              f"{'да' if content.startswith(HEADER) else 'нет':>10}")
+        if name == "текущая":
+            assert errors == 0 and lost == 0 and torn == 0, "потерянные обновления или порванный файл"
+            assert content.startswith(HEADER) and not leftovers
+            assert await MemoryService(workdir).get_life_area_scores() == expected
+
+
+async def main():
+    updates = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    areas = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    logging.disable(logging.CRITICAL)
+
+    print(f"{updates} одновременных обновлений по {areas} областям, 4 читателя")
+    print(f"{'версия':>8} {'время, с':>8} {'ошибок':>7} {'потеряно':>9} {'порвано':>9} {'заголовок':>10}")
+    await run("прежняя", legacy_save_life_area_score, updates, areas)
+    await run("текущая", MemoryService.save_life_area_score, updates, areas)
+    print("Потерянных обновлений и порванных чтений нет: OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк: просмотр оценок жизненных областей (/status, /assess, "показать оценки")
+
+Сравнивает прежний путь (каждый просмотр читает current.md и разбирает его
+через split(':')) с общим LifeAreaSnapshot в MemoryService, который
+проверяется по mtime. Затем проверяет, что save_life_area_score обновляет
+снимок на месте (без перечитывания файла), а правка файла вручную
+подхватывается при следующем просмотре.
+
+Запуск: python benchmarks/bench_life_area_views.py [просмотров] [областей]
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+import aiofiles
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services import memory_service as memory_module
+from bot.services.memory_service import MemoryService
+
+
+async def legacy_get_life_area_scores(service: MemoryService) -> Dict[str, int]:
+    """Прежняя реализация get_life_area_scores"""
+    assessment_path = os.path.join(service.assessments_path, "current.md")
+    if not os.path.exists(assessment_path):
+        return {}
+
+    areas = {}
+    async with aiofiles.open(assessment_path, 'r', encoding='utf-8') as f:
+        content = await f.read()
+
+    for line in content.split('\n'):
+        if line.strip().startswith('- ') and ':' in line:
+            parts = line.replace('- ', '').split(':')
+            if len(parts) >= 2:
+                area_name = parts[0].strip()
+                score_part = parts[1].strip()
+                if '/' in score_part:
+                    areas[area_name] = int(score_part.split('/')[0])
+    return areas
+
+
+async def timed(views: int, func) -> float:
+    started = time.perf_counter()
+    for _ in range(views):
+        await func()
+    return (time.perf_counter() - started) / views
+
+
+async def main():
+    views = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    areas = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        service = MemoryService(workdir)
+        for i in range(areas):
+            await service.save_life_area_score(f"Область {i}", i % 10 + 1, notes="заметка")
+        expected = await legacy_get_life_area_scores(service)
+        assert await service.get_life_area_scores() == expected
+
+        parses = 0
+        original_parse = memory_module.LifeAreaSnapshot.parse
+
+        def counting_parse(*args, **kwargs):
+            nonlocal parses
+            parses += 1
+            return original_parse(*args, **kwargs)
+
+        memory_module.LifeAreaSnapshot.parse = counting_parse
+        try:
+            legacy = await timed(views, lambda: legacy_get_life_area_scores(service))
+            cached = await timed(views, service.get_life_area_scores)
+            print(f"{views} просмотров, {areas} областей")
+            print(f"{'версия':>8} {'просмотр, мкс':>14} {'разборов файла':>15}")
+            print(f"{'прежняя':>8} {legacy * 1e6:>14.1f} {views:>15}")
+            print(f"{'снимок':>8} {cached * 1e6:>14.1f} {parses:>15}")
+
+            # Сохранение обновляет снимок на месте, файл не перечитывается
+            await service.save_life_area_score("Область 0", 3)
+            status = await service.get_life_areas_status()
+            assert {"name": "Область 0", "score": 3} in status and parses == 0
+            assert [area["name"] for area in status] == list(expected)
+            print("save_life_area_score обновляет снимок без перечитывания файла: OK")
+
+            # Правка вручную меняет mtime — следующий просмотр перечитывает файл
+            path = service.assessment_path
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write("\n- Хобби: 9/10 (2024-01-01 00:00)")
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            assert (await service.get_life_area_scores())["Хобби"] == 9 and parses == 1
+            print("Изменение current.md на диске подхватывается по mtime: OK")
+        finally:
+            memory_module.LifeAreaSnapshot.parse = original_parse
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
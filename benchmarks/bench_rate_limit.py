@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк: общий ограничитель частоты и повторы для Todoist и Gmail
+
+Всплеск одновременных create_task против заглушки Todoist с лимитом N
+запросов в секунду в трех режимах: без повторов (как раньше — действия
+пользователя теряются), только повторы по Retry-After и ведро токенов с
+повторами. Затем проверяет, что повтор после потерянного ответа не создает
+дубликат (X-Request-Id), и что Gmail дозапрашивает части batch-ответа с 429.
+
+Запуск: python benchmarks/bench_rate_limit.py [задач] [лимит_в_секунду]
+"""
+
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services.gmail_service import GmailService
+from bot.services.todoist_service import TodoistService
+from benchmarks.fake_gmail import FakeGmail
+from benchmarks.fake_todoist import FakeTodoist
+
+
+class BenchConfig:
+    """Минимальная конфигурация для TodoistService"""
+    todoist_api_token = "bench-token"
+
+    def __init__(self, rate: float, retries: int):
+        self.todoist_requests_per_second = rate
+        self.todoist_request_burst = max(rate, 1)
+        self.todoist_rate_limit_retries = retries
+
+
+async def burst(count: int, server_limit: int, rate: float, retries: int) -> dict:
+    fake = FakeTodoist(rate_limit=(server_limit, 1.0))
+    base_url = await fake.start()
+    service = TodoistService(BenchConfig(rate, retries))
+    service.base_url = base_url
+    service.limiter.base_delay = 0.05
+
+    async def create(i: int) -> bool:
+        try:
+            await service.create_task(f"Задача {i}")
+            return True
+        except Exception:
+            return False
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(create(i) for i in range(count)))
+    elapsed = time.perf_counter() - started
+    await service.close()
+    await fake.stop()
+    return {"ok": sum(results), "elapsed": elapsed, "server_429": fake.throttled_count,
+            "created": len(fake.tasks), **service.limiter.stats()}
+
+
+async def check_idempotency() -> None:
+    fake = FakeTodoist()
+    base_url = await fake.start()
+    service = TodoistService(BenchConfig(0, 3))
+    service.base_url = base_url
+    service.limiter.base_delay = 0.01
+    fake.fail_after_processing = 5
+    try:
+        for i in range(5):
+            await service.create_task(f"Задача {i}")
+        assert len(fake.tasks) == 5, f"дубликаты после повторов: {len(fake.tasks)}"
+        assert service.limiter.metrics.retried == 5
+        print("Todoist: повтор после потерянного ответа не создает дубликатов: OK")
+    finally:
+        await service.close()
+        await fake.stop()
+
+
+async def check_gmail_parts() -> None:
+    fake = FakeGmail(message_count=100)
+    await fake.start()
+    with tempfile.TemporaryDirectory() as tmp:
+        gmail = GmailService(cache_path=str(Path(tmp) / "metadata.db"))
+        fake.connect(gmail)
+        gmail.limiter.base_delay = 0.01
+        fake.throttle_parts = 30
+        try:
+            messages = await gmail.get_messages_details(fake.order)
+            assert len(messages) == 100, len(messages)
+            stats = gmail.limiter.stats()
+            print(f"Gmail: 100 писем, 30 частей batch с 429 дозапрошены повторно "
+                  f"(retried={stats['retried']}, failed={stats['failed']}): OK")
+        finally:
+            gmail.close()
+            await fake.stop()
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    server_limit = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    logging.disable(logging.CRITICAL)
+
+    print(f"{count} одновременных create_task, сервер пропускает {server_limit} запросов/сек")
+    print(f"{'режим':>16} {'успешно':>8} {'время, с':>9} {'429 от сервера':>15} "
+          f"{'в очереди':>10} {'повторов':>9}")
+    modes = (
+        ("без повторов", 0, 0),
+        ("Retry-After", 0, 10),
+        ("ведро+повторы", server_limit, 10),
+    )
+    for name, rate, retries in modes:
+        r = await burst(count, server_limit, rate, retries)
+        assert r["created"] == r["ok"]
+        print(f"{name:>16} {r['ok']:>8} {r['elapsed']:>9.2f} {r['server_429']:>15} "
+              f"{r['queued']:>10} {r['retried']:>9}")
+
+    await check_idempotency()
+    await check_gmail_parts()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
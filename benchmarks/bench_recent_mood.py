@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк: последние N записей настроения из многолетнего журнала
+
+Генерирует журнал на миллион строк (несколько записей в день за годы) и
+сравнивает старый способ (прочитать и разобрать весь mood.md) с
+get_recent_mood, который читает журнал событий с конца блоками. Затем
+проверяет восстановление после оборванной записи: недописанная строка
+журнала и неполная запись индекса отбрасываются до следующей записи.
+
+Запуск: python benchmarks/bench_recent_mood.py [строк]
+"""
+
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services.event_log import INDEX_RECORD
+from bot.services.memory_service import MemoryService
+
+
+def generate(memory: MemoryService, lines: int) -> None:
+    """Записать mood.md и журнал событий напрямую (быстрее, чем через save_mood)"""
+    start = datetime(2015, 1, 1)
+    step = timedelta(minutes=10)
+    log = memory.event_logs["mood"]
+    offset = 0
+
+    with open(memory.markdown_paths["mood"], "w", encoding="utf-8") as md, \
+            open(log.log_path, "wb") as jsonl, open(log.index_path, "wb") as index:
+        for i in range(lines):
+            ts = start + step * i
+            score = i % 10 + 1
+            md.write(f"- {score}/10 - {ts.strftime('%Y-%m-%d %H:%M')}\n")
+            line = (json.dumps({"ts": ts.isoformat(timespec="seconds"), "score": score}) + "\n").encode()
+            jsonl.write(line)
+            index.write(INDEX_RECORD.pack(int(ts.timestamp()), offset))
+            offset += len(line)
+
+
+def full_scan(path: str, days: int) -> list:
+    """Старая реализация: весь файл в память и разбор каждой строки
+
+    Префикс "- " срезается один раз: replace('- ', '') из старого кода удалял
+    и разделители " - ", из-за чего результат всегда был пустым.
+    """
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    moods = []
+    for line in content.split('\n'):
+        if line.strip().startswith('- ') and '/10' in line:
+            parts = line.strip()[2:].split(' - ')
+            if len(parts) >= 2:
+                moods.append({'score': int(parts[0].split('/')[0]), 'timestamp': parts[1]})
+    return moods[-days:]
+
+
+async def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        memory = MemoryService(workdir)
+        generate(memory, lines)
+        size_mb = Path(memory.markdown_paths["mood"]).stat().st_size / 1024 / 1024
+        print(f"Строк: {lines}, mood.md: {size_mb:.1f} МБ")
+
+        for days in (7, 30, 365):
+            started = time.perf_counter()
+            expected = full_scan(memory.markdown_paths["mood"], days)
+            scan = time.perf_counter() - started
+
+            started = time.perf_counter()
+            recent = await memory.get_recent_mood(days)
+            tail = time.perf_counter() - started
+
+            assert recent == expected
+            print(f"N={days:>4}: полное чтение {scan * 1000:8.1f} мс, чтение с конца {tail * 1000:7.2f} мс")
+
+        # Оборванная запись: хвост строки в журнале и половина записи индекса
+        log = memory.event_logs["mood"]
+        with open(log.log_path, "ab") as f:
+            f.write(b'{"ts": "2030-01-01T1')
+        with open(log.index_path, "ab") as f:
+            f.write(b"\x00" * (INDEX_RECORD.size // 2))
+        restarted = MemoryService(workdir)
+        recent = await restarted.get_recent_mood(3)
+        assert [mood["score"] for mood in recent] == [mood["score"] for mood in expected[-3:]]
+        await restarted.save_mood(7, "после сбоя")
+        events = await restarted.event_logs["mood"].read_all()
+        assert len(events) == lines + 1 == restarted.event_logs["mood"].count()
+        assert events[-1]["score"] == 7
+        print("Оборванная запись отбрасывается, следующая пишется с новой строки: OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк: накладные расходы обработчика на получение сервисов
+
+"До" — как раньше: Config(), MemoryService() и TodoistService() создаются
+на каждое обновление. "После" — сервисы берутся из контейнера в bot_data.
+
+Запуск: python benchmarks/bench_service_container.py [количество обновлений]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.config import Config
+from bot.services.container import ServiceContainer, SERVICES_KEY, get_services
+from bot.services.memory_service import MemoryService
+from bot.services.todoist_service import TodoistService
+
+
+def per_update_construction(count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        config = Config(telegram_token="", todoist_api_token="token")
+        MemoryService()
+        TodoistService(config)
+    return time.perf_counter() - started
+
+
+def container_lookup(count: int) -> float:
+    config = Config(telegram_token="", todoist_api_token="token")
+    context = SimpleNamespace(bot_data={SERVICES_KEY: ServiceContainer.from_config(config)})
+    started = time.perf_counter()
+    for _ in range(count):
+        services = get_services(context)
+        services.memory_service
+        services.todoist
+    return time.perf_counter() - started
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        before = per_update_construction(count)
+        after = container_lookup(count)
+
+    print(f"Обновлений: {count}")
+    print(f"до (создание на каждое обновление): {before / count * 1e6:8.2f} мкс/обновление")
+    print(f"после (контейнер в bot_data):       {after / count * 1e6:8.2f} мкс/обновление")
+
+
+if __name__ == "__main__":
+    main()
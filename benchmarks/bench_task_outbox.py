@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк и проверка outbox задач Todoist
+
+Сравнивает задержку ответа при захвате: прежний путь (create_task в
+обработчике) против enqueue в outbox, на заглушке Todoist с сетевой
+задержкой. Затем проверяет сценарии: Todoist недоступен во время захвата,
+перезапуск с неотправленными задачами; задачи создаются ровно один раз, а
+todoist_id попадает в хранилище задач памяти: в SQLite — записью из outbox
+(в отдельном потоке, одной на цикл отправки), в YAML — со следующим
+импортом, без перезаписи todoist.yml из outbox.
+
+Запуск: python benchmarks/bench_task_outbox.py [задержка_мс]
+"""
+
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services import task_outbox as outbox_module
+from bot.services.task_outbox import TaskOutbox
+from bot.services.todoist_service import TodoistService
+from benchmarks.fake_todoist import FakeTodoist
+
+CAPTURES = 50
+
+
+class BenchConfig:
+    """Минимальная конфигурация для TodoistService"""
+    todoist_api_token = "bench-token"
+    todoist_requests_per_second = 0
+    todoist_rate_limit_retries = 1
+
+    def __init__(self, backend: str, store: str):
+        self.todoist_backend = backend
+        self.task_store = store
+
+
+async def wait_drained(outbox: TaskOutbox, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while outbox.pending_count() and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    assert outbox.pending_count() == 0, "outbox не опустел"
+
+
+async def run(backend: str, store: str, latency: float) -> None:
+    fake = FakeTodoist(latency=latency)
+    base_url = await fake.start()
+    service = TodoistService(BenchConfig(backend, store))
+    service.base_url, service.sync_url = base_url, f"{base_url}/sync"
+    service.limiter.base_delay = 0.01
+    service.memory_path = Path("memory") / backend / store
+    outbox_path = service.memory_path / "outbox.db"
+    outbox = TaskOutbox(outbox_path, service)
+
+    try:
+        inline = []
+        for i in range(CAPTURES):
+            started = time.perf_counter()
+            await service.create_task(f"Прямо {i}")
+            inline.append(time.perf_counter() - started)
+
+        queued = []
+        requests_before = fake.request_count
+        for i in range(CAPTURES):
+            started = time.perf_counter()
+            outbox.enqueue(f"Outbox {i}")
+            queued.append(time.perf_counter() - started)
+            await asyncio.sleep(0)
+        await wait_drained(outbox)
+        drain_requests = fake.request_count - requests_before
+
+        print(f"{backend:>5} {store:>6} {statistics.median(inline) * 1000:>14.2f} "
+              f"{statistics.median(queued) * 1000:>13.3f} {CAPTURES:>5} -> {drain_requests}")
+
+        # Todoist недоступен: захват не падает, задачи дожидаются восстановления
+        fake.down = True
+        for i in range(5):
+            outbox.enqueue(f"Во время сбоя {i}")
+        await asyncio.sleep(0.3)
+        assert outbox.pending_count() == 5
+        fake.down = False
+        await outbox.drain_once()  # без ожидания отложенного повтора
+
+        # Перезапуск: неотправленные задачи остаются на диске
+        await outbox.close()
+        fake.down = True
+        outbox = TaskOutbox(outbox_path, service)
+        outbox.enqueue("До перезапуска")
+        await asyncio.sleep(0.2)
+        await outbox.close()
+        fake.down = False
+        outbox = TaskOutbox(outbox_path, service)
+        outbox.start()
+        await wait_drained(outbox)
+
+        await outbox.close()
+        contents = [task["content"] for task in fake.tasks.values()]
+        assert len(contents) == len(set(contents)) == CAPTURES * 2 + 6, "дубликаты или потери"
+        if not service.task_store.partial_writes:
+            assert not service.task_store.load()["tasks"], "outbox не должен переписывать YAML"
+            await service.import_from_todoist()
+        stored = service.task_store.load()["tasks"]
+        assert {task["content"] for task in stored} >= {c for c in contents if not c.startswith("Прямо")}
+        assert all(fake.tasks[task["todoist_id"]]["content"] == task["content"] for task in stored)
+    finally:
+        await outbox.close()
+        await service.close()
+        await fake.stop()
+
+
+async def main():
+    latency = (float(sys.argv[1]) if len(sys.argv) > 1 else 150.0) / 1000
+    logging.disable(logging.CRITICAL)
+    outbox_module.OUTBOX_RETRY_BASE = 0.05
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        print(f"Задержка Todoist: {latency * 1000:.0f} мс; медиана задержки захвата")
+        print(f"{'backend':>5} {'store':>6} {'create_task, мс':>14} {'enqueue, мс':>13} {'HTTP-запросов':>14}")
+        for backend in ("rest", "sync"):
+            for store in ("yaml", "sqlite"):
+                await run(backend, store, latency)
+    print("Сбой Todoist, перезапуск, отсутствие дубликатов и запись todoist_id: OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк: загрузка, сохранение и поиск задач в YAML и SQLite хранилищах
+
+Запуск: python benchmarks/bench_task_store.py [размеры...]
+По умолчанию 1000 10000 100000. YAML выше YAML_LIMIT задач пропускается:
+чистый Python-парсер PyYAML на таких объемах работает минутами.
+"""
+
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services.task_store import SQLiteTaskStore, YamlTaskStore
+
+YAML_LIMIT = 10_000
+LOOKUPS = 1000
+
+
+def make_tasks(count: int) -> list:
+    tasks = []
+    for i in range(count):
+        completed = i % 3 != 0
+        tasks.append({
+            "content": f"Задача номер {i}",
+            "created_at": "2024-01-01T10:00:00",
+            "todoist_id": str(1_000_000 + i),
+            "priority": i % 4 + 1,
+            "project": "Inbox",
+            "labels": ["work"] if i % 2 else [],
+            "description": None,
+            "due_date": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            "completed_at": "2024-02-01T12:00:00" if completed else None,
+        })
+    return tasks
+
+
+def timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def bench(store, content: dict, ids: list) -> tuple:
+    save = timed(lambda: store.save(content))
+    load = timed(store.load)
+    lookup = timed(lambda: [store.get_task(todoist_id) for todoist_id in ids]) / len(ids)
+    return save, load, lookup
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    logging.disable(logging.INFO)
+
+    print(f"{'задач':>8} {'store':>7} {'save, с':>9} {'load, с':>9} {'lookup, мс':>11}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for count in sizes:
+            content = {"last_synced": "2024-02-01T12:00:00", "tasks": make_tasks(count)}
+            ids = [str(1_000_000 + random.randrange(count)) for _ in range(LOOKUPS)]
+            directory = Path(workdir) / str(count)
+
+            sqlite_store = SQLiteTaskStore(directory / "todoist.db")
+            results = [("sqlite", bench(sqlite_store, content, ids))]
+            sqlite_store.close()
+
+            if count <= YAML_LIMIT:
+                yaml_store = YamlTaskStore(directory / "todoist.yml")
+                # Для YAML каждый поиск — полная загрузка файла, поэтому берем меньше
+                results.insert(0, ("yaml", bench(yaml_store, content, ids[:3])))
+
+            for name, (save, load, lookup) in results:
+                print(f"{count:>8} {name:>7} {save:>9.3f} {load:>9.3f} {lookup * 1000:>11.3f}")
+            if count > YAML_LIMIT:
+                print(f"{count:>8} {'yaml':>7} {'пропущено':>9}")
+
+
+if __name__ == "__main__":
+    main()
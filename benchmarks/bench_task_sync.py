@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк: цикл синхронизации с Todoist поверх хранилища задач с большой историей
+
+В SQLite-хранилище N завершенных задач и небольшое число активных. Цикл
+"экспорт + импорт" читает только незакрытые задачи и пишет только
+измененные; для сравнения замеряется прежняя схема — полная загрузка и
+полная перезапись хранилища на каждую синхронизацию. Затем на обоих
+хранилищах проверяется сценарий: создание (строка получает todoist_id, а
+не дублируется), закрытие и переоткрытие в Todoist, удаление из памяти —
+с инкрементальным импортом при обоих backend экспорта и с запасным полным
+импортом через REST, когда Sync API недоступен.
+
+Запуск: python benchmarks/bench_task_sync.py [завершенных задач]
+"""
+
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services.todoist_service import TodoistService
+from benchmarks.fake_todoist import FakeTodoist
+
+ACTIVE = 50
+
+
+class BenchConfig:
+    """Минимальная конфигурация для TodoistService"""
+    todoist_api_token = "bench-token"
+    todoist_requests_per_second = 0
+
+    def __init__(self, store: str, backend: str = "rest"):
+        self.task_store = store
+        self.todoist_backend = backend
+
+
+async def make_service(fake: FakeTodoist, store: str, directory: Path, backend: str = "rest") -> TodoistService:
+    service = TodoistService(BenchConfig(store, backend))
+    service.base_url = fake.base_url
+    service.sync_url = f"{fake.base_url}/sync"
+    service.memory_path = directory
+    directory.mkdir(parents=True, exist_ok=True)
+    return service
+
+
+def history(count: int) -> list:
+    return [
+        {"content": f"Старая задача {i}", "created_at": "2020-01-01T10:00:00", "todoist_id": f"old{i}",
+         "priority": 1, "completed_at": "2020-02-01T10:00:00", "closed_at": "2020-02-01T10:00:00"}
+        for i in range(count)
+    ]
+
+
+async def bench_cycle(count: int, workdir: Path) -> None:
+    fake = FakeTodoist()
+    await fake.start()
+    service = await make_service(fake, "sqlite", workdir / "bench")
+    store = service.task_store
+    try:
+        active = [{"content": f"Активная {i}", "created_at": f"2024-01-01T10:00:{i:02d}"} for i in range(ACTIVE)]
+        store.save({"tasks": history(count) + active})
+        await service.export_to_todoist()
+        await service.import_from_todoist()
+
+        started = time.perf_counter()
+        await service.export_to_todoist()
+        await service.import_from_todoist()
+        cycle = time.perf_counter() - started
+
+        started = time.perf_counter()
+        store.save(store.load())
+        legacy = time.perf_counter() - started
+
+        content = store.load()
+        assert len(content["tasks"]) == count + ACTIVE
+        assert sum(1 for task in content["tasks"] if task.get("todoist_id") and not task.get("closed_at")) == ACTIVE
+        print(f"{count} завершенных + {ACTIVE} активных задач (SQLite)")
+        print(f"Экспорт + импорт: {cycle * 1000:.1f} мс; "
+              f"прежние полная загрузка и перезапись на каждую синхронизацию: {legacy * 1000:.1f} мс")
+    finally:
+        await service.close()
+        await fake.stop()
+
+
+async def check_scenario(store_kind: str, backend: str, fallback: bool, workdir: Path) -> None:
+    fake = FakeTodoist()
+    await fake.start()
+    directory = workdir / f"{store_kind}-{backend}-{'fallback' if fallback else 'sync'}"
+    service = await make_service(fake, store_kind, directory, backend)
+    if fallback:
+        # Sync API отвечает 404: импорт переходит на полный REST
+        service.sync_url = f"{fake.base_url}/missing"
+    store = service.task_store
+    try:
+        store.save({"tasks": history(3) + [
+            {"content": "Новая", "created_at": "2024-01-01T10:00:00"},
+            {"content": "Лишняя", "created_at": "2024-01-01T11:00:00"},
+        ]})
+        await service.export_to_todoist()
+        tasks = store.load()["tasks"]
+        assert len(tasks) == 5 and all(task.get("todoist_id") for task in tasks)
+        new_id = next(task["todoist_id"] for task in tasks if task["content"] == "Новая")
+        extra_id = next(task["todoist_id"] for task in tasks if task["content"] == "Лишняя")
+        await service.import_from_todoist()
+
+        # Закрытие в Todoist
+        fake.tasks[new_id]["is_completed"] = True
+        fake._touch(new_id)
+        await service.import_from_todoist()
+        task = store.get_task(new_id)
+        assert task["completed_at"] and task["closed_at"]
+
+        # Переоткрытие в Todoist: задача снова активна, без дубликата
+        fake.tasks[new_id]["is_completed"] = False
+        fake._touch(new_id)
+        await service.import_from_todoist()
+        task = store.get_task(new_id)
+        assert not task.get("completed_at") and not task.get("closed_at")
+
+        # Повторное закрытие в Todoist после переоткрытия (closed_at хранится как None)
+        fake.tasks[new_id]["is_completed"] = True
+        fake._touch(new_id)
+        await service.import_from_todoist()
+        assert store.get_task(new_id)["closed_at"]
+        fake.tasks[new_id]["is_completed"] = False
+        fake._touch(new_id)
+        await service.import_from_todoist()
+        task = store.get_task(new_id)
+
+        # Завершение в памяти, еще не выгруженное в Todoist, переживает импорт
+        store.upsert_tasks([{**task, "completed_at": "2024-02-01T10:00:00"}])
+        fake._touch(new_id)
+        await service.import_from_todoist()
+        task = store.get_task(new_id)
+        assert task["completed_at"] == "2024-02-01T10:00:00" and not task.get("closed_at")
+        await service.export_to_todoist()
+        await service.import_from_todoist()
+        task = store.get_task(new_id)
+        assert fake.tasks[new_id]["is_completed"] and task["closed_at"]
+
+        # Удаление из памяти
+        store.upsert_tasks([{**store.get_task(extra_id), "to_delete": True}])
+        await service.export_to_todoist()
+        await service.import_from_todoist()
+        tasks = store.load()["tasks"]
+        assert extra_id not in fake.tasks and store.get_task(extra_id) is None
+        assert len(tasks) == 4 and len({task["todoist_id"] for task in tasks}) == 4
+        assert store.get_meta().get("last_synced")
+        assert bool(store.get_meta().get("sync_token")) != fallback
+    finally:
+        await service.close()
+        await fake.stop()
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    logging.disable(logging.ERROR)
+    with tempfile.TemporaryDirectory() as workdir:
+        await bench_cycle(count, Path(workdir))
+        for store_kind in ("yaml", "sqlite"):
+            for backend, fallback in (("rest", False), ("sync", False), ("rest", True)):
+                await check_scenario(store_kind, backend, fallback, Path(workdir))
+        print("Создание, закрытие и переоткрытие в Todoist, удаление "
+              "(yaml/sqlite; инкрементальный импорт при rest/sync, запасной REST): OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
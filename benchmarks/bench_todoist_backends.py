@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк: экспорт задач через REST v2 и через пакетный Sync API
+
+Экспортирует 10/100/1000 новых задач в локальную заглушку Todoist с
+искусственной сетевой задержкой и сравнивает время и число запросов. Затем
+выполняет импорт. В хранилище, кроме новых задач, лежит история из
+HISTORY завершенных задач. Для YAML считаются полные загрузки и записи
+todoist.yml: на экспорт и на импорт должно приходиться по одной загрузке
+и одной записи.
+
+Запуск: python benchmarks/bench_todoist_backends.py [задержка_мс]
+"""
+
+import asyncio
+import collections
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services.task_store import YamlTaskStore
+from bot.services.todoist_service import TodoistService
+from benchmarks.fake_todoist import FakeTodoist
+
+HISTORY = 2000
+
+# Счетчики полных загрузок и записей todoist.yml
+yaml_io = collections.Counter()
+
+
+def counted(name: str, method):
+    def wrapper(self, *args, **kwargs):
+        yaml_io[name] += 1
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+YamlTaskStore._read = counted("read", YamlTaskStore._read)
+YamlTaskStore._write = counted("write", YamlTaskStore._write)
+
+
+class BenchConfig:
+    """Минимальная конфигурация для TodoistService"""
+    todoist_api_token = "bench-token"
+    todoist_requests_per_second = 0  # без ведра токенов: меряется транспорт, не квота
+
+    def __init__(self, backend: str, store: str):
+        self.todoist_backend = backend
+        self.task_store = store
+
+
+async def run_sync(backend: str, store: str, count: int, latency: float, workdir: Path) -> tuple:
+    fake = FakeTodoist(latency=latency)
+    base_url = await fake.start()
+
+    service = TodoistService(BenchConfig(backend, store))
+    service.base_url = base_url
+    service.sync_url = f"{base_url}/sync"
+    service.memory_path = workdir / backend / store / str(count)
+    service.memory_path.mkdir(parents=True, exist_ok=True)
+
+    history = [
+        {"content": f"Старая {i}", "created_at": "2020-01-01", "todoist_id": f"old{i}", "priority": 1,
+         "completed_at": "2020-02-01", "closed_at": "2020-02-01"}
+        for i in range(HISTORY)
+    ]
+    tasks = [{"content": f"Задача {i}", "created_at": "2024-01-01", "priority": 1} for i in range(count)]
+    service.task_store.save({"tasks": history + tasks})
+    yaml_io.clear()
+
+    try:
+        summary = await service.export_to_todoist()
+        export_io = dict(yaml_io)
+        yaml_io.clear()
+        started = time.perf_counter()
+        await service.import_from_todoist()
+        import_time = time.perf_counter() - started
+        import_io = dict(yaml_io)
+    finally:
+        await service.close()
+        await fake.stop()
+
+    if store == "yaml":
+        assert export_io == import_io == {"read": 1, "write": 1}, (export_io, import_io)
+    return summary, fake.request_count, import_time
+
+
+async def main():
+    latency = (float(sys.argv[1]) if len(sys.argv) > 1 else 20.0) / 1000
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"Задержка сервера: {latency * 1000:.0f} мс на запрос")
+        print(f"История в хранилище: {HISTORY} завершенных задач")
+        print(f"{'задач':>6} {'backend':>8} {'store':>7} {'запросов':>9} {'экспорт, с':>11} "
+              f"{'задач/с':>9} {'импорт, с':>10}")
+        for count in (10, 100, 1000):
+            for backend in ("rest", "sync"):
+                for store in ("yaml", "sqlite"):
+                    summary, requests, import_time = await run_sync(backend, store, count, latency, Path(workdir))
+                    print(f"{count:>6} {backend:>8} {store:>7} {requests:>9} {summary['elapsed']:>11.2f} "
+                          f"{summary['throughput']:>9.1f} {import_time:>10.2f}")
+        print("YAML: одна загрузка и одна запись todoist.yml на экспорт и на импорт: OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
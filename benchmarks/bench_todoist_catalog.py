@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк: кэш проектов и меток Todoist (TTL, ETag, инвалидация дельтами Sync API)
+
+Повторяет цикл "экспорт + импорт + /tasks" несколько раз: без кэша (как
+раньше — список проектов запрашивается на каждом шаге) и с кэшем. Затем
+проверяет условный запрос после истечения TTL (304 Not Modified) и сброс
+кэша, когда дельта Sync API приносит новый проект.
+
+Запуск: python benchmarks/bench_todoist_catalog.py [циклов] [задержка_мс]
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services.todoist_service import TodoistService
+from benchmarks.fake_todoist import FakeTodoist
+
+
+class BenchConfig:
+    """Минимальная конфигурация для TodoistService"""
+    todoist_api_token = "bench-token"
+    todoist_requests_per_second = 0
+
+    def __init__(self, backend: str = "rest", ttl: float = 300.0):
+        self.todoist_backend = backend
+        self.todoist_catalog_ttl = ttl
+
+
+async def make_service(fake: FakeTodoist, backend: str = "rest", ttl: float = 300.0) -> TodoistService:
+    service = TodoistService(BenchConfig(backend, ttl))
+    service.base_url, service.sync_url = fake.base_url, f"{fake.base_url}/sync"
+    return service
+
+
+async def cycles(fake: FakeTodoist, service: TodoistService, count: int, cached: bool) -> tuple:
+    service.invalidate_catalog()
+    before = fake.catalog_requests
+    started = time.perf_counter()
+    for _ in range(count):
+        if not cached:
+            service.invalidate_catalog()
+        await service.export_to_todoist()
+        if not cached:
+            service.invalidate_catalog()
+        await service.import_from_todoist()
+        await service.get_today_tasks()
+        if not cached:
+            service.invalidate_catalog()
+        await service.get_project_names()
+    return time.perf_counter() - started, fake.catalog_requests - before
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 20.0) / 1000
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        fake = FakeTodoist(latency=latency)
+        await fake.start()
+        for i in range(20):
+            fake._new_task({"content": f"Задача {i}", "project_id": "p1"})
+
+        print(f"{count} циклов экспорт + импорт + /tasks, задержка {latency * 1000:.0f} мс")
+        print(f"{'режим':>9} {'время, с':>9} {'запросов проектов':>18}")
+        service = await make_service(fake)
+        try:
+            for name, cached in (("без кэша", False), ("кэш", True)):
+                elapsed, requests = await cycles(fake, service, count, cached)
+                print(f"{name:>9} {elapsed:>9.2f} {requests:>18}")
+        finally:
+            await service.close()
+
+        # TTL истек: условный запрос, сервер отвечает 304
+        service = await make_service(fake, ttl=0.0)
+        try:
+            await service.get_projects()
+            await service.get_projects()
+            assert fake.not_modified_count == 1
+            # Пустой ответ (304) без записи в кэше: пустой список, не исключение
+            service.invalidate_catalog()
+
+            async def empty_response(*args, **kwargs):
+                return None
+
+            service._make_request = empty_response
+            assert await service._get_catalog("projects") == []
+            assert "projects" not in service._catalogs
+            print("Истечение TTL: условный запрос с If-None-Match -> 304: OK")
+        finally:
+            await service.close()
+
+        # Дельта Sync API с новым проектом сбрасывает кэш
+        service = await make_service(fake, backend="sync")
+        service.memory_path = Path("memory/sync")
+        try:
+            await service.import_from_todoist()
+            requests = fake.catalog_requests
+            assert "Inbox" in (await service.get_project_names()).values()
+            assert fake.catalog_requests == requests, "полный снимок должен заполнить кэш"
+            fake.add_catalog_entry("projects", "Работа")
+            await service.import_from_todoist()
+            assert "Работа" in (await service.get_project_names()).values()
+            print("Полный снимок Sync API заполняет кэш, дельта с проектом его сбрасывает: OK")
+        finally:
+            await service.close()
+            await fake.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Микробенчмарк: разбор ответа Todoist с задачами в TodoistTask
+
+Сравнивает прежний путь (json + dataclass с __dict__, конструктор с
+именованными аргументами и .get() на каждое поле) и текущий (TodoistTask со
+__slots__ и общим TodoistTask.from_api) со стандартным json и с orjson.
+Пиковый RSS почти целиком приходится на разобранные словари ответа; память,
+которая остается после разбора, — это сами задачи (замер tracemalloc
+отдельным проходом, чтобы не искажать время).
+Каждый вариант и генерация ответа запускаются в отдельных процессах: пиковый
+RSS наследуется дочерним процессом, и один замер испортил бы другой.
+
+Запуск: python benchmarks/bench_todoist_parse.py [задач] [повторов]
+"""
+
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services import todoist_service
+from bot.services.todoist_service import TodoistTask
+
+
+@dataclass
+class LegacyTask:
+    """Прежняя модель задачи: обычный dataclass с __dict__"""
+    id: str
+    content: str
+    description: Optional[str] = None
+    project_id: Optional[str] = None
+    section_id: Optional[str] = None
+    parent_id: Optional[str] = None
+    order: int = 0
+    labels: List[str] = None
+    priority: int = 1
+    due: Optional[Dict] = None
+    url: str = ""
+    comment_count: int = 0
+    created_at: str = ""
+    created_by: str = ""
+    assignee: Optional[str] = None
+    assigner: Optional[str] = None
+    responsible_uid: Optional[str] = None
+    sync_id: Optional[str] = None
+    completed_at: Optional[str] = None
+    added_at: str = ""
+
+
+def legacy_task(task_data: Dict) -> LegacyTask:
+    return LegacyTask(
+        id=task_data.get("id"),
+        content=task_data.get("content", ""),
+        description=task_data.get("description"),
+        project_id=task_data.get("project_id"),
+        section_id=task_data.get("section_id"),
+        parent_id=task_data.get("parent_id"),
+        order=task_data.get("order", 0),
+        labels=task_data.get("labels", []),
+        priority=task_data.get("priority", 1),
+        due=task_data.get("due"),
+        url=task_data.get("url", ""),
+        comment_count=task_data.get("comment_count", 0),
+        created_at=task_data.get("created_at", ""),
+        created_by=task_data.get("created_by", ""),
+        assignee=task_data.get("assignee"),
+        assigner=task_data.get("assigner"),
+        responsible_uid=task_data.get("responsible_uid"),
+        sync_id=task_data.get("sync_id"),
+        completed_at=task_data.get("completed_at"),
+        added_at=task_data.get("added_at", "")
+    )
+
+
+VARIANTS = {
+    "legacy": (json.loads, legacy_task),
+    "slots": (json.loads, TodoistTask.from_api),
+}
+if todoist_service.json_loads is not json.loads:
+    VARIANTS["slots+orjson"] = (todoist_service.json_loads, TodoistTask.from_api)
+
+
+def make_payload(count: int) -> bytes:
+    tasks = []
+    for i in range(count):
+        tasks.append({
+            "id": str(7_000_000_000 + i),
+            "content": f"Задача номер {i}",
+            "description": "Описание задачи" if i % 5 == 0 else "",
+            "project_id": "2203306141",
+            "section_id": None,
+            "parent_id": None,
+            "order": i,
+            "labels": ["work"] if i % 2 else [],
+            "priority": i % 4 + 1,
+            "due": {"date": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}", "is_recurring": False,
+                    "string": "today", "lang": "ru"} if i % 3 else None,
+            "url": f"https://todoist.com/showTask?id={7_000_000_000 + i}",
+            "comment_count": i % 7,
+            "created_at": "2024-01-01T10:00:00.000000Z",
+            "creator_id": "2671355",
+            "assignee_id": None,
+            "assigner_id": None,
+            "is_completed": False,
+        })
+    return json.dumps(tasks, ensure_ascii=False).encode()
+
+
+def run_variant(name: str, path: str, count: int, repeat: int) -> None:
+    """Дочерний процесс: разобрать ответ repeat раз, напечатать время и пиковый RSS"""
+    loads, factory = VARIANTS[name]
+    payload = Path(path).read_bytes()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        tasks = [factory(task_data) for task_data in loads(payload)]
+        best = min(best, time.perf_counter() - started)
+        assert len(tasks) == count and tasks[-1].content == f"Задача номер {count - 1}"
+        del tasks
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    tracemalloc.start()
+    tasks = [factory(task_data) for task_data in loads(payload)]
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{best * 1000:.2f} {(peak - baseline) / 1024:.1f} {retained / 2 ** 20:.1f}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--payload":
+        Path(sys.argv[2]).write_bytes(make_payload(int(sys.argv[3])))
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "--variant":
+        run_variant(sys.argv[2], sys.argv[3], int(sys.argv[4]), int(sys.argv[5]))
+        return
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print(f"{count} задач, лучшее из {repeat}")
+    print(f"{'вариант':>12} {'разбор, мс':>11} {'пик RSS, +МБ':>13} {'задачи, МБ':>11}")
+    with tempfile.NamedTemporaryFile(suffix=".json") as payload:
+        subprocess.run([sys.executable, __file__, "--payload", payload.name, str(count)], check=True)
+        for name in VARIANTS:
+            output = subprocess.run(
+                [sys.executable, __file__, "--variant", name, payload.name, str(count), str(repeat)],
+                capture_output=True, text=True, check=True,
+            ).stdout.split()
+            elapsed, peak, retained = map(float, output)
+            print(f"{name:>12} {elapsed:>11.2f} {peak:>13.1f} {retained:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк: задержка запросов к Todoist с пулом соединений и без него
+
+Поднимает локальный HTTP-сервер, имитирующий Todoist REST API, и сравнивает
+старое поведение (новая ClientSession на каждый запрос) с общей сессией
+TodoistService.
+
+Запуск: python benchmarks/bench_todoist_pool.py [количество запросов]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services.todoist_service import TodoistService
+
+
+class BenchConfig:
+    """Минимальная конфигурация для TodoistService"""
+    todoist_api_token = "bench-token"
+    todoist_requests_per_second = 0  # без ведра токенов: меряется транспорт, не квота
+
+
+async def _tasks_endpoint(request: web.Request) -> web.Response:
+    return web.json_response([{"id": "1", "content": "Задача"}])
+
+
+async def start_stub_server() -> web.AppRunner:
+    """Запустить локальную заглушку Todoist API"""
+    app = web.Application()
+    app.router.add_get("/tasks", _tasks_endpoint)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner
+
+
+async def bench_without_pool(url: str, headers: dict, count: int) -> list:
+    """Старое поведение: новая сессия (и TCP-соединение) на каждый запрос"""
+    timings = []
+    for _ in range(count):
+        started = time.perf_counter()
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url, headers=headers) as response:
+                await response.json()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def bench_with_pool(service: TodoistService, count: int) -> list:
+    """Общая сессия сервиса с keep-alive"""
+    timings = []
+    for _ in range(count):
+        started = time.perf_counter()
+        await service._make_request("GET", "/tasks")
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def report(name: str, timings: list) -> None:
+    ms = sorted(t * 1000 for t in timings)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(f"{name:<12} среднее {statistics.mean(ms):7.3f} мс  "
+          f"медиана {statistics.median(ms):7.3f} мс  p95 {p95:7.3f} мс")
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    runner = await start_stub_server()
+    port = runner.addresses[0][1]
+    base_url = f"http://127.0.0.1:{port}"
+
+    service = TodoistService(BenchConfig())
+    service.base_url = base_url
+
+    try:
+        without_pool = await bench_without_pool(f"{base_url}/tasks", service.headers, count)
+        with_pool = await bench_with_pool(service, count)
+    finally:
+        await service.close()
+        await runner.cleanup()
+
+    print(f"Запросов: {count} (локальный сервер, без TLS)")
+    report("без пула", without_pool)
+    report("с пулом", with_pool)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
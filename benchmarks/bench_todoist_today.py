@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк и проверка кэша задач на сегодня (stale-while-revalidate)
+
+Серия вызовов /tasks с небольшим интервалом: без кэша (сброс перед каждым
+вызовом — как раньше, запрос в Todoist на каждый вызов) и с кэшем. Затем
+проверяет: сброс кэша после complete_task и create_task, то, что фоновое
+обновление, начатое до изменения, не перезаписывает кэш старым ответом, и
+смену дня в локальную полночь.
+
+Запуск: python benchmarks/bench_todoist_today.py [вызовов] [задержка_мс]
+"""
+
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services import todoist_service as todoist_module
+from bot.services.todoist_service import TodoistService
+from benchmarks.fake_todoist import FakeTodoist
+
+CALL_INTERVAL = 0.02
+TODAY_TTL = 0.5
+
+
+class BenchConfig:
+    """Минимальная конфигурация для TodoistService"""
+    todoist_api_token = "bench-token"
+    todoist_requests_per_second = 0
+    todoist_today_ttl = TODAY_TTL
+
+
+class FrozenDatetime(datetime):
+    """datetime.now(), которое можно переставить (проверка полуночи)"""
+    current = None
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current or datetime.now(tz)
+
+
+def today() -> str:
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+async def series(fake: FakeTodoist, service: TodoistService, calls: int, cached: bool) -> tuple:
+    service.invalidate_today_tasks()
+    requests = fake.request_count
+    latencies = []
+    for _ in range(calls):
+        if not cached:
+            service.invalidate_today_tasks()
+        started = time.perf_counter()
+        tasks = await service.get_today_tasks()
+        latencies.append(time.perf_counter() - started)
+        assert len(tasks) == 20
+        await asyncio.sleep(CALL_INTERVAL)
+    return statistics.median(latencies), max(latencies), fake.request_count - requests
+
+
+async def checks(fake: FakeTodoist, service: TodoistService) -> None:
+    # complete_task сбрасывает кэш: завершенная задача сразу пропадает из списка
+    tasks = await service.get_today_tasks()
+    await service.complete_task(tasks[0].id)
+    assert tasks[0].id not in {task.id for task in await service.get_today_tasks()}
+
+    # create_task тоже сбрасывает кэш
+    created = await service.create_task("Новая задача", due_date=today())
+    assert created.id in {task.id for task in await service.get_today_tasks()}
+
+    # Фоновое обновление, начатое до изменения, не кладет в кэш старый ответ
+    service._today.fetched_at -= TODAY_TTL
+    stale = await service.get_today_tasks()
+    refresh = service._today_refresh
+    await service.complete_task(stale[0].id)
+    await refresh
+    assert stale[0].id not in {task.id for task in await service.get_today_tasks()}
+    print("Сброс при complete_task/create_task и гонка с фоновым обновлением: OK")
+
+    # Полночь: после смены локальной даты кэш вчерашнего дня не используется
+    todoist_module.datetime = FrozenDatetime
+    try:
+        FrozenDatetime.current = datetime(2024, 3, 1, 23, 59, 59)
+        fake._new_task({"content": "Завтрашняя", "due_date": "2024-03-02"})
+        assert await service.get_today_tasks() == []
+        FrozenDatetime.current = datetime(2024, 3, 2, 0, 0, 1)
+        assert [task.content for task in await service.get_today_tasks()] == ["Завтрашняя"]
+        assert fake.list_requests[-1] == "due:2024-03-02"
+    finally:
+        todoist_module.datetime = datetime
+    print("Смена дня в локальную полночь: OK")
+
+
+async def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 100.0) / 1000
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        fake = FakeTodoist(latency=latency)
+        await fake.start()
+        for i in range(20):
+            fake._new_task({"content": f"Задача {i}", "due_date": today()})
+        for i in range(200):
+            fake._new_task({"content": f"Позже {i}", "due_date": "2099-01-01"})
+
+        service = TodoistService(BenchConfig())
+        service.base_url = fake.base_url
+        try:
+            print(f"{calls} вызовов /tasks через {CALL_INTERVAL * 1000:.0f} мс, задержка Todoist "
+                  f"{latency * 1000:.0f} мс, TTL {TODAY_TTL} с")
+            print(f"{'режим':>9} {'медиана, мс':>12} {'макс, мс':>9} {'запросов':>9}")
+            for name, cached in (("без кэша", False), ("кэш", True)):
+                median, worst, requests = await series(fake, service, calls, cached)
+                print(f"{name:>9} {median * 1000:>12.3f} {worst * 1000:>9.1f} {requests:>9}")
+
+            service.today_metrics = type(service.today_metrics)()
+            await series(fake, service, calls, cached=True)
+            stats = service.get_cache_stats()
+            print(f"Кэш: {stats['hits']} свежих, {stats['stale_hits']} устаревших, "
+                  f"{stats['misses']} промахов, hit rate {stats['hit_rate']:.1%}")
+
+            await checks(fake, service)
+        finally:
+            await service.close()
+            await fake.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк обхода дерева памяти для статуса WatchService (режим опроса)
+
+Прежний get_system_status обходил дерево дважды: статистика (rglob +
+is_file/is_dir + stat) и список изменений (еще один rglob + is_file +
+stat). Теперь один проход os.scandir собирает mtime, размеры и счетчики, и
+его результат используют обе части статуса. Результаты сверяются.
+
+Запуск: python benchmarks/bench_watch_scan.py [файлов] [повторов]
+"""
+
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services.watch_service import WatchService
+from benchmarks.bench_watch_service import build_tree
+
+
+def legacy_memory_stats(memory_path: Path) -> dict:
+    """Прежний get_memory_stats"""
+    file_count = dir_count = total_size = 0
+    for item in memory_path.rglob("*"):
+        if item.is_file() and not item.name.startswith('.'):
+            file_count += 1
+            try:
+                total_size += item.stat().st_size
+            except OSError:
+                pass
+        elif item.is_dir() and not item.name.startswith('.'):
+            dir_count += 1
+    return {"files": file_count, "directories": dir_count, "total_size": total_size}
+
+
+def legacy_scan_memory_files(memory_path: Path) -> dict:
+    """Прежний scan_memory_files"""
+    timestamps = {}
+    for file_path in memory_path.rglob("*"):
+        if file_path.is_file() and not file_path.name.startswith('.'):
+            try:
+                timestamps[str(file_path.relative_to(memory_path))] = file_path.stat().st_mtime
+            except OSError:
+                timestamps[str(file_path.relative_to(memory_path))] = 0
+    return timestamps
+
+
+def best_of(repeat: int, func) -> tuple:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    logging.disable(logging.CRITICAL)
+
+    workdir = tempfile.mkdtemp()
+    try:
+        build_tree(workdir, count)
+        # Скрытые файлы и папки: скрытые не считаются, содержимое скрытых папок — считается
+        os.makedirs(os.path.join(workdir, ".cache", "inner"))
+        for name in (".hidden.md", os.path.join(".cache", "visible.md"), os.path.join(".cache", "inner", "x.md")):
+            with open(os.path.join(workdir, name), "w", encoding="utf-8") as f:
+                f.write("x")
+        root = Path(workdir)
+        service = WatchService(workdir)
+
+        legacy_time, (legacy_stats, legacy_files) = best_of(
+            repeat, lambda: (legacy_memory_stats(root), legacy_scan_memory_files(root))
+        )
+
+        def single_pass():
+            scan = service.scan()
+            return service.get_memory_stats(scan), scan
+
+        scan_time, (stats, scan) = best_of(repeat, single_pass)
+        status_time, _ = best_of(repeat, service.get_system_status)
+
+        assert stats == legacy_stats, (stats, legacy_stats)
+        assert {path: mtime for path, (mtime, _) in scan.files.items()} == legacy_files
+        print(f"{stats['files']} файлов, {stats['directories']} папок, лучшее из {repeat}")
+        print(f"Прежние статистика + сканирование (два обхода rglob): {legacy_time * 1000:.0f} мс")
+        print(f"Один проход os.scandir для обоих: {scan_time * 1000:.0f} мс "
+              f"({legacy_time / scan_time:.1f}x)")
+        print(f"get_system_status целиком: {status_time * 1000:.0f} мс")
+        print("Статистика и временные метки совпадают с прежними: OK")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
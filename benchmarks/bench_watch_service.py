@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк WatchService: опрос дерева памяти против событий inotify
+
+Создает дерево из N файлов, несколько раз меняет небольшую часть файлов и
+после каждой серии изменений запрашивает статистику и список изменений —
+как get_system_status. Режим опроса обходит все дерево дважды на каждую
+проверку, событийный режим обновляет состояние по событиям. Результаты
+событийного режима сверяются с опросом. Отдельно проверяется склейка:
+сотни записей в один файл дают одно изменение.
+
+Запуск: python benchmarks/bench_watch_service.py [файлов] [проверок]
+"""
+
+import asyncio
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bot.services.watch_service import WatchService
+from bot.utils import inotify
+
+FILES_PER_DIR = 100
+CHANGES_PER_CHECK = 20
+DEBOUNCE = 0.05
+
+
+def build_tree(root: str, count: int) -> list:
+    paths = []
+    for i in range(count):
+        directory = os.path.join(root, f"area{i // (FILES_PER_DIR * 10)}", f"dir{i // FILES_PER_DIR}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"note{i}.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"Заметка {i}\n")
+        paths.append(path)
+    return paths
+
+
+def mutate(root: str, paths: list, rng: random.Random, step: int) -> None:
+    """Изменить, создать и удалить несколько файлов"""
+    for path in rng.sample(paths, CHANGES_PER_CHECK):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(f"правка {step}\n")
+    new_dir = os.path.join(root, f"new{step}")
+    os.makedirs(new_dir)
+    with open(os.path.join(new_dir, "created.md"), "w", encoding="utf-8") as f:
+        f.write("новый файл\n")
+    victim = paths.pop(rng.randrange(len(paths)))
+    os.remove(victim)
+
+
+def check(service: WatchService) -> tuple:
+    started = time.perf_counter()
+    stats = service.get_memory_stats()
+    changes = service.get_changed_files()
+    return time.perf_counter() - started, stats, sorted(changes)
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    checks = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    logging.disable(logging.CRITICAL)
+    if not inotify.is_available():
+        print("inotify недоступен на этой платформе")
+        return
+
+    workdir = tempfile.mkdtemp()
+    try:
+        paths = build_tree(workdir, count)
+        polling, watching = WatchService(workdir), WatchService(workdir, debounce=DEBOUNCE)
+        polling.get_changed_files()
+        watching.get_changed_files()
+        started = time.perf_counter()
+        assert watching.start_watching()
+        setup = time.perf_counter() - started
+
+        rng = random.Random(3)
+        poll_times, watch_times = [], []
+        for step in range(checks):
+            mutate(workdir, paths, rng, step)
+            await asyncio.sleep(DEBOUNCE * 2)
+            poll_time, poll_stats, poll_changes = check(polling)
+            watch_time, watch_stats, watch_changes = check(watching)
+            assert poll_stats == watch_stats, (poll_stats, watch_stats)
+            assert poll_changes == watch_changes, (poll_changes, watch_changes)
+            poll_times.append(poll_time)
+            watch_times.append(watch_time)
+
+        print(f"{count} файлов, {checks} проверок по {CHANGES_PER_CHECK + 2} изменений")
+        print(f"Запуск inotify (один обход дерева): {setup * 1000:.0f} мс, "
+              f"{len(watching._watches)} наблюдений")
+        print(f"{'режим':>8} {'проверка, мс':>13}")
+        print(f"{'опрос':>8} {sum(poll_times) / checks * 1000:>13.1f}")
+        print(f"{'inotify':>8} {sum(watch_times) / checks * 1000:>13.3f}")
+
+        # Склейка: много записей в один файл за окно — одно изменение и один stat
+        target = paths[0]
+        for i in range(500):
+            with open(target, "a", encoding="utf-8") as f:
+                f.write(f"{i}\n")
+        await asyncio.sleep(DEBOUNCE * 2)
+        relative = os.path.relpath(target, workdir)
+        assert watching.get_changed_files() == [f"✏️ {relative}"]
+        print("500 записей в один файл -> одно изменение: OK")
+        print("Статистика и изменения совпадают с опросом: OK")
+        watching.stop_watching()
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
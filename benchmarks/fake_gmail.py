@@ -0,0 +1,160 @@
+"""
+Локальная заглушка Gmail API (messages, history, profile, batch) для бенчмарков
+
+Параметр latency добавляет задержку к каждому HTTP-запросу, имитируя
+round-trip до gmail.googleapis.com. Клиент googleapiclient направляется на
+заглушку через client_options={"api_endpoint": ...} и GmailService.batch_uri.
+"""
+
+import asyncio
+import json
+from typing import Dict, List, Optional
+
+import httplib2
+from aiohttp import web
+from googleapiclient.discovery import build
+
+from bot.services.gmail_service import GmailService
+
+
+class FakeGmail:
+    """In-memory почтовый ящик с REST и batch эндпоинтами Gmail"""
+
+    def __init__(self, message_count: int = 200, latency: float = 0.0):
+        self.latency = latency
+        self.messages: Dict[str, Dict] = {}
+        self.order: List[str] = []
+        self.request_count = 0
+        self.get_count = 0
+        self.throttle_parts = 0
+        self.history_id = 1000
+        self.history: List[tuple] = []
+        self.history_floor = self.history_id
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+        for i in range(message_count):
+            self.add_message(f"Письмо {i}")
+
+    def add_message(self, subject: str) -> str:
+        message_id = f"{len(self.order) + 1:016x}"
+        self.messages[message_id] = {
+            "id": message_id,
+            "threadId": message_id,
+            "snippet": f"Текст: {subject}",
+            "payload": {"headers": [
+                {"name": "Subject", "value": subject},
+                {"name": "From", "value": "sender@example.com"},
+                {"name": "Date", "value": "Mon, 1 Jan 2024 10:00:00 +0000"},
+            ]},
+        }
+        self.order.insert(0, message_id)
+        self.history_id += 1
+        self.history.append((self.history_id, message_id))
+        return message_id
+
+    def expire_history(self) -> None:
+        """Забыть историю: запросы со старым startHistoryId получат 404"""
+        self.history_floor = self.history_id
+        self.history.clear()
+
+    async def _delay(self) -> None:
+        self.request_count += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _get(self, message_id: str) -> Optional[Dict]:
+        self.get_count += 1
+        return self.messages.get(message_id)
+
+    async def _list(self, request: web.Request) -> web.Response:
+        await self._delay()
+        max_results = int(request.query.get("maxResults", 100))
+        start = int(request.query.get("pageToken", 0))
+        page = self.order[start:start + max_results]
+        body = {"messages": [{"id": i, "threadId": i} for i in page]}
+        if start + max_results < len(self.order):
+            body["nextPageToken"] = str(start + max_results)
+        return web.json_response(body)
+
+    async def _history(self, request: web.Request) -> web.Response:
+        await self._delay()
+        start = int(request.query["startHistoryId"])
+        if start < self.history_floor:
+            return web.json_response({"error": {"code": 404}}, status=404)
+        records = [
+            {"id": str(history_id), "messagesAdded": [{"message": {"id": message_id, "labelIds": ["INBOX"]}}]}
+            for history_id, message_id in self.history if history_id > start
+        ]
+        return web.json_response({"history": records, "historyId": str(self.history_id)})
+
+    async def _profile(self, request: web.Request) -> web.Response:
+        await self._delay()
+        return web.json_response({"emailAddress": "me@example.com", "historyId": str(self.history_id)})
+
+    async def _message(self, request: web.Request) -> web.Response:
+        await self._delay()
+        message = self._get(request.match_info["message_id"])
+        if message is None:
+            return web.json_response({"error": {"code": 404}}, status=404)
+        return web.json_response(message)
+
+    async def _batch(self, request: web.Request) -> web.Response:
+        """Разобрать multipart/mixed и ответить частью на каждый вложенный GET"""
+        await self._delay()
+        boundary = request.headers["Content-Type"].split("boundary=")[1].strip('"')
+        body = (await request.read()).decode("utf-8")
+
+        parts = []
+        for chunk in body.split(f"--{boundary}")[1:]:
+            if chunk.startswith("--"):
+                break
+            headers, _, http_request = chunk.strip().partition("\n\n")
+            content_id = next(line.split(":", 1)[1].strip() for line in headers.splitlines()
+                              if line.lower().startswith("content-id"))
+            path = http_request.split(" ", 2)[1].split("?")[0]
+            if self.throttle_parts > 0:
+                # Отдельные части batch-ответа получают 429, как при превышении квоты
+                self.throttle_parts -= 1
+                status, payload = "429 Too Many Requests", json.dumps({"error": {"code": 429}})
+            else:
+                message = self._get(path.rsplit("/", 1)[-1])
+                status = "200 OK" if message else "404 Not Found"
+                payload = json.dumps(message or {"error": {"code": 404}})
+            parts.append(
+                f"--batch_fake\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id[1:-1]}>\r\n\r\n"
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n\r\n{payload}\r\n"
+            )
+
+        return web.Response(
+            text="".join(parts) + "--batch_fake--\r\n",
+            headers={"Content-Type": "multipart/mixed; boundary=batch_fake"},
+        )
+
+    async def start(self) -> str:
+        """Запустить сервер на свободном порту, вернуть базовый URL"""
+        app = web.Application(client_max_size=16 * 1024 * 1024)
+        app.router.add_get("/gmail/v1/users/me/messages", self._list)
+        app.router.add_get("/gmail/v1/users/me/messages/{message_id}", self._message)
+        app.router.add_get("/gmail/v1/users/me/history", self._history)
+        app.router.add_get("/gmail/v1/users/me/profile", self._profile)
+        app.router.add_post("/batch/gmail/v1", self._batch)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.base_url = f"http://127.0.0.1:{self._runner.addresses[0][1]}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+
+    def connect(self, gmail: GmailService) -> None:
+        """Направить GmailService на заглушку (без OAuth)"""
+        gmail.service = build(
+            "gmail", "v1", http=httplib2.Http(), static_discovery=True,
+            client_options={"api_endpoint": self.base_url},
+        )
+        gmail.batch_uri = f"{self.base_url}/batch/gmail/v1"
@@ -0,0 +1,248 @@
+"""
+Локальная заглушка Todoist (REST v2 и Sync v9) для бенчмарков и ручных проверок
+
+Хранит задачи в памяти процесса. Параметр latency добавляет задержку к каждому
+запросу, имитируя сетевой round-trip до api.todoist.com. rate_limit=(N, окно)
+отвечает 429 с Retry-After сверх N запросов за окно, fail_after_processing
+имитирует потерянный ответ: запрос выполнен, но клиент получает 503, down —
+недоступность сервиса. Повтор с тем же X-Request-Id (или команды Sync API с тем
+же uuid) возвращает сохраненный результат, как настоящий Todoist.
+"""
+
+import asyncio
+import collections
+import itertools
+from typing import Dict, Optional, Tuple
+
+from aiohttp import web
+
+
+class FakeTodoist:
+    """In-memory Todoist с REST и Sync эндпоинтами"""
+
+    def __init__(self, latency: float = 0.0, rate_limit: Optional[Tuple[int, float]] = None):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.throttled_count = 0
+        self.fail_after_processing = 0
+        self.down = False
+        self._commands: Dict[str, Tuple[object, Optional[str]]] = {}
+        self._recent = collections.deque()
+        self._request_ids: Dict[str, Tuple[int, Optional[bytes]]] = {}
+        self.tasks: Dict[str, Dict] = {}
+        self.projects = [{"id": "p1", "name": "Inbox"}]
+        self.labels = [{"id": "l1", "name": "work"}]
+        self.catalog_requests = 0
+        self.not_modified_count = 0
+        self._catalog_changed: Dict[str, Dict[str, int]] = {"projects": {}, "labels": {}}
+        self.request_count = 0
+        self.list_requests = []
+        self.version = 0
+        self._changed: Dict[str, int] = {}
+        self._deleted: Dict[str, int] = {}
+        self._ids = itertools.count(1)
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+    def _touch(self, task_id: str) -> None:
+        """Отметить изменение задачи для инкрементальной синхронизации"""
+        self.version += 1
+        self._changed[task_id] = self.version
+
+    def _remove(self, task_id: str) -> None:
+        if self.tasks.pop(task_id, None) is not None:
+            self.version += 1
+            self._deleted[task_id] = self.version
+            self._changed.pop(task_id, None)
+
+    def add_catalog_entry(self, resource: str, name: str) -> Dict:
+        """Добавить проект или метку (меняет ETag и попадает в дельту Sync API)"""
+        catalog = getattr(self, resource)
+        entry = {"id": f"{resource[0]}{len(catalog) + 1}", "name": name}
+        catalog.append(entry)
+        self.version += 1
+        self._catalog_changed[resource][entry["id"]] = self.version
+        return entry
+
+    def _new_task(self, data: Dict) -> Dict:
+        task_id = str(next(self._ids))
+        task = {"id": task_id, "content": data.get("content", ""), "is_completed": False,
+                "created_at": "2024-01-01T00:00:00Z", **data}
+        task["id"] = task_id
+        self.tasks[task_id] = task
+        self._touch(task_id)
+        return task
+
+    async def _delay(self) -> None:
+        self.request_count += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def _list_tasks(self, request: web.Request) -> web.Response:
+        """Открытые задачи; поддерживается только фильтр due:<дата>"""
+        await self._delay()
+        self.list_requests.append(request.query.get("filter"))
+        tasks = [t for t in self.tasks.values() if not t["is_completed"]]
+        query = request.query.get("filter", "")
+        if query.startswith("due:") and query[4:8].isdigit():
+            tasks = [t for t in tasks if t.get("due_date") == query[4:]]
+        return web.json_response(tasks)
+
+    async def _create_task(self, request: web.Request) -> web.Response:
+        await self._delay()
+        task = self._new_task(await request.json())
+        if task.get("due_date"):
+            task["due"] = {"date": task["due_date"], "is_recurring": False}
+        return web.json_response(task)
+
+    async def _update_task(self, request: web.Request) -> web.Response:
+        await self._delay()
+        task = self.tasks.get(request.match_info["task_id"])
+        if task is None:
+            return web.Response(status=404)
+        task.update(await request.json())
+        self._touch(task["id"])
+        return web.json_response(task)
+
+    async def _close_task(self, request: web.Request) -> web.Response:
+        await self._delay()
+        task = self.tasks.get(request.match_info["task_id"])
+        if task is None:
+            return web.Response(status=404)
+        task["is_completed"] = True
+        self._touch(task["id"])
+        return web.Response(status=204)
+
+    async def _delete_task(self, request: web.Request) -> web.Response:
+        await self._delay()
+        self._remove(request.match_info["task_id"])
+        return web.Response(status=204)
+
+    async def _list_catalog(self, request: web.Request) -> web.Response:
+        """Проекты или метки с ETag; If-None-Match с текущим ETag -> 304"""
+        await self._delay()
+        resource = request.path.strip("/")
+        self.catalog_requests += 1
+        changes = self._catalog_changed[resource]
+        etag = f'"{resource}-{max(changes.values(), default=0)}"'
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified_count += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.json_response(getattr(self, resource), headers={"ETag": etag})
+
+    async def _sync(self, request: web.Request) -> web.Response:
+        await self._delay()
+        body = await request.json()
+        sync_status = {}
+        temp_id_mapping = {}
+
+        for command in body.get("commands", []):
+            args = command.get("args", {})
+            kind = command["type"]
+            if command["uuid"] in self._commands:
+                status, task_id = self._commands[command["uuid"]]
+                sync_status[command["uuid"]] = status
+                if task_id:
+                    temp_id_mapping[command["temp_id"]] = task_id
+                continue
+            if kind == "item_add":
+                temp_id_mapping[command["temp_id"]] = self._new_task(args)["id"]
+                self._commands[command["uuid"]] = ("ok", temp_id_mapping[command["temp_id"]])
+            elif args.get("id") not in self.tasks:
+                sync_status[command["uuid"]] = {"error_code": 22, "error": "Item not found"}
+                continue
+            elif kind == "item_update":
+                self.tasks[args["id"]].update(args)
+                self._touch(args["id"])
+            elif kind == "item_close":
+                self.tasks[args["id"]]["is_completed"] = True
+                self._touch(args["id"])
+            elif kind == "item_delete":
+                self._remove(args["id"])
+            sync_status[command["uuid"]] = "ok"
+
+        response = {"sync_status": sync_status, "temp_id_mapping": temp_id_mapping}
+        if "sync_token" in body:
+            read = self._read_changes(body["sync_token"])
+            if read is None:
+                return web.json_response({"error": "Invalid sync token", "error_code": 34}, status=400)
+            response.update(read)
+        response["sync_token"] = str(self.version)
+        return web.json_response(response)
+
+    def _read_changes(self, sync_token: str) -> Optional[Dict]:
+        """Ответ на чтение Sync API: полный снимок для "*" или дельта с sync_token"""
+        def as_item(task: Dict) -> Dict:
+            return {**task, "checked": task["is_completed"]}
+
+        if sync_token == "*":
+            return {
+                "full_sync": True,
+                "items": [as_item(t) for t in self.tasks.values() if not t["is_completed"]],
+                "projects": self.projects,
+                "labels": self.labels,
+            }
+        if not sync_token.isdigit() or int(sync_token) > self.version:
+            return None
+
+        since = int(sync_token)
+        items = [as_item(self.tasks[i]) for i, v in self._changed.items() if v > since]
+        items += [{"id": i, "is_deleted": True} for i, v in self._deleted.items() if v > since]
+        catalogs = {
+            resource: [entry for entry in getattr(self, resource) if changed.get(entry["id"], 0) > since]
+            for resource, changed in self._catalog_changed.items()
+        }
+        return {"full_sync": False, "items": items, **catalogs}
+
+    @web.middleware
+    async def _limits(self, request: web.Request, handler) -> web.StreamResponse:
+        """Ограничение частоты, идемпотентность по X-Request-Id и потерянные ответы"""
+        if self.down:
+            return web.Response(status=503)
+        if self.rate_limit:
+            limit, window = self.rate_limit
+            now = asyncio.get_running_loop().time()
+            while self._recent and self._recent[0] <= now - window:
+                self._recent.popleft()
+            if len(self._recent) >= limit:
+                self.throttled_count += 1
+                retry_after = self._recent[0] + window - now
+                return web.json_response({"error": "Too Many Requests"}, status=429,
+                                         headers={"Retry-After": f"{retry_after:.3f}"})
+            self._recent.append(now)
+
+        request_id = request.headers.get("X-Request-Id")
+        if request_id in self._request_ids:
+            status, body = self._request_ids[request_id]
+            return web.Response(status=status, body=body, content_type="application/json")
+
+        response = await handler(request)
+        if request_id and response.status < 300:
+            self._request_ids[request_id] = (response.status, response.body)
+        if self.fail_after_processing > 0:
+            self.fail_after_processing -= 1
+            return web.Response(status=503)
+        return response
+
+    async def start(self) -> str:
+        """Запустить сервер на свободном порту, вернуть базовый URL"""
+        app = web.Application(middlewares=[self._limits])
+        app.router.add_get("/tasks", self._list_tasks)
+        app.router.add_post("/tasks", self._create_task)
+        app.router.add_post("/tasks/{task_id}", self._update_task)
+        app.router.add_post("/tasks/{task_id}/close", self._close_task)
+        app.router.add_delete("/tasks/{task_id}", self._delete_task)
+        app.router.add_get("/projects", self._list_catalog)
+        app.router.add_get("/labels", self._list_catalog)
+        app.router.add_post("/sync", self._sync)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.base_url = f"http://127.0.0.1:{self._runner.addresses[0][1]}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
@@ -18,6 +18,18 @@ class Config:
     
     # Todoist
     todoist_api_token: Optional[str] = None
+    todoist_backend: str = "rest"  # rest | sync
+    todoist_pool_limit: int = 20
+    todoist_pool_limit_per_host: int = 10
+    todoist_keepalive_timeout: float = 30.0
+    todoist_dns_cache_ttl: int = 300
+    todoist_export_concurrency: int = 8
+    todoist_rate_limit_retries: int = 3
+    todoist_requests_per_second: float = 1000 / 900  # лимит Todoist: 1000 запросов за 15 минут
+    todoist_request_burst: int = 1000
+    todoist_catalog_ttl: float = 300.0
+    todoist_today_ttl: float = 60.0
+    task_store: str = "yaml"  # yaml | sqlite
     
     # Gmail (планируется)
     gmail_client_id: Optional[str] = None
@@ -45,6 +57,18 @@ def load_config() -> Config:
         admin_user_id=os.getenv("BOT_ADMIN_USER_ID"),
         debug_mode=os.getenv("BOT_DEBUG_MODE", "true").lower() == "true", #False
         todoist_api_token=os.getenv("TODOIST_API_TOKEN"),
+        todoist_backend=os.getenv("TODOIST_BACKEND", "rest").lower(),
+        todoist_pool_limit=int(os.getenv("TODOIST_POOL_LIMIT", "20")),
+        todoist_pool_limit_per_host=int(os.getenv("TODOIST_POOL_LIMIT_PER_HOST", "10")),
+        todoist_keepalive_timeout=float(os.getenv("TODOIST_KEEPALIVE_TIMEOUT", "30")),
+        todoist_dns_cache_ttl=int(os.getenv("TODOIST_DNS_CACHE_TTL", "300")),
+        todoist_export_concurrency=int(os.getenv("TODOIST_EXPORT_CONCURRENCY", "8")),
+        todoist_rate_limit_retries=int(os.getenv("TODOIST_RATE_LIMIT_RETRIES", "3")),
+        todoist_requests_per_second=float(os.getenv("TODOIST_REQUESTS_PER_SECOND", str(1000 / 900))),
+        todoist_request_burst=int(os.getenv("TODOIST_REQUEST_BURST", "1000")),
+        todoist_catalog_ttl=float(os.getenv("TODOIST_CATALOG_TTL", "300")),
+        todoist_today_ttl=float(os.getenv("TODOIST_TODAY_TTL", "60")),
+        task_store=os.getenv("TASK_STORE", "yaml").lower(),
         gmail_client_id=os.getenv("GMAIL_CLIENT_ID"),
         gmail_client_secret=os.getenv("GMAIL_CLIENT_SECRET"),
         gmail_redirect_uri=os.getenv("GMAIL_REDIRECT_URI"),
@@ -6,7 +6,7 @@ from .basic_handlers import (
     start_handler, help_handler, unknown_handler
 )
 from .task_handlers import (
-    capture_handler, tasks_handler, status_handler
+    capture_handler, tasks_handler, status_handler, format_life_area_trends
 )
 from .review_handlers import (
     review_handler, assess_handler, schedule_handler
@@ -17,7 +17,7 @@ from .tracking_handlers import (
 
 __all__ = [
     'start_handler', 'help_handler', 'unknown_handler',
-    'capture_handler', 'tasks_handler', 'status_handler',
+    'capture_handler', 'tasks_handler', 'status_handler', 'format_life_area_trends',
     'review_handler', 'assess_handler', 'schedule_handler',
     'mood_handler', 'habits_handler'
 ] 
\ No newline at end of file
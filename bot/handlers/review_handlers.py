@@ -6,7 +6,7 @@ import logging
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
-from ..services.memory_service import MemoryService
+from ..services.container import get_services
 
 logger = logging.getLogger(__name__)
 
@@ -97,8 +97,7 @@ async def assess_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     # Пытаемся получить текущие оценки
     try:
-        from ..services.memory_service import MemoryService
-        memory_service = MemoryService()
+        memory_service = get_services(context).memory_service
         current_scores = await memory_service.get_life_area_scores()
         
         if current_scores:
@@ -9,9 +9,8 @@ from typing import List
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
-from ..services.todoist_service import TodoistService
-from ..services.memory_service import MemoryService
-from ..config import Config
+from ..services.assessment_history import AreaTrend
+from ..services.container import get_services
 
 logger = logging.getLogger(__name__)
 
@@ -29,17 +28,16 @@ async def capture_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
     
     try:
-        # Создаем экземпляры сервисов
-        config = Config()
-        memory_service = MemoryService()
-        todoist_service = TodoistService(config) if config.todoist_api_token else None
+        # Используем общие сервисы процесса
+        services = get_services(context)
+        memory_service = services.memory_service
         
         # Сохраняем задачу
         await memory_service.save_task(content)
         
-        # Если настроен Todoist, создаем задачу там
-        if todoist_service:
-            await todoist_service.create_task(content)
+        # Если настроен Todoist, ставим задачу в outbox — создание идет в фоне
+        if services.task_outbox:
+            services.task_outbox.enqueue(content)
         
         await update.message.reply_text(f"✅ Задача захвачена: \"{content}\"")
         logger.info(f"Задача захвачена пользователем {update.effective_user.id}: {content}")
@@ -54,8 +52,8 @@ async def tasks_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
     
     try:
-        config = Config()
-        todoist_service = TodoistService(config) if config.todoist_api_token else None
+        services = get_services(context)
+        todoist_service = services.todoist
         
         if todoist_service:
             # Получаем задачи из Todoist
@@ -65,14 +63,18 @@ async def tasks_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 await update.message.reply_text("📋 На сегодня задач нет. Отличная работа! 🎉")
                 return
             
+            # Названия проектов берутся из кэша сервиса, без отдельного запроса
+            project_names = await todoist_service.get_project_names()
+            
             # Формируем список задач
             task_list = []
             for i, task in enumerate(tasks, 1):
                 priority_emoji = ['🔵', '🟢', '🟡', '🔴'][task.priority - 1] if task.priority <= 4 else '⚪'
-                due_date = f" ({task.due.date})" if task.due else ""
+                due_date = f" ({task.due.get('date')})" if task.due else ""
                 labels = f" [{', '.join(task.labels)}]" if task.labels else ""
+                project = f" 📁 {project_names[task.project_id]}" if task.project_id in project_names else ""
                 
-                task_text = f"{i}. {priority_emoji} {task.content}{due_date}{labels}"
+                task_text = f"{i}. {priority_emoji} {task.content}{due_date}{labels}{project}"
                 task_list.append(task_text)
             
             tasks_text = "\n".join(task_list)
@@ -94,7 +96,7 @@ async def tasks_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             
         else:
             # Локальные задачи
-            memory_service = MemoryService()
+            memory_service = services.memory_service
             tasks = await memory_service.get_today_tasks()
             
             if not tasks:
@@ -120,7 +122,7 @@ async def tasks_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def status_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик команды /status"""
     try:
-        memory_service = MemoryService()
+        memory_service = get_services(context).memory_service
         areas = await memory_service.get_life_areas_status()
         
         if not areas:
@@ -153,6 +155,8 @@ async def status_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 ))
             keyboard.append(row)
         
+        keyboard.append([InlineKeyboardButton("📈 Тренды", callback_data="show_trends")])
+        
         reply_markup = InlineKeyboardMarkup(keyboard)
         
         await update.message.reply_text(
@@ -165,4 +169,24 @@ async def status_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
     except Exception as e:
         logger.error(f"Ошибка при получении статуса: {e}")
-        await update.message.reply_text("❌ Произошла ошибка при получении статуса") 
\ No newline at end of file
+        await update.message.reply_text("❌ Произошла ошибка при получении статуса")
+
+
+def format_life_area_trends(trends: List[AreaTrend]) -> str:
+    """Текст трендов жизненных областей для кнопки "Тренды" в /status"""
+    if not trends:
+        return "📈 Пока нет истории оценок.\n\nОцените области с помощью /assess"
+    
+    lines = []
+    for trend in trends:
+        line = f"*{trend.area}*: {trend.last}/10"
+        if trend.week_mean is not None:
+            line += f" · неделя {trend.week_mean:.1f}"
+            if trend.week_delta is not None:
+                arrow = "↑" if trend.week_delta > 0.05 else "↓" if trend.week_delta < -0.05 else "→"
+                line += f" ({arrow}{abs(trend.week_delta):.1f})"
+        if trend.month_mean is not None:
+            line += f" · месяц {trend.month_mean:.1f} ({trend.month_min}–{trend.month_max})"
+        lines.append(line)
+    
+    return "📈 *Тренды жизненных областей:*\n\n" + "\n".join(lines)
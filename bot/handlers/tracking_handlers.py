@@ -6,7 +6,7 @@ import logging
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
-from ..services.memory_service import MemoryService
+from ..services.container import get_services
 
 logger = logging.getLogger(__name__)
 
@@ -136,7 +136,7 @@ async def habits_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def _save_mood(score: int, update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Сохранить настроение"""
     try:
-        memory_service = MemoryService()
+        memory_service = get_services(context).memory_service
         await memory_service.save_mood(score)
         
         emoji = _get_mood_emoji(score)
@@ -152,7 +152,7 @@ async def _save_mood(score: int, update: Update, context: ContextTypes.DEFAULT_T
 async def _save_habit(habit: str, update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Сохранить привычку"""
     try:
-        memory_service = MemoryService()
+        memory_service = get_services(context).memory_service
         await memory_service.save_habit(habit)
         
         await update.message.reply_text(f"✅ Привычка отмечена: {habit}")
@@ -23,10 +23,9 @@ from .config import Config, load_config
 from .handlers import (
     start_handler, help_handler, capture_handler, tasks_handler,
     status_handler, review_handler, assess_handler, schedule_handler,
-    mood_handler, habits_handler, unknown_handler
+    mood_handler, habits_handler, unknown_handler, format_life_area_trends
 )
-from .services.todoist_service import TodoistService
-from .services.memory_service import MemoryService
+from .services.container import ServiceContainer, SERVICES_KEY
 from .utils.logger import setup_logging
 
 # Load environment variables
@@ -44,8 +43,9 @@ class LifeOSBot:
     
     def __init__(self):
         self.config = load_config()
-        self.todoist_service = TodoistService(self.config)
-        self.memory_service = MemoryService()
+        self.services = ServiceContainer.from_config(self.config)
+        self.todoist_service = self.services.todoist_service
+        self.memory_service = self.services.memory_service
         self.application = None
         
     async def post_init(self, app: Application) -> None:
@@ -65,9 +65,17 @@ class LifeOSBot:
         await app.bot.set_my_commands(commands)
         logger.info("Команды бота настроены")
         
+        # Фоновая отправка задач из outbox (в том числе оставшихся с прошлого запуска)
+        self.services.start()
+        
         # Отправляем уведомление администратору о запуске
         await self.send_admin_startup_notification()
     
+    async def post_shutdown(self, app: Application) -> None:
+        """Выполняется при остановке приложения"""
+        await self.services.close()
+        logger.info("Сервисы остановлены")
+    
     def setup_handlers(self):
         """Настройка обработчиков сообщений"""
         
@@ -207,6 +215,18 @@ class LifeOSBot:
                         "❌ Ошибка при получении оценок",
                         reply_markup=query.message.reply_markup
                     )
+            elif data == "show_trends":
+                # Тренды оценок по истории (кнопка в /status)
+                try:
+                    trends = await self.memory_service.get_life_area_trends()
+                    await query.edit_message_text(
+                        format_life_area_trends(trends),
+                        parse_mode='Markdown',
+                        reply_markup=query.message.reply_markup
+                    )
+                except Exception as e:
+                    logger.error(f"Ошибка при получении трендов: {e}")
+                    await query.edit_message_text("❌ Ошибка при получении трендов")
             elif data.startswith("habit_complete:"):
                 # Пользователь отметил выполнение привычки
                 habit = data.split(":", 1)[1]
@@ -251,7 +271,9 @@ class LifeOSBot:
                     if habits:
                         stats_text = "📊 *Статистика привычек:*\n\n"
                         for habit, count in habits.items():
-                            stats_text += f"• {habit.replace('_', ' ').title()}: {count} раз\n"
+                            streak = await self.memory_service.get_habit_streak(habit, days=365)
+                            streak_text = f", серия {streak} дн. 🔥" if streak > 1 else ""
+                            stats_text += f"• {habit.replace('_', ' ').title()}: {count} раз{streak_text}\n"
                     else:
                         stats_text = "📊 Пока нет отмеченных привычек.\n\nНачните отслеживать привычки!"
                     
@@ -319,9 +341,9 @@ class LifeOSBot:
             # Сохраняем в локальный файл
             await self.memory_service.save_task(content)
             
-            # Если настроен Todoist, создаем задачу там
-            if self.config.todoist_api_token:
-                await self.todoist_service.create_task(content)
+            # Если настроен Todoist, ставим задачу в outbox — создание идет в фоне
+            if self.services.task_outbox:
+                self.services.task_outbox.enqueue(content)
                 
             logger.info(f"Задача захвачена: {content}")
             
@@ -418,8 +440,12 @@ class LifeOSBot:
                 # Создаем приложение
                 self.application = Application.builder().token(self.config.telegram_token).build()
                 
+                # Регистрируем общие сервисы для обработчиков
+                self.application.bot_data[SERVICES_KEY] = self.services
+                
                 # post_init для асинхронной настройки команд
                 self.application.post_init = self.post_init
+                self.application.post_shutdown = self.post_shutdown
                 
                 # Настраиваем обработчики
                 self.setup_handlers()
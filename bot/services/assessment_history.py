@@ -0,0 +1,189 @@
+"""
+История оценок жизненных областей: колоночное хранилище на array
+"""
+
+import itertools
+import json
+import logging
+import os
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DAY = 24 * 60 * 60
+WEEK = 7 * DAY
+MONTH = 30 * DAY
+
+
+@dataclass
+class AreaTrend:
+    """Тренд одной области на момент времени"""
+    area: str
+    last: int
+    count: int
+    week_mean: Optional[float] = None
+    month_mean: Optional[float] = None
+    month_min: Optional[int] = None
+    month_max: Optional[int] = None
+    week_delta: Optional[float] = None
+
+
+class AreaSeries:
+    """Оценки одной области: колонки времени (int64, unix-секунды) и оценки (uint8)
+
+    Времена не убывают; prefix[i] — сумма первых i оценок. Среднее в любом
+    окне — два бинарных поиска и одно вычитание, минимум и максимум — проход
+    по срезу array без создания объектов на каждую точку.
+    """
+
+    __slots__ = ("timestamps", "scores", "prefix")
+
+    def __init__(self, timestamps: Optional[array] = None, scores: Optional[array] = None):
+        self._rebuild(timestamps if timestamps is not None else array("q"),
+                      scores if scores is not None else array("B"))
+
+    def _rebuild(self, timestamps: array, scores: array) -> None:
+        if any(a > b for a, b in zip(timestamps, timestamps[1:])):
+            order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+            timestamps = array("q", (timestamps[i] for i in order))
+            scores = array("B", (scores[i] for i in order))
+        self.timestamps, self.scores = timestamps, scores
+        self.prefix = array("q", [0])
+        self.prefix.extend(itertools.accumulate(scores))
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def append(self, timestamp: int, score: int) -> None:
+        if self.timestamps and timestamp < self.timestamps[-1]:
+            # Оценка "в прошлое" (перевод часов) — редкий случай, пересобираем серию
+            self._rebuild(self.timestamps + array("q", [timestamp]), self.scores + array("B", [score]))
+            return
+        self.timestamps.append(timestamp)
+        self.scores.append(score)
+        self.prefix.append(self.prefix[-1] + score)
+
+    def _window(self, start: int, end: int) -> Tuple[int, int]:
+        """Индексы точек с временем в (start, end]"""
+        return bisect_right(self.timestamps, start), bisect_right(self.timestamps, end)
+
+    def mean(self, start: int, end: int) -> Optional[float]:
+        i, j = self._window(start, end)
+        return (self.prefix[j] - self.prefix[i]) / (j - i) if j > i else None
+
+    def min_max(self, start: int, end: int) -> Optional[Tuple[int, int]]:
+        i, j = self._window(start, end)
+        if j <= i:
+            return None
+        window = self.scores[i:j]
+        return min(window), max(window)
+
+    def rolling_mean(self, window: int, step: int, start: int, end: int) -> List[Tuple[int, Optional[float]]]:
+        """Скользящее среднее за window секунд в точках start, start + step, ... end"""
+        timestamps, prefix = self.timestamps, self.prefix
+        points = range(start, end + 1, step)
+        lows = [bisect_right(timestamps, point - window) for point in points]
+        highs = [bisect_right(timestamps, point) for point in points]
+        return [
+            (point, (prefix[j] - prefix[i]) / (j - i) if j > i else None)
+            for point, i, j in zip(points, lows, highs)
+        ]
+
+    def trend(self, area: str, now: int) -> AreaTrend:
+        week_mean = self.mean(now - WEEK, now)
+        previous_week = self.mean(now - 2 * WEEK, now - WEEK)
+        month = self.min_max(now - MONTH, now)
+        i = bisect_right(self.timestamps, now)
+        return AreaTrend(
+            area=area,
+            last=self.scores[i - 1] if i else 0,
+            count=i,
+            week_mean=week_mean,
+            month_mean=self.mean(now - MONTH, now),
+            month_min=month[0] if month else None,
+            month_max=month[1] if month else None,
+            week_delta=week_mean - previous_week if week_mean is not None and previous_week is not None else None,
+        )
+
+
+class AssessmentHistory:
+    """Все оценки жизненных областей, по паре колоночных файлов на область
+
+    <n>.ts — времена (int64), <n>.score — оценки (uint8), оба append-only;
+    areas.json сопоставляет название области номеру файлов. Точка занимает
+    9 байт. Если запись оборвалась между файлами, при загрузке колонки
+    обрезаются до общей длины.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.areas_path = os.path.join(directory, "areas.json")
+        self._files: Dict[str, str] = {}
+        self._series: Dict[str, AreaSeries] = {}
+
+    def _column_path(self, area: str, column: str) -> str:
+        return os.path.join(self.directory, f"{self._files[area]}.{column}")
+
+    @staticmethod
+    def _read_column(path: str, typecode: str) -> array:
+        column = array(typecode)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return column
+        column.frombytes(data[:len(data) - len(data) % column.itemsize])
+        return column
+
+    def load(self) -> "AssessmentHistory":
+        """Загрузить историю с диска"""
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.areas_path):
+            with open(self.areas_path, "r", encoding="utf-8") as f:
+                self._files = json.load(f)
+        for area in self._files:
+            timestamps = self._read_column(self._column_path(area, "ts"), "q")
+            scores = self._read_column(self._column_path(area, "score"), "B")
+            length = min(len(timestamps), len(scores))
+            if length != len(timestamps) or length != len(scores):
+                logger.warning(f"История области '{area}' обрезана до {length} точек после неполной записи")
+                del timestamps[length:], scores[length:]
+            self._series[area] = AreaSeries(timestamps, scores)
+        return self
+
+    def _register(self, area: str) -> None:
+        self._files[area] = str(len(self._files))
+        tmp_path = f"{self.areas_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._files, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.areas_path)
+        self._series[area] = AreaSeries()
+
+    def append(self, area: str, timestamp: int, score: int) -> None:
+        """Добавить оценку области (unix-время в секундах, оценка 0..255)"""
+        if area not in self._files:
+            self._register(area)
+        self._series[area].append(timestamp, score)
+        with open(self._column_path(area, "ts"), "ab") as f:
+            array("q", [timestamp]).tofile(f)
+        with open(self._column_path(area, "score"), "ab") as f:
+            array("B", [score]).tofile(f)
+
+    def areas(self) -> List[str]:
+        return list(self._series)
+
+    def series(self, area: str) -> Optional[AreaSeries]:
+        return self._series.get(area)
+
+    def is_empty(self) -> bool:
+        return not any(self._series.values())
+
+    def trends(self, now: int) -> List[AreaTrend]:
+        """Тренды всех областей, у которых есть оценки не позже now"""
+        trends = [series.trend(area, now) for area, series in self._series.items()]
+        return [trend for trend in trends if trend.count]
@@ -0,0 +1,67 @@
+"""
+Контейнер сервисов, общих для всех обработчиков
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from ..config import Config, load_config
+from .memory_service import MemoryService
+from .task_outbox import TaskOutbox
+from .todoist_service import TodoistService
+
+logger = logging.getLogger(__name__)
+
+# Ключ контейнера в context.bot_data
+SERVICES_KEY = "services"
+
+
+@dataclass
+class ServiceContainer:
+    """Единственные на процесс экземпляры конфигурации и сервисов"""
+    config: Config
+    memory_service: MemoryService
+    todoist_service: TodoistService
+    task_outbox: Optional[TaskOutbox] = None
+
+    @classmethod
+    def from_config(cls, config: Config) -> "ServiceContainer":
+        """Создать контейнер и все сервисы по конфигурации"""
+        todoist_service = TodoistService(config)
+        task_outbox = None
+        if config.todoist_api_token:
+            task_outbox = TaskOutbox(todoist_service.memory_path / "outbox.db", todoist_service)
+        return cls(
+            config=config,
+            memory_service=MemoryService(config.memory_path),
+            todoist_service=todoist_service,
+            task_outbox=task_outbox,
+        )
+
+    @property
+    def todoist(self) -> Optional[TodoistService]:
+        """Сервис Todoist, если настроен токен"""
+        return self.todoist_service if self.config.todoist_api_token else None
+
+    def start(self) -> None:
+        """Запустить фоновые обработчики (вызывается в работающем цикле событий)"""
+        if self.task_outbox:
+            self.task_outbox.start()
+
+    async def close(self) -> None:
+        """Освободить ресурсы сервисов"""
+        if self.task_outbox:
+            await self.task_outbox.close()
+        await self.memory_service.close()
+        await self.todoist_service.close()
+
+
+def get_services(context) -> ServiceContainer:
+    """Получить контейнер сервисов из context.bot_data (создается при первом обращении)"""
+    services = context.bot_data.get(SERVICES_KEY)
+    if services is None:
+        logger.warning("Контейнер сервисов не зарегистрирован, создаем из окружения")
+        services = ServiceContainer.from_config(load_config())
+        context.bot_data[SERVICES_KEY] = services
+    return services
@@ -0,0 +1,274 @@
+"""
+Журнал событий памяти: append-only JSONL с индексом времени
+"""
+
+import asyncio
+import json
+import logging
+import os
+import struct
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import aiofiles
+
+from ..utils.file_reader import read_lines_reversed
+
+logger = logging.getLogger(__name__)
+
+# Запись индекса: unix-время события и смещение строки в журнале (байты)
+INDEX_RECORD = struct.Struct("<qq")
+
+# Размер блока при поиске последнего перевода строки в журнале
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+class EventLog:
+    """Журнал событий одного потока (mood, habits, ideas, tasks)
+
+    События пишутся строками JSON в <stream>.jsonl, а в <stream>.idx для
+    каждого события добавляется запись фиксированной длины (время, смещение).
+    Время событий не убывает, поэтому по индексу можно искать бинарным
+    поиском и читать журнал с нужного места, не сканируя всю историю.
+    """
+
+    def __init__(self, directory: str, stream: str):
+        self.stream = stream
+        self.log_path = os.path.join(directory, f"{stream}.jsonl")
+        self.index_path = os.path.join(directory, f"{stream}.idx")
+        self._lock = asyncio.Lock()
+        self._checked = False
+
+    @staticmethod
+    def _encode(timestamp: datetime, fields: Dict) -> Tuple[int, bytes]:
+        event = {"ts": timestamp.isoformat(timespec="seconds"), **fields}
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        return int(timestamp.timestamp()), line.encode("utf-8")
+
+    @staticmethod
+    def _decode(line: bytes) -> Dict:
+        event = json.loads(line)
+        event["ts"] = datetime.fromisoformat(event["ts"])
+        return event
+
+    def count(self) -> int:
+        """Количество событий в журнале"""
+        try:
+            return os.path.getsize(self.index_path) // INDEX_RECORD.size
+        except OSError:
+            return 0
+
+    def exists(self) -> bool:
+        return os.path.exists(self.log_path)
+
+    async def _truncate_torn_tail(self) -> int:
+        """Обрезать журнал до последнего перевода строки и вернуть его размер
+
+        Незавершенная последняя строка — след оборванной записи; если ее
+        оставить, следующее событие допишется прямо к ней и склеится с ней.
+        """
+        log_size = os.path.getsize(self.log_path)
+        end = log_size
+        async with aiofiles.open(self.log_path, "r+b") as f:
+            while end > 0:
+                start = max(0, end - TAIL_BLOCK_SIZE)
+                await f.seek(start)
+                newline = (await f.read(end - start)).rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            if end < log_size:
+                logger.warning(f"Журнал {self.stream}: отброшена оборванная запись ({log_size - end} байт)")
+                await f.truncate(end)
+        return end
+
+    async def _repair_index(self) -> None:
+        """Восстановить журнал и индекс после оборванной записи
+
+        Отрезает недописанную строку журнала, неполные записи индекса и записи,
+        указывающие за конец журнала, затем доиндексирует хвост журнала, если
+        запись индекса не успела сохраниться. Вызывается под self._lock.
+        """
+        if not self.exists():
+            return
+
+        log_size = await self._truncate_torn_tail()
+        count = self.count()
+        last_offset = None
+        while count:
+            _, last_offset = await self._read_index_record(count - 1)
+            if last_offset < log_size:
+                break
+            count -= 1
+            last_offset = None
+        if os.path.exists(self.index_path) and os.path.getsize(self.index_path) != count * INDEX_RECORD.size:
+            logger.warning(f"Индекс журнала {self.stream} обрезан до {count} записей")
+            os.truncate(self.index_path, count * INDEX_RECORD.size)
+
+        start = 0
+        if last_offset is not None:
+            async with aiofiles.open(self.log_path, "rb") as f:
+                await f.seek(last_offset)
+                start = last_offset + len(await f.readline())
+
+        if start >= log_size:
+            return
+
+        logger.warning(f"Индекс журнала {self.stream} отстает, переиндексация с байта {start}")
+        records = []
+        async with aiofiles.open(self.log_path, "rb") as f:
+            await f.seek(start)
+            offset = start
+            async for line in f:
+                records.append(INDEX_RECORD.pack(int(self._decode(line)["ts"].timestamp()), offset))
+                offset += len(line)
+
+        async with aiofiles.open(self.index_path, "ab") as f:
+            await f.write(b"".join(records))
+
+    async def _ensure_checked(self) -> None:
+        """Проверить журнал при первом обращении (вызывается под self._lock)"""
+        if not self._checked:
+            await self._repair_index()
+            self._checked = True
+
+    async def _ensure_checked_for_read(self) -> None:
+        """То же для чтения: проверка не должна пересечься с дозаписью"""
+        if not self._checked:
+            async with self._lock:
+                await self._ensure_checked()
+
+    async def append_many(self, events: Iterable[Tuple[datetime, Dict]]) -> None:
+        """Добавить события в конец журнала"""
+        async with self._lock:
+            await self._ensure_checked()
+            offset = os.path.getsize(self.log_path) if self.exists() else 0
+            lines = []
+            records = []
+            for timestamp, fields in events:
+                ts, line = self._encode(timestamp, fields)
+                records.append(INDEX_RECORD.pack(ts, offset))
+                lines.append(line)
+                offset += len(line)
+
+            if not lines:
+                return
+
+            async with aiofiles.open(self.log_path, "ab") as f:
+                await f.write(b"".join(lines))
+            async with aiofiles.open(self.index_path, "ab") as f:
+                await f.write(b"".join(records))
+
+    async def append(self, timestamp: datetime, fields: Dict) -> None:
+        """Добавить одно событие"""
+        await self.append_many([(timestamp, fields)])
+
+    async def _read_index_record(self, position: int) -> Tuple[int, int]:
+        async with aiofiles.open(self.index_path, "rb") as f:
+            await f.seek(position * INDEX_RECORD.size)
+            return INDEX_RECORD.unpack(await f.read(INDEX_RECORD.size))
+
+    async def _bisect(self, ts: int) -> int:
+        """Позиция первого события с временем >= ts"""
+        low, high = 0, self.count()
+        async with aiofiles.open(self.index_path, "rb") as f:
+            while low < high:
+                middle = (low + high) // 2
+                await f.seek(middle * INDEX_RECORD.size)
+                record_ts, _ = INDEX_RECORD.unpack(await f.read(INDEX_RECORD.size))
+                if record_ts < ts:
+                    low = middle + 1
+                else:
+                    high = middle
+        return low
+
+    async def _read_from(self, position: int, until: Optional[datetime] = None) -> List[Dict]:
+        """Прочитать события начиная с позиции в индексе"""
+        if position >= self.count():
+            return []
+
+        _, offset = await self._read_index_record(position)
+        events = []
+        async with aiofiles.open(self.log_path, "rb") as f:
+            await f.seek(offset)
+            async for line in f:
+                if not line.endswith(b"\n"):
+                    # Событие еще дописывается
+                    break
+                event = self._decode(line)
+                if until is not None and event["ts"] > until:
+                    break
+                events.append(event)
+        return events
+
+    async def read_range(self, since: datetime, until: Optional[datetime] = None) -> List[Dict]:
+        """События в интервале [since, until]"""
+        if not self.exists():
+            return []
+        await self._ensure_checked_for_read()
+        return await self._read_from(await self._bisect(int(since.timestamp())), until)
+
+    async def iter_reversed(self) -> AsyncIterator[Dict]:
+        """События от последнего к первому (журнал читается с конца блоками)"""
+        if not self.exists():
+            return
+        await self._ensure_checked_for_read()
+        end = self.size()
+        # Последняя строка без перевода строки — событие, которое еще дописывается
+        async with aiofiles.open(self.log_path, "rb") as f:
+            await f.seek(max(0, end - 1))
+            skip_last = end > 0 and await f.read(1) != b"\n"
+        lines = read_lines_reversed(self.log_path, end=end)
+        try:
+            async for line in lines:
+                if skip_last:
+                    skip_last = False
+                    continue
+                yield self._decode(line)
+        finally:
+            await lines.aclose()
+
+    async def read_last(self, count: int) -> List[Dict]:
+        """Последние count событий"""
+        events = []
+        if count <= 0:
+            return events
+        reversed_events = self.iter_reversed()
+        try:
+            async for event in reversed_events:
+                events.append(event)
+                if len(events) >= count:
+                    break
+        finally:
+            await reversed_events.aclose()
+        events.reverse()
+        return events
+
+    async def read_after(self, offset: int) -> Tuple[List[Dict], int]:
+        """События, записанные начиная с байтового смещения, и смещение конца журнала"""
+        events = []
+        if not self.exists():
+            return events, 0
+        async with aiofiles.open(self.log_path, "rb") as f:
+            await f.seek(offset)
+            async for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                events.append(self._decode(line))
+                offset += len(line)
+        return events, offset
+
+    def size(self) -> int:
+        """Размер журнала в байтах"""
+        try:
+            return os.path.getsize(self.log_path)
+        except OSError:
+            return 0
+
+    async def read_all(self) -> List[Dict]:
+        """Все события журнала"""
+        if not self.exists():
+            return []
+        await self._ensure_checked_for_read()
+        return await self._read_from(0)
@@ -0,0 +1,103 @@
+"""
+Локальный кэш метаданных сообщений Gmail
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+
+class GmailMetadataCache:
+    """Кэш разобранных заголовков сообщений (SQLite) с вытеснением LRU
+
+    Метаданные сообщения Gmail после получения не меняются, поэтому запись по
+    id никогда не устаревает — ограничивается только размер кэша. Здесь же
+    хранится последний historyId и список id последних сообщений, чтобы
+    "последние сообщения" запрашивали только новые id через history.list.
+    """
+
+    def __init__(self, path: str, max_entries: int = 5000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS messages (
+                    id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_messages_accessed_at ON messages(accessed_at);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+
+    def get_many(self, message_ids: List[str]) -> Dict[str, Dict]:
+        """Найти сообщения в кэше; обновляет время доступа и счетчики попаданий"""
+        found = {}
+        for offset in range(0, len(message_ids), 500):
+            chunk = message_ids[offset:offset + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(f"SELECT id, data FROM messages WHERE id IN ({placeholders})", chunk)
+            found.update((message_id, json.loads(data)) for message_id, data in rows)
+
+        if found:
+            now = time.time()
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE messages SET accessed_at = ? WHERE id = ?", ((now, i) for i in found)
+                )
+
+        self.hits += len(found)
+        self.misses += len(message_ids) - len(found)
+        return found
+
+    def put_many(self, messages: Iterable[Dict]) -> None:
+        """Сохранить метаданные сообщений и вытеснить самые старые по доступу"""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO messages (id, data, accessed_at) VALUES (?, ?, ?)",
+                ((m['id'], json.dumps(m, ensure_ascii=False), now) for m in messages),
+            )
+            overflow = self.conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self.conn.execute(
+                    "DELETE FROM messages WHERE id IN "
+                    "(SELECT id FROM messages ORDER BY accessed_at LIMIT ?)", (overflow,)
+                )
+
+    def get_meta(self, key: str, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key: str, value) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value))
+            )
+
+    def stats(self) -> Dict[str, float]:
+        """Метрики кэша: попадания, промахи, доля попаданий, размер"""
+        total = self.hits + self.misses
+        size = self.conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": size,
+        }
+
+    def close(self) -> None:
+        self.conn.close()
@@ -4,14 +4,25 @@
 
 import os
 import json
+import asyncio
+import functools
 import logging
-from typing import List, Dict, Optional
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, List, Dict, Optional
+from datetime import datetime, timezone
+import google_auth_httplib2
+import httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest
+
+from .gmail_cache import GmailMetadataCache
+from ..utils.rate_limit import RateLimiter, RetryHint, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +33,128 @@ SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 TOKEN_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'scripts', 'token.json')
 CREDENTIALS_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'scripts', 'credentials.json')
 
+# Batch-запросы Gmail: не больше 100 вызовов в одном HTTP-запросе
+GMAIL_BATCH_URI = "https://gmail.googleapis.com/batch/gmail/v1"
+GMAIL_BATCH_SIZE = 100
+
+# Заголовки, которые нужны для отображения сообщения
+METADATA_HEADERS = ['Subject', 'From', 'Date']
+
+# Локальный кэш метаданных и сколько id последних сообщений в нем помнить
+CACHE_PATH = os.path.join('memory', 'gmail', 'metadata.db')
+RECENT_IDS_LIMIT = 100
+
+# Квота Gmail считается в единицах: messages.list/get — 5, history.list — 2, getProfile — 1
+QUOTA_UNITS_PER_SECOND = 250
+MESSAGE_QUOTA_UNITS = 5
+
+# Временные ответы Gmail, после которых запрос можно повторить
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded')
+
+# За сколько секунд до истечения токена обновлять его в фоне
+TOKEN_REFRESH_MARGIN = 300
+
+
+@functools.lru_cache(maxsize=None)
+def _discovery_document() -> Optional[Dict]:
+    """Discovery-документ Gmail v1 из статической копии googleapiclient (без сети)
+    
+    Читается и разбирается один раз на процесс; None, если копии нет.
+    """
+    document = get_static_doc('gmail', 'v1')
+    return json.loads(document) if document else None
+
 
 class GmailService:
     """Сервис для работы с Gmail API"""
     
-    def __init__(self):
+    def __init__(self, max_workers: int = 4, cache_path: Optional[str] = CACHE_PATH,
+                 cache_size: int = 5000, quota_units_per_second: float = QUOTA_UNITS_PER_SECOND):
         self.service = None
         self.creds = None
+        self.batch_uri = GMAIL_BATCH_URI
+        self.cache = GmailMetadataCache(cache_path, cache_size) if cache_path else None
+        self._messages_resource = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.limiter = RateLimiter(
+            "Gmail", rate=quota_units_per_second, capacity=quota_units_per_second
+        )
+        
+        # googleapiclient синхронный: все вызовы идут в отдельный ограниченный пул,
+        # чтобы не блокировать цикл событий Telegram
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gmail")
+        self._thread_local = threading.local()
+    
+    async def _run_blocking(self, func: Callable, *args, **kwargs) -> Any:
+        """Выполнить блокирующую функцию в пуле потоков Gmail"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    def _thread_http(self) -> Optional[google_auth_httplib2.AuthorizedHttp]:
+        """Http-клиент текущего потока (httplib2 не потокобезопасен)"""
+        if self.creds is None:
+            return None
+        http = getattr(self._thread_local, "http", None)
+        if http is None:
+            http = google_auth_httplib2.AuthorizedHttp(self.creds, http=httplib2.Http())
+            self._thread_local.http = http
+        return http
+    
+    def _execute_request(self, request) -> Dict:
+        """Выполнить запрос googleapiclient (вызывается в рабочем потоке)"""
+        http = self._thread_http()
+        return request.execute(http=http) if http else request.execute()
+    
+    @staticmethod
+    def _classify_error(error: Exception) -> Optional[RetryHint]:
+        """Какие ошибки Gmail временные: 429, 5xx и 403 с превышением квоты"""
+        if not isinstance(error, HttpError):
+            return None
+        status = error.resp.status
+        retry_after = parse_retry_after(error.resp.get('retry-after'))
+        throttled = status == 429 or (
+            status == 403 and any(reason in str(error.content) for reason in RATE_LIMIT_REASONS)
+        )
+        if throttled:
+            return RetryHint(retry_after=retry_after, throttled=True, not_applied=True)
+        if status in RETRYABLE_STATUSES:
+            return RetryHint(retry_after=retry_after)
+        return None
+    
+    async def _execute(self, request, cost: float = MESSAGE_QUOTA_UNITS) -> Dict:
+        """Выполнить запрос googleapiclient через ограничитель квоты, не блокируя цикл событий
+        
+        Все запросы сервиса — чтение, поэтому временные ошибки повторяются.
+        """
+        return await self.limiter.call(
+            lambda: self._run_blocking(self._execute_request, request),
+            classify=self._classify_error,
+            cost=cost,
+        )
+    
+    def _messages(self):
+        """Ресурс users().messages() текущего клиента
+        
+        Каждый вызов users().messages() заново собирает методы из discovery-
+        документа (несколько килобайт и заметное время), поэтому ресурс
+        создается один раз на клиент.
+        """
+        if self._messages_resource is None or self._messages_resource[0] is not self.service:
+            self._messages_resource = (self.service, self.service.users().messages())
+        return self._messages_resource[1]
+    
+    def close(self) -> None:
+        """Остановить пул потоков Gmail, фоновое обновление токена и закрыть кэш"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+        self._executor.shutdown(wait=False)
+        if self.cache:
+            self.cache.close()
+    
+    def get_cache_stats(self) -> Dict[str, float]:
+        """Метрики попаданий в кэш метаданных"""
+        return self.cache.stats() if self.cache else {}
     
     def _load_saved_credentials(self) -> Optional[Credentials]:
         """Загрузить сохраненные учетные данные"""
@@ -81,11 +207,45 @@ class GmailService:
         
         return creds
     
+    @staticmethod
+    def _build_service(creds: Credentials):
+        """Клиент Gmail из закэшированного discovery-документа"""
+        document = _discovery_document()
+        if document is None:
+            return build('gmail', 'v1', credentials=creds)
+        return build_from_document(document, credentials=creds)
+    
+    def _refresh_credentials(self) -> None:
+        """Обновить токен доступа и сохранить его (вызывается в рабочем потоке)"""
+        self.creds.refresh(Request())
+        self._save_credentials(self.creds)
+        logger.info("Токен Gmail обновлен")
+    
+    async def _refresh_loop(self) -> None:
+        """Обновлять токен заранее, чтобы запросы не ждали обновления при истечении"""
+        while self.creds and self.creds.refresh_token and self.creds.expiry:
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            delay = (self.creds.expiry - now).total_seconds() - TOKEN_REFRESH_MARGIN
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await self._run_blocking(self._refresh_credentials)
+            except Exception as e:
+                logger.error(f"Ошибка фонового обновления токена: {e}")
+                await asyncio.sleep(60)
+    
     async def connect(self) -> None:
-        """Подключиться к Gmail API"""
+        """Подключиться к Gmail API
+        
+        Учетные данные держатся в памяти: token.json читается только при первом
+        подключении или если токен стал невалидным.
+        """
         try:
-            self.creds = self._authorize()
-            self.service = build('gmail', 'v1', credentials=self.creds)
+            if not (self.creds and self.creds.valid):
+                self.creds = await self._run_blocking(self._authorize)
+            self.service = await self._run_blocking(self._build_service, self.creds)
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self._refresh_loop())
             logger.info("Подключение к Gmail API установлено")
         except Exception as e:
             logger.error(f"Ошибка подключения к Gmail API: {e}")
@@ -97,10 +257,10 @@ class GmailService:
             await self.connect()
         
         try:
-            response = self.service.users().messages().list(
+            response = await self._execute(self._messages().list(
                 userId='me',
                 maxResults=max_results
-            ).execute()
+            ))
             
             messages = response.get('messages', [])
             if not messages:
@@ -114,74 +274,223 @@ class GmailService:
             logger.error(f"Ошибка Gmail API: {error}")
             return []
     
+    @staticmethod
+    def _parse_message(message: Dict) -> Dict:
+        """Извлечь тему, отправителя и дату из ответа messages.get"""
+        headers = message.get('payload', {}).get('headers', [])
+        subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), '')
+        sender = next((h['value'] for h in headers if h['name'].lower() == 'from'), '')
+        date = next((h['value'] for h in headers if h['name'].lower() == 'date'), '')
+        
+        return {
+            'id': message.get('id', ''),
+            'subject': subject,
+            'from': sender,
+            'date': date,
+            'snippet': message.get('snippet', ''),
+            'thread_id': message.get('threadId', '')
+        }
+    
+    def _metadata_request(self, message_id: str):
+        """Запрос messages.get только с нужными заголовками"""
+        return self._messages().get(
+            userId='me',
+            id=message_id,
+            format='metadata',
+            metadataHeaders=METADATA_HEADERS
+        )
+    
     async def get_message_details(self, message_id: str) -> Optional[Dict]:
         """Получить детали сообщения"""
         if not self.service:
             await self.connect()
         
         try:
-            message = self.service.users().messages().get(
-                userId='me',
-                id=message_id
-            ).execute()
-            
-            # Извлечь заголовки
-            headers = message.get('payload', {}).get('headers', [])
-            subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), '')
-            sender = next((h['value'] for h in headers if h['name'].lower() == 'from'), '')
-            date = next((h['value'] for h in headers if h['name'].lower() == 'date'), '')
-            
-            return {
-                'id': message_id,
-                'subject': subject,
-                'from': sender,
-                'date': date,
-                'snippet': message.get('snippet', ''),
-                'thread_id': message.get('threadId', '')
-            }
+            message = await self._execute(self._metadata_request(message_id))
+            details = self._parse_message(message)
+            details['id'] = message_id
+            return details
             
         except HttpError as error:
             logger.error(f"Ошибка получения сообщения {message_id}: {error}")
             return None
     
-    async def get_recent_messages(self, max_results: int = 10) -> List[Dict]:
-        """Получить последние сообщения с деталями"""
-        messages = await self.list_messages(max_results)
-        detailed_messages = []
+    async def get_messages_details(self, message_ids: List[str]) -> List[Dict]:
+        """Получить детали нескольких сообщений: сначала из кэша, остальные
+        batch-запросами (до 100 в одном HTTP-запросе)"""
+        unique_ids = list(dict.fromkeys(message_ids))
+        details = self.cache.get_many(unique_ids) if self.cache else {}
+        missing = [message_id for message_id in unique_ids if message_id not in details]
+        fetched = {}
+        retry_ids = []
+        
+        def on_response(request_id: str, response: Dict, exception: Optional[Exception]) -> None:
+            if exception is not None:
+                if self._classify_error(exception) is not None:
+                    retry_ids.append(request_id)
+                else:
+                    logger.error(f"Ошибка получения сообщения {request_id}: {exception}")
+                return
+            parsed = self._parse_message(response)
+            parsed['id'] = request_id
+            fetched[request_id] = parsed
         
-        for message in messages:
-            details = await self.get_message_details(message['id'])
-            if details:
-                detailed_messages.append(details)
+        if missing and not self.service:
+            await self.connect()
         
-        return detailed_messages
+        # Отдельные части batch-ответа могут получить 429 — их повторяем следующим раундом
+        pending = missing
+        for attempt in range(self.limiter.max_retries + 1):
+            for offset in range(0, len(pending), GMAIL_BATCH_SIZE):
+                chunk = pending[offset:offset + GMAIL_BATCH_SIZE]
+                batch = BatchHttpRequest(callback=on_response, batch_uri=self.batch_uri)
+                for message_id in chunk:
+                    batch.add(self._metadata_request(message_id), request_id=message_id)
+                
+                try:
+                    await self._execute(batch, cost=MESSAGE_QUOTA_UNITS * len(chunk))
+                except HttpError as error:
+                    logger.error(f"Ошибка batch-запроса Gmail: {error}")
+            
+            if not retry_ids or attempt == self.limiter.max_retries:
+                break
+            pending, retry_ids[:] = list(retry_ids), []
+            self.limiter.metrics.retried += len(pending)
+            await asyncio.sleep(self.limiter.backoff(attempt))
+        
+        if retry_ids:
+            self.limiter.metrics.failed += len(retry_ids)
+            logger.error(f"Не удалось получить {len(retry_ids)} сообщений после повторов")
+        
+        if self.cache and fetched:
+            self.cache.put_many(fetched.values())
+        logger.debug(f"Кэш Gmail: {len(details)} попаданий, {len(missing)} промахов")
+        
+        details.update(fetched)
+        return [details[message_id] for message_id in unique_ids if message_id in details]
     
-    async def search_messages(self, query: str, max_results: int = 50) -> List[Dict]:
-        """Поиск сообщений по запросу"""
+    async def _fetch_history(self, start_history_id: str) -> Optional[tuple]:
+        """Изменения ящика после start_history_id: (новые id, удаленные id, новый historyId)
+        
+        Возвращает None, если historyId устарел (Gmail хранит историю ограниченное время)
+        """
+        added, deleted = [], set()
+        page_token = None
+        while True:
+            try:
+                response = await self._execute(self.service.users().history().list(
+                    userId='me',
+                    startHistoryId=start_history_id,
+                    historyTypes=['messageAdded', 'messageDeleted'],
+                    pageToken=page_token
+                ), cost=2)
+            except HttpError as error:
+                logger.info(f"История Gmail недоступна, полное обновление: {error}")
+                return None
+            
+            for record in response.get('history', []):
+                for item in record.get('messagesAdded', []):
+                    labels = item['message'].get('labelIds', [])
+                    if 'SPAM' not in labels and 'TRASH' not in labels:
+                        added.append(item['message']['id'])
+                for item in record.get('messagesDeleted', []):
+                    deleted.add(item['message']['id'])
+            
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return added, deleted, response.get('historyId', start_history_id)
+    
+    async def _recent_message_ids(self, max_results: int) -> List[str]:
+        """Id последних сообщений: новые через history.list, иначе полный messages.list"""
+        if not self.cache:
+            return [message['id'] for message in await self.list_messages(max_results)]
+        
         if not self.service:
             await self.connect()
         
+        history_id = self.cache.get_meta('history_id')
+        recent = self.cache.get_meta('recent_ids', [])
+        if history_id and len(recent) >= max_results:
+            changes = await self._fetch_history(history_id)
+            if changes is not None:
+                added, deleted, history_id = changes
+                # История идет от старых к новым, список последних — от новых к старым
+                recent = [message_id for message_id in dict.fromkeys(added[::-1] + recent)
+                          if message_id not in deleted][:RECENT_IDS_LIMIT]
+                self.cache.set_meta('recent_ids', recent)
+                self.cache.set_meta('history_id', history_id)
+                if len(recent) >= max_results:
+                    return recent[:max_results]
+        
+        # historyId берется до списка, чтобы не потерять письма, пришедшие между запросами
         try:
-            response = self.service.users().messages().list(
+            profile = await self._execute(self.service.users().getProfile(userId='me'), cost=1)
+        except HttpError as error:
+            logger.error(f"Ошибка получения профиля Gmail: {error}")
+            profile = {}
+        
+        messages = await self.list_messages(max(max_results, RECENT_IDS_LIMIT))
+        recent = [message['id'] for message in messages]
+        if profile.get('historyId') and recent:
+            self.cache.set_meta('recent_ids', recent[:RECENT_IDS_LIMIT])
+            self.cache.set_meta('history_id', profile['historyId'])
+        return recent[:max_results]
+    
+    async def get_recent_messages(self, max_results: int = 10) -> List[Dict]:
+        """Получить последние сообщения с деталями"""
+        message_ids = await self._recent_message_ids(max_results)
+        return await self.get_messages_details(message_ids)
+    
+    async def iter_search_messages(self, query: str, max_results: Optional[int] = None,
+                                   page_size: int = GMAIL_BATCH_SIZE) -> AsyncIterator[Dict]:
+        """Поиск сообщений потоком: страницы по nextPageToken, детали batch-запросами
+        
+        Пока вызывающий обрабатывает текущую страницу, следующая (список id и
+        детали) уже загружается. В памяти не больше двух страниц, поэтому
+        расход не зависит от размера выдачи.
+        """
+        if not self.service:
+            await self.connect()
+        
+        async def fetch_page(page_token: Optional[str], limit: int) -> tuple:
+            response = await self._execute(self._messages().list(
                 userId='me',
                 q=query,
-                maxResults=max_results
-            ).execute()
-            
-            messages = response.get('messages', [])
-            detailed_messages = []
-            
-            for message in messages:
-                details = await self.get_message_details(message['id'])
-                if details:
-                    detailed_messages.append(details)
-            
-            logger.info(f"Найдено {len(detailed_messages)} сообщений по запросу: {query}")
-            return detailed_messages
-            
-        except HttpError as error:
-            logger.error(f"Ошибка поиска сообщений: {error}")
-            return []
+                maxResults=limit,
+                pageToken=page_token
+            ))
+            message_ids = [message['id'] for message in response.get('messages', [])]
+            return await self.get_messages_details(message_ids), len(message_ids), response.get('nextPageToken')
+        
+        def page_limit(listed: int) -> int:
+            return page_size if max_results is None else min(page_size, max_results - listed)
+        
+        listed = yielded = 0
+        next_page = asyncio.ensure_future(fetch_page(None, page_limit(0)))
+        try:
+            while next_page is not None:
+                try:
+                    details, count, page_token = await next_page
+                except HttpError as error:
+                    logger.error(f"Ошибка поиска сообщений: {error}")
+                    return
+                
+                listed += count
+                next_page = None
+                if page_token and (max_results is None or listed < max_results):
+                    next_page = asyncio.ensure_future(fetch_page(page_token, page_limit(listed)))
+                
+                for message in details:
+                    yield message
+                    yielded += 1
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+            logger.info(f"Найдено {yielded} сообщений по запросу: {query}")
+    
+    async def search_messages(self, query: str, max_results: int = 50) -> List[Dict]:
+        """Поиск сообщений по запросу"""
+        return [message async for message in self.iter_search_messages(query, max_results)]
     
     def format_message_for_display(self, message: Dict) -> str:
         """Форматировать сообщение для отображения"""
@@ -211,6 +520,8 @@ async def main():
             
     except Exception as e:
         print(f"❌ Ошибка: {e}")
+    finally:
+        gmail_service.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,102 @@
+"""
+Индекс серий привычек по календарным дням
+"""
+
+from bisect import bisect_right
+from datetime import date
+from typing import Dict, List, Optional
+
+
+class _HabitDays:
+    """Дни выполнения одной привычки в виде отсортированных непрерывных серий
+
+    starts/ends — первый и последний день каждой серии (ordinal), prefix[i] —
+    сколько дней содержат серии до i-й. Этого достаточно, чтобы считать дни в
+    любом окне бинарным поиском, а текущую и самую длинную серию — за O(1).
+    """
+
+    __slots__ = ("starts", "ends", "prefix", "longest")
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.prefix: List[int] = []
+        self.longest = 0
+
+    def add(self, day: int) -> None:
+        if not self.starts or day > self.ends[-1] + 1:
+            self.prefix.append(self.prefix[-1] + self.ends[-1] - self.starts[-1] + 1 if self.starts else 0)
+            self.starts.append(day)
+            self.ends.append(day)
+        elif day == self.ends[-1] + 1:
+            self.ends[-1] = day
+        elif day >= self.starts[-1]:
+            return
+        else:
+            self._rebuild(day)
+            return
+        self.longest = max(self.longest, self.ends[-1] - self.starts[-1] + 1)
+
+    def _rebuild(self, extra_day: int) -> None:
+        """Вставка дня в прошлое (редко: импорт старой истории) — пересобрать серии"""
+        days = {extra_day}
+        for start, end in zip(self.starts, self.ends):
+            days.update(range(start, end + 1))
+        self.starts, self.ends, self.prefix, self.longest = [], [], [], 0
+        for day in sorted(days):
+            self.add(day)
+
+    def days_up_to(self, day: int) -> int:
+        """Количество дней выполнения не позже day"""
+        i = bisect_right(self.starts, day) - 1
+        if i < 0:
+            return 0
+        return self.prefix[i] + min(day, self.ends[i]) - self.starts[i] + 1
+
+
+class HabitStreakIndex:
+    """Серии и доля выполнения привычек по календарным дням"""
+
+    def __init__(self):
+        self._habits: Dict[str, _HabitDays] = {}
+
+    @staticmethod
+    def _key(habit: str) -> str:
+        return habit.strip().lower()
+
+    def add(self, habit: str, day: date) -> None:
+        """Отметить выполнение привычки в день day"""
+        self._habits.setdefault(self._key(habit), _HabitDays()).add(day.toordinal())
+
+    def _get(self, habit: str) -> Optional[_HabitDays]:
+        return self._habits.get(self._key(habit))
+
+    def current_streak(self, habit: str, today: Optional[date] = None) -> int:
+        """Текущая серия: подряд идущие дни, заканчивающиеся сегодня или вчера"""
+        days = self._get(habit)
+        if not days or not days.starts:
+            return 0
+        today_ordinal = (today or date.today()).toordinal()
+        last_end = min(days.ends[-1], today_ordinal)
+        if last_end < today_ordinal - 1 or days.starts[-1] > last_end:
+            return 0
+        return last_end - days.starts[-1] + 1
+
+    def longest_streak(self, habit: str) -> int:
+        """Самая длинная серия за всю историю"""
+        days = self._get(habit)
+        return days.longest if days else 0
+
+    def completed_days(self, habit: str, start: date, end: date) -> int:
+        """Количество дней выполнения в интервале [start, end]"""
+        days = self._get(habit)
+        if not days or end < start:
+            return 0
+        return days.days_up_to(end.toordinal()) - days.days_up_to(start.toordinal() - 1)
+
+    def completion_rate(self, habit: str, start: date, end: date) -> float:
+        """Доля дней с выполнением в интервале [start, end]"""
+        total = (end - start).days + 1
+        if total <= 0:
+            return 0.0
+        return self.completed_days(habit, start, end) / total
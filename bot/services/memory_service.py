@@ -3,14 +3,77 @@
 """
 
 import aiofiles
+import asyncio
+import collections
 import os
 import json
-from datetime import datetime
-from typing import List, Dict, Optional
+import re
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Tuple
 import logging
 
+from .assessment_history import AreaTrend, AssessmentHistory
+from .event_log import EventLog
+from .habit_streaks import HabitStreakIndex
+
 logger = logging.getLogger(__name__)
 
+# Формат времени в Markdown-представлении
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M"
+
+# Как часто сохранять счетчики привычек на диск (число новых отметок)
+HABIT_STATS_CHECKPOINT_EVERY = 50
+
+
+class LifeAreaSnapshot:
+    """Разобранный current.md: строки файла, индекс область -> строка и оценки
+    
+    Один снимок на MemoryService — его читают get_life_areas_status и
+    get_life_area_scores. Обновление оценки меняет одну строку по индексу,
+    а файл пишется из строк за один проход; прочие строки (заголовки,
+    пустые) сохраняются.
+    """
+    
+    def __init__(self, lines: List[str], mtime_ns: Optional[int]):
+        self.lines = lines
+        self.mtime_ns = mtime_ns
+        self.index: Dict[str, int] = {}
+        self.scores: Dict[str, int] = {}
+        for number, line in enumerate(lines):
+            parsed = self.parse_line(line)
+            if parsed:
+                area, score = parsed
+                self.index[area] = number
+                if score is not None:
+                    self.scores[area] = score
+    
+    @classmethod
+    def parse(cls, content: str, mtime_ns: Optional[int] = None) -> "LifeAreaSnapshot":
+        return cls(content.split('\n') if content else [], mtime_ns)
+    
+    @staticmethod
+    def parse_line(line: str) -> Optional[Tuple[str, Optional[int]]]:
+        """Разобрать строку вида "- Область: 8/10 (2024-01-15 14:30)" -> (область, оценка)"""
+        stripped = line.strip()
+        if not stripped.startswith('- ') or ':' not in stripped:
+            return None
+        area, rest = stripped[2:].split(':', 1)
+        score_part = rest.strip().split('/')[0] if '/' in rest else ""
+        return area.strip(), int(score_part) if score_part.isdigit() else None
+    
+    def set(self, area: str, score: int, line: str) -> None:
+        """Заменить строку области или добавить новую в конец"""
+        number = self.index.get(area)
+        if number is None:
+            self.index[area] = len(self.lines)
+            self.lines.append(line)
+        else:
+            self.lines[number] = line
+        self.scores[area] = score
+    
+    def render(self) -> str:
+        return '\n'.join(self.lines)
+
 
 class MemoryService:
     """Сервис для работы с локальными файлами памяти"""
@@ -19,127 +82,307 @@ class MemoryService:
         self.memory_path = memory_path
         self.tasks_path = os.path.join(memory_path, "gtd")
         self.assessments_path = os.path.join(memory_path, "assessments")
+        self.events_path = os.path.join(memory_path, "events")
         
         # Создаем необходимые директории
         os.makedirs(self.memory_path, exist_ok=True)
         os.makedirs(self.tasks_path, exist_ok=True)
         os.makedirs(self.assessments_path, exist_ok=True)
+        os.makedirs(self.events_path, exist_ok=True)
+        
+        # Журналы событий — источник истины, Markdown-файлы — их представление
+        self.markdown_paths = {
+            "tasks": os.path.join(self.tasks_path, "inbox.md"),
+            "ideas": os.path.join(self.memory_path, "ideas.md"),
+            "mood": os.path.join(self.memory_path, "mood.md"),
+            "habits": os.path.join(self.memory_path, "habits.md"),
+        }
+        self.event_logs = {stream: EventLog(self.events_path, stream) for stream in self.markdown_paths}
+        self._bootstrapped = set()
+        self._bootstrap_locks = {stream: asyncio.Lock() for stream in self.markdown_paths}
+        
+        # Счетчики привычек: материализованное представление журнала habits
+        self.habit_stats_path = os.path.join(self.events_path, "habits.stats.json")
+        self._habit_stats: Optional[Dict[str, int]] = None
+        self._habit_stats_offset = 0
+        self._habit_stats_dirty = 0
+        self._habit_stats_lock = asyncio.Lock()
+        self._habit_streaks: Optional[HabitStreakIndex] = None
+        
+        # Блокировки на файл: чтение-изменение-запись одного файла идут по очереди
+        self._file_locks: Dict[str, asyncio.Lock] = collections.defaultdict(asyncio.Lock)
+        
+        # Оценки жизненных областей: общий снимок current.md, проверяемый по mtime
+        self.assessment_path = os.path.join(self.assessments_path, "current.md")
+        self._life_areas: Optional[LifeAreaSnapshot] = None
+        
+        # История всех оценок для трендов (колоночные файлы рядом с current.md)
+        self.assessment_history_path = os.path.join(self.assessments_path, "history")
+        self._assessment_history: Optional[AssessmentHistory] = None
     
-    async def save_task(self, content: str, priority: int = 3, due_date: Optional[str] = None) -> None:
-        """Сохранить задачу в inbox"""
-        inbox_path = os.path.join(self.tasks_path, "inbox.md")
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+    def _file_lock(self, path: str) -> asyncio.Lock:
+        """Блокировка для чтения-изменения-записи файла"""
+        return self._file_locks[os.path.abspath(path)]
+    
+    @staticmethod
+    async def _atomic_write(path: str, data: str) -> None:
+        """Записать файл атомарно: временный файл, fsync, rename поверх старого
+        
+        Читатель (и файл после сбоя) видит либо старое, либо новое содержимое
+        целиком, но не наполовину записанный файл.
+        """
+        tmp_path = f"{path}.tmp"
+        async with aiofiles.open(tmp_path, 'w', encoding='utf-8') as f:
+            await f.write(data)
+            await f.flush()
+            await asyncio.to_thread(os.fsync, f.fileno())
+        os.replace(tmp_path, path)
+    
+    @staticmethod
+    def _render_event(stream: str, event: Dict) -> str:
+        """Отрендерить событие в строку Markdown"""
+        timestamp = event["ts"].strftime(TIMESTAMP_FORMAT)
+        
+        if stream == "tasks":
+            return f"- [ ] {event['content']} (захвачено: {timestamp})\n"
+        if stream == "ideas":
+            return f"- {event['content']} (захвачено: {timestamp})\n"
+        if stream == "mood":
+            line = f"- {event['score']}/10 - {timestamp}"
+            if event.get("notes"):
+                line += f" - {event['notes']}"
+            return line + "\n"
+        return f"- {event['habit']} - {timestamp}\n"
+    
+    @staticmethod
+    def _parse_markdown_line(stream: str, line: str) -> Optional[Tuple[datetime, Dict]]:
+        """Разобрать строку старого Markdown-файла в событие"""
+        line = line.strip()
+        try:
+            if stream in ("tasks", "ideas"):
+                prefix = "- [ ] " if stream == "tasks" else "- "
+                if not line.startswith(prefix) or "(захвачено: " not in line:
+                    return None
+                content, _, rest = line[len(prefix):].rpartition(" (захвачено: ")
+                return datetime.strptime(rest.rstrip(")"), TIMESTAMP_FORMAT), {"content": content}
+            
+            if not line.startswith("- ") or " - " not in line:
+                return None
+            parts = line[2:].split(" - ")
+            
+            if stream == "mood":
+                if "/10" not in parts[0]:
+                    return None
+                fields = {"score": int(parts[0].split("/")[0])}
+                if len(parts) > 2:
+                    fields["notes"] = " - ".join(parts[2:])
+                return datetime.strptime(parts[1].strip(), TIMESTAMP_FORMAT), fields
+            
+            # habits: "- habit - timestamp" (название может содержать " - ")
+            return datetime.strptime(parts[-1].strip(), TIMESTAMP_FORMAT), {"habit": " - ".join(parts[:-1]).strip()}
+        except (ValueError, IndexError):
+            return None
+    
+    async def _get_log(self, stream: str) -> EventLog:
+        """Журнал потока; при первом обращении импортирует историю из Markdown"""
+        log = self.event_logs[stream]
+        if stream in self._bootstrapped:
+            return log
+        
+        # Импорт под блокировкой потока: иначе параллельные вызовы импортируют историю дважды
+        async with self._bootstrap_locks[stream]:
+            if stream in self._bootstrapped:
+                return log
+            
+            markdown_path = self.markdown_paths[stream]
+            if not log.exists() and os.path.exists(markdown_path):
+                async with aiofiles.open(markdown_path, 'r', encoding='utf-8') as f:
+                    content = await f.read()
+                events = [e for e in (self._parse_markdown_line(stream, l) for l in content.split('\n')) if e]
+                await log.append_many(events)
+                logger.info(f"Журнал {stream} создан из {markdown_path}: {len(events)} событий")
+            
+            self._bootstrapped.add(stream)
+        return log
+    
+    async def _record(self, stream: str, fields: Dict) -> datetime:
+        """Записать событие в журнал и дописать его в Markdown-представление"""
+        now = datetime.now().replace(microsecond=0)
+        log = await self._get_log(stream)
+        await log.append(now, fields)
+        
+        async with aiofiles.open(self.markdown_paths[stream], 'a', encoding='utf-8') as f:
+            await f.write(self._render_event(stream, {"ts": now, **fields}))
         
-        task_line = f"- [ ] {content} (захвачено: {timestamp})\n"
+        return now
+    
+    async def render_markdown(self, stream: str) -> None:
+        """Перестроить Markdown-файл потока целиком из журнала событий"""
+        log = await self._get_log(stream)
+        events = await log.read_all()
         
-        async with aiofiles.open(inbox_path, 'a', encoding='utf-8') as f:
-            await f.write(task_line)
+        async with aiofiles.open(self.markdown_paths[stream], 'w', encoding='utf-8') as f:
+            await f.write("".join(self._render_event(stream, event) for event in events))
+        
+        logger.info(f"Markdown-представление {stream} перестроено: {len(events)} событий")
+    
+    async def save_task(self, content: str, priority: int = 3, due_date: Optional[str] = None) -> None:
+        """Сохранить задачу в inbox"""
+        fields = {"content": content, "priority": priority}
+        if due_date:
+            fields["due_date"] = due_date
+        await self._record("tasks", fields)
         
         logger.info(f"Задача сохранена в inbox: {content}")
     
     async def save_idea(self, content: str) -> None:
         """Сохранить идею"""
-        ideas_path = os.path.join(self.memory_path, "ideas.md")
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-        
-        idea_line = f"- {content} (захвачено: {timestamp})\n"
-        
-        async with aiofiles.open(ideas_path, 'a', encoding='utf-8') as f:
-            await f.write(idea_line)
+        await self._record("ideas", {"content": content})
         
         logger.info(f"Идея сохранена: {content}")
     
     async def save_mood(self, score: int, notes: Optional[str] = None) -> None:
         """Сохранить настроение"""
-        mood_path = os.path.join(self.memory_path, "mood.md")
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-        
-        mood_line = f"- {score}/10 - {timestamp}"
+        fields = {"score": score}
         if notes:
-            mood_line += f" - {notes}"
-        mood_line += "\n"
-        
-        async with aiofiles.open(mood_path, 'a', encoding='utf-8') as f:
-            await f.write(mood_line)
+            fields["notes"] = notes
+        await self._record("mood", fields)
         
         logger.info(f"Настроение сохранено: {score}/10")
     
     async def save_habit(self, habit: str) -> None:
         """Сохранить привычку"""
-        habits_path = os.path.join(self.memory_path, "habits.md")
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-        
-        habit_line = f"- {habit} - {timestamp}\n"
-        
-        async with aiofiles.open(habits_path, 'a', encoding='utf-8') as f:
-            await f.write(habit_line)
+        async with self._habit_stats_lock:
+            timestamp = await self._record("habits", {"habit": habit})
+            
+            if self._habit_streaks is not None:
+                self._habit_streaks.add(habit, timestamp.date())
+            
+            # Обновляем счетчики, только если они уже подняты в память
+            if self._habit_stats is not None:
+                self._habit_stats[habit] = self._habit_stats.get(habit, 0) + 1
+                self._habit_stats_offset = self.event_logs["habits"].size()
+                self._habit_stats_dirty += 1
+                if self._habit_stats_dirty >= HABIT_STATS_CHECKPOINT_EVERY:
+                    await self._checkpoint_habit_stats()
         
         logger.info(f"Привычка сохранена: {habit}")
     
+    async def _load_habit_stats(self) -> Dict[str, int]:
+        """Поднять счетчики привычек: контрольная точка с диска + хвост журнала"""
+        if self._habit_stats is not None:
+            return self._habit_stats
+        
+        log = await self._get_log("habits")
+        counts, offset = {}, 0
+        
+        if os.path.exists(self.habit_stats_path):
+            try:
+                async with aiofiles.open(self.habit_stats_path, 'r', encoding='utf-8') as f:
+                    checkpoint = json.loads(await f.read())
+                counts, offset = checkpoint["counts"], checkpoint["offset"]
+            except Exception as e:
+                logger.warning(f"Контрольная точка привычек повреждена, пересчет с начала: {e}")
+                counts, offset = {}, 0
+        
+        if offset > log.size():
+            # Журнал был заменен — контрольная точка недействительна
+            counts, offset = {}, 0
+        
+        events, end_offset = await log.read_after(offset)
+        for event in events:
+            counts[event["habit"]] = counts.get(event["habit"], 0) + 1
+        
+        self._habit_stats = counts
+        self._habit_stats_offset = end_offset
+        self._habit_stats_dirty = len(events)
+        if events:
+            await self._checkpoint_habit_stats()
+        return counts
+    
+    async def _checkpoint_habit_stats(self) -> None:
+        """Атомарно сохранить счетчики привычек и покрытое ими смещение журнала"""
+        if self._habit_stats is None:
+            return
+        
+        data = json.dumps({"offset": self._habit_stats_offset, "counts": self._habit_stats}, ensure_ascii=False)
+        await self._atomic_write(self.habit_stats_path, data)
+        self._habit_stats_dirty = 0
+    
     async def get_habits_stats(self) -> Dict[str, int]:
         """Получить статистику привычек (количество выполнений каждой привычки)"""
-        habits_path = os.path.join(self.memory_path, "habits.md")
-        
-        if not os.path.exists(habits_path):
-            return {}
-        
         try:
-            async with aiofiles.open(habits_path, 'r', encoding='utf-8') as f:
-                content = await f.read()
-            
-            habits_count = {}
-            lines = content.strip().split('\n')
-            
-            for line in lines:
-                if line.strip() and line.startswith('- ') and ' - ' in line:
-                    # Парсим строку: "- habit_name - timestamp"
-                    parts = line.strip().split(' - ')
-                    if len(parts) >= 2:
-                        habit_name = parts[0].replace('- ', '').strip()
-                        habits_count[habit_name] = habits_count.get(habit_name, 0) + 1
-            
-            return habits_count
+            async with self._habit_stats_lock:
+                return dict(await self._load_habit_stats())
             
         except Exception as e:
             logger.error(f"Ошибка при чтении статистики привычек: {e}")
             return {}
     
+    async def close(self) -> None:
+        """Сохранить несброшенные материализованные представления"""
+        async with self._habit_stats_lock:
+            if self._habit_stats_dirty:
+                await self._checkpoint_habit_stats()
+    
+    async def _load_life_areas(self) -> LifeAreaSnapshot:
+        """Оценки из памяти; current.md перечитывается, только если изменился на диске
+        
+        Общий снимок для /status, /assess и просмотра текущих оценок: повторный
+        просмотр стоит одного stat() без чтения и разбора файла. Запись
+        атомарная, поэтому читать можно без блокировки файла.
+        """
+        try:
+            mtime_ns = os.stat(self.assessment_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+        
+        if self._life_areas is None or self._life_areas.mtime_ns != mtime_ns:
+            content = ""
+            if mtime_ns is not None:
+                async with aiofiles.open(self.assessment_path, 'r', encoding='utf-8') as f:
+                    content = await f.read()
+            self._life_areas = LifeAreaSnapshot.parse(content, mtime_ns)
+        return self._life_areas
+    
+    async def _load_assessment_history(self) -> AssessmentHistory:
+        """Поднять историю оценок; пустую заполнить текущими оценками из current.md"""
+        if self._assessment_history is None:
+            # Под блокировкой current.md: параллельный вызов иначе добавит те же оценки второй раз
+            async with self._file_lock(self.assessment_path):
+                if self._assessment_history is None:
+                    history = AssessmentHistory(self.assessment_history_path).load()
+                    if history.is_empty():
+                        snapshot = await self._load_life_areas()
+                        for area, number in snapshot.index.items():
+                            if area in snapshot.scores:
+                                match = re.search(r"\((\d{4}-\d{2}-\d{2} \d{2}:\d{2})\)", snapshot.lines[number])
+                                saved_at = datetime.strptime(match.group(1), TIMESTAMP_FORMAT) if match else datetime.now()
+                                history.append(area, int(saved_at.timestamp()), snapshot.scores[area])
+                    self._assessment_history = history
+        return self._assessment_history
+    
     async def save_life_area_score(self, area: str, score: int, notes: Optional[str] = None) -> None:
         """Сохранить оценку жизненной области (обновляет существующую или добавляет новую)"""
-        assessment_path = os.path.join(self.assessments_path, "current.md")
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-        
-        # Читаем существующий файл
-        lines = []
-        if os.path.exists(assessment_path):
-            async with aiofiles.open(assessment_path, 'r', encoding='utf-8') as f:
-                lines = (await f.read()).split('\n')
-        
-        # Ищем существующую оценку для этой области
-        area_updated = False
-        new_lines = []
-        
-        for line in lines:
-            if line.strip().startswith(f'- {area}:'):
-                # Обновляем существующую оценку
-                new_line = f"- {area}: {score}/10 ({timestamp})"
-                if notes:
-                    new_line += f" - {notes}"
-                new_lines.append(new_line)
-                area_updated = True
-            else:
-                new_lines.append(line)
-        
-        # Если область не найдена, добавляем новую
-        if not area_updated:
-            new_line = f"- {area}: {score}/10 ({timestamp})"
-            if notes:
-                new_line += f" - {notes}"
-            new_lines.append(new_line)
-        
-        # Записываем обновленный файл
-        async with aiofiles.open(assessment_path, 'w', encoding='utf-8') as f:
-            await f.write('\n'.join(new_lines))
+        now = datetime.now()
+        line = f"- {area}: {score}/10 ({now.strftime(TIMESTAMP_FORMAT)})"
+        if notes:
+            line += f" - {notes}"
+        
+        # История поднимается до изменения снимка, чтобы не учесть оценку дважды
+        history = await self._load_assessment_history()
+        async with self._file_lock(self.assessment_path):
+            snapshot = await self._load_life_areas()
+            snapshot.set(area, score, line)
+            try:
+                await self._atomic_write(self.assessment_path, snapshot.render())
+            except Exception:
+                self._life_areas = None  # память не должна расходиться с диском
+                raise
+            snapshot.mtime_ns = os.stat(self.assessment_path).st_mtime_ns
+            # Читатель мог перечитать файл во время записи — закрепляем свой снимок
+            self._life_areas = snapshot
+            history.append(area, int(now.timestamp()), score)
         
         logger.info(f"Оценка области '{area}' сохранена: {score}/10")
     
@@ -172,56 +415,18 @@ class MemoryService:
     
     async def get_life_areas_status(self) -> List[Dict]:
         """Получить статус жизненных областей"""
-        assessment_path = os.path.join(self.assessments_path, "current.md")
-        
-        if not os.path.exists(assessment_path):
-            return []
-        
-        areas = {}
-        async with aiofiles.open(assessment_path, 'r', encoding='utf-8') as f:
-            content = await f.read()
-            
-        for line in content.split('\n'):
-            if line.strip().startswith('- ') and ':' in line:
-                # Парсим строку вида "- Область: 8/10 (2024-01-15 14:30)"
-                parts = line.replace('- ', '').split(':')
-                if len(parts) >= 2:
-                    area_name = parts[0].strip()
-                    score_part = parts[1].strip()
-                    
-                    # Извлекаем оценку
-                    if '/' in score_part:
-                        score = int(score_part.split('/')[0])
-                        areas[area_name] = score
-        
-        # Преобразуем в список
-        return [{"name": name, "score": score} for name, score in areas.items()]
+        snapshot = await self._load_life_areas()
+        return [{"name": name, "score": score} for name, score in snapshot.scores.items()]
     
     async def get_life_area_scores(self) -> Dict[str, int]:
         """Получить текущие оценки жизненных областей в виде словаря"""
-        assessment_path = os.path.join(self.assessments_path, "current.md")
-        
-        if not os.path.exists(assessment_path):
-            return {}
-        
-        areas = {}
-        async with aiofiles.open(assessment_path, 'r', encoding='utf-8') as f:
-            content = await f.read()
-            
-        for line in content.split('\n'):
-            if line.strip().startswith('- ') and ':' in line:
-                # Парсим строку вида "- Область: 8/10 (2024-01-15 14:30)"
-                parts = line.replace('- ', '').split(':')
-                if len(parts) >= 2:
-                    area_name = parts[0].strip()
-                    score_part = parts[1].strip()
-                    
-                    # Извлекаем оценку
-                    if '/' in score_part:
-                        score = int(score_part.split('/')[0])
-                        areas[area_name] = score
-        
-        return areas
+        snapshot = await self._load_life_areas()
+        return dict(snapshot.scores)
+    
+    async def get_life_area_trends(self, now: Optional[datetime] = None) -> List[AreaTrend]:
+        """Тренды оценок: среднее за неделю и месяц, минимум/максимум, изменение к прошлой неделе"""
+        history = await self._load_assessment_history()
+        return history.trends(int((now or datetime.now()).timestamp()))
     
     async def complete_task(self, task_id: str) -> None:
         """Отметить задачу как выполненную"""
@@ -246,47 +451,49 @@ class MemoryService:
     
     async def get_recent_mood(self, days: int = 7) -> List[Dict]:
         """Получить настроение за последние дни"""
-        mood_path = os.path.join(self.memory_path, "mood.md")
-        
-        if not os.path.exists(mood_path):
-            return []
-        
-        moods = []
-        async with aiofiles.open(mood_path, 'r', encoding='utf-8') as f:
-            content = await f.read()
-            
-        for line in content.split('\n'):
-            if line.strip().startswith('- ') and '/10' in line:
-                # Парсим строку вида "- 8/10 - 2024-01-15 14:30"
-                parts = line.replace('- ', '').split(' - ')
-                if len(parts) >= 2:
-                    score = int(parts[0].split('/')[0])
-                    timestamp = parts[1]
-                    
-                    moods.append({
-                        'score': score,
-                        'timestamp': timestamp
-                    })
+        log = await self._get_log("mood")
         
         # Возвращаем последние N записей
-        return moods[-days:] if moods else []
+        return [
+            {'score': event['score'], 'timestamp': event['ts'].strftime(TIMESTAMP_FORMAT)}
+            for event in await log.read_last(days)
+        ]
+    
+    async def get_mood_history(self, days: int = 7) -> List[Dict]:
+        """Получить все записи настроения за последние N календарных дней"""
+        log = await self._get_log("mood")
+        since = datetime.now() - timedelta(days=days)
+        
+        return [
+            {'score': event['score'], 'timestamp': event['ts'].strftime(TIMESTAMP_FORMAT)}
+            for event in await log.read_range(since)
+        ]
+    
+    async def _load_habit_streaks(self) -> HabitStreakIndex:
+        """Построить индекс серий привычек по журналу (один раз за процесс)"""
+        if self._habit_streaks is None:
+            log = await self._get_log("habits")
+            streaks = HabitStreakIndex()
+            for event in await log.read_all():
+                streaks.add(event['habit'], event['ts'].date())
+            self._habit_streaks = streaks
+        return self._habit_streaks
     
     async def get_habit_streak(self, habit: str, days: int = 7) -> int:
-        """Получить серию выполнения привычки"""
-        habits_path = os.path.join(self.memory_path, "habits.md")
-        
-        if not os.path.exists(habits_path):
-            return 0
-        
-        streak = 0
-        async with aiofiles.open(habits_path, 'r', encoding='utf-8') as f:
-            content = await f.read()
-            
-        lines = content.split('\n')
-        for line in reversed(lines):  # Идем с конца
-            if habit.lower() in line.lower():
-                streak += 1
-            else:
-                break
-        
-        return min(streak, days) 
\ No newline at end of file
+        """Получить текущую серию выполнения привычки (в днях, не больше days)"""
+        async with self._habit_stats_lock:
+            streaks = await self._load_habit_streaks()
+        return min(streaks.current_streak(habit), days)
+    
+    async def get_habit_streak_info(self, habit: str, window_days: int = 30) -> Dict:
+        """Получить текущую и самую длинную серию, а также долю выполнения за окно"""
+        async with self._habit_stats_lock:
+            streaks = await self._load_habit_streaks()
+        
+        today = datetime.now().date()
+        window_start = today - timedelta(days=window_days - 1)
+        return {
+            'current': streaks.current_streak(habit, today),
+            'longest': streaks.longest_streak(habit),
+            'completion_rate': streaks.completion_rate(habit, window_start, today),
+        }
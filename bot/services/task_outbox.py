@@ -0,0 +1,201 @@
+"""
+Локальная очередь (outbox) задач для отложенного создания в Todoist
+"""
+
+import asyncio
+import json
+import logging
+import random
+import sqlite3
+import time
+import uuid
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .todoist_service import MemoryTask, SYNC_BATCH_SIZE, TodoistService
+
+logger = logging.getLogger(__name__)
+
+# Задержка повтора: OUTBOX_RETRY_BASE * 2^попытка, не больше OUTBOX_RETRY_MAX
+OUTBOX_RETRY_BASE = 5.0
+OUTBOX_RETRY_MAX = 3600.0
+OUTBOX_MAX_ATTEMPTS = 20
+
+
+class TaskOutbox:
+    """Надежная очередь создания задач Todoist (SQLite) с фоновой отправкой
+
+    enqueue() только записывает задачу на диск, поэтому захват не ждет
+    Todoist и не теряется, если Todoist недоступен или бот перезапустился.
+    Фоновый обработчик отправляет накопившиеся задачи пакетами, повторяет
+    неудачные с экспоненциальной задержкой и после создания записывает
+    todoist_id в хранилище задач памяти — одной записью на цикл отправки, в
+    отдельном потоке. id записи служит ключом
+    идемпотентности, так что повтор после потерянного ответа не создаст
+    дубликат.
+    """
+
+    def __init__(self, path: Path, todoist_service: TodoistService,
+                 batch_size: int = SYNC_BATCH_SIZE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.todoist_service = todoist_service
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    failed INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_outbox_next_attempt ON outbox(failed, next_attempt_at);
+            """)
+        self._wakeup = asyncio.Event()
+        self._drain_lock = asyncio.Lock()
+        self._write_back_buffer: List[Dict] = []
+        self._worker: Optional[asyncio.Task] = None
+
+    def enqueue(self, content: str, **fields) -> str:
+        """Поставить задачу в очередь на создание в Todoist, вернуть id записи"""
+        entry_id = str(uuid.uuid4())
+        item = {
+            "id": entry_id,
+            "temp_id": str(uuid.uuid4()),
+            "content": content,
+            "fields": fields,
+            "created_at": datetime.now().isoformat(),
+        }
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO outbox (id, data, next_attempt_at) VALUES (?, ?, ?)",
+                (entry_id, json.dumps(item, ensure_ascii=False), time.time()),
+            )
+        self.start()
+        self._wakeup.set()
+        return entry_id
+
+    def pending_count(self) -> int:
+        """Сколько задач ждет отправки (без окончательно неудачных)"""
+        return self.conn.execute("SELECT COUNT(*) FROM outbox WHERE failed = 0").fetchone()[0]
+
+    def _due_items(self) -> List[Dict]:
+        rows = self.conn.execute(
+            "SELECT data FROM outbox WHERE failed = 0 AND next_attempt_at <= ? "
+            "ORDER BY next_attempt_at LIMIT ?",
+            (time.time(), self.batch_size),
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def _next_attempt_delay(self) -> Optional[float]:
+        row = self.conn.execute(
+            "SELECT MIN(next_attempt_at) FROM outbox WHERE failed = 0"
+        ).fetchone()
+        return None if row[0] is None else max(row[0] - time.time(), 0.0)
+
+    def _write_back(self, items: List[Dict], created: Dict[str, str]) -> None:
+        """Запомнить созданные задачи для записи todoist_id в хранилище задач памяти
+        
+        Хранилище, которое переписывается целиком (YAML), не трогаем: запись
+        заняла бы секунды и могла бы затереть параллельный экспорт из CLI.
+        Такие задачи попадут в память со следующим импортом из Todoist.
+        """
+        if not self.todoist_service.task_store.partial_writes:
+            return
+        for item in items:
+            if item["id"] in created:
+                fields = item.get("fields", {})
+                task = MemoryTask(
+                    content=item["content"],
+                    created_at=item["created_at"],
+                    due_date=fields.get("due_date"),
+                    priority=fields.get("priority"),
+                    todoist_id=created[item["id"]],
+                )
+                self._write_back_buffer.append({k: v for k, v in asdict(task).items() if v is not None})
+    
+    async def flush_write_back(self) -> None:
+        """Записать накопленные задачи в хранилище одним вызовом, не блокируя цикл событий"""
+        if not self._write_back_buffer:
+            return
+        tasks, self._write_back_buffer = self._write_back_buffer, []
+        try:
+            await asyncio.to_thread(self.todoist_service.task_store.upsert_tasks, tasks)
+        except Exception as e:
+            # Задачи уже в Todoist: todoist_id подтянет следующий импорт
+            logger.error(f"Ошибка записи todoist_id в хранилище задач: {e}")
+
+    def _reschedule(self, items: List[Dict]) -> None:
+        """Отложить неудачные задачи с экспоненциальной задержкой и джиттером"""
+        now = time.time()
+        with self.conn:
+            for item in items:
+                self.conn.execute("UPDATE outbox SET attempts = attempts + 1 WHERE id = ?", (item["id"],))
+                attempts = self.conn.execute(
+                    "SELECT attempts FROM outbox WHERE id = ?", (item["id"],)
+                ).fetchone()[0]
+                if attempts >= OUTBOX_MAX_ATTEMPTS:
+                    self.conn.execute("UPDATE outbox SET failed = 1 WHERE id = ?", (item["id"],))
+                    logger.error(f"Задача не создана в Todoist после {attempts} попыток: {item['content']}")
+                    continue
+                delay = min(OUTBOX_RETRY_MAX, OUTBOX_RETRY_BASE * 2 ** (attempts - 1))
+                self.conn.execute(
+                    "UPDATE outbox SET next_attempt_at = ? WHERE id = ?",
+                    (now + random.uniform(delay / 2, delay), item["id"]),
+                )
+
+    async def drain_once(self) -> int:
+        """Отправить один пакет готовых к отправке задач, вернуть число созданных"""
+        # Один пакет за раз: иначе параллельный вызов взял бы те же записи
+        async with self._drain_lock:
+            items = self._due_items()
+            if not items:
+                return 0
+
+            created = await self.todoist_service.create_tasks(items)
+            self._write_back(items, created)
+            with self.conn:
+                self.conn.executemany("DELETE FROM outbox WHERE id = ?", ((i,) for i in created))
+            self._reschedule([item for item in items if item["id"] not in created])
+
+        logger.info(f"Outbox: создано {len(created)} из {len(items)} задач в Todoist")
+        return len(created)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                while self._due_items():
+                    await self.drain_once()
+            except Exception as e:
+                logger.error(f"Ошибка отправки outbox в Todoist: {e}")
+                await asyncio.sleep(OUTBOX_RETRY_BASE)
+            finally:
+                await self.flush_write_back()
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._next_attempt_delay())
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        """Запустить фоновую отправку (нужен работающий цикл событий)"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        """Остановить обработчик; неотправленные задачи останутся на диске"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        await self.flush_write_back()
+        self.conn.close()
@@ -0,0 +1,452 @@
+"""
+Хранилища задач памяти (YAML и SQLite)
+"""
+
+import functools
+import json
+import logging
+import sqlite3
+import sys
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+# Служебные ключи, которые хранятся рядом со списком задач
+META_KEYS = ("last_synced", "sync_token", "projects")
+
+
+def _is_pending(task: Dict) -> bool:
+    """Задача еще участвует в синхронизации: не закрыта и не удалена в Todoist"""
+    return not (task.get('closed_at') or task.get('deleted_at'))
+
+
+def _identity(task: Dict) -> tuple:
+    """Ключ задачи без todoist_id (еще не экспортированной)"""
+    return task.get('content'), task.get('created_at')
+
+
+def _serialized(method):
+    """Выполнять метод хранилища под его блокировкой: одно соединение на несколько потоков"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class TaskStore(ABC):
+    """Интерфейс хранилища задач памяти
+
+    Полное содержимое представлено словарем вида
+    {"tasks": [...], "last_synced": ..., "sync_token": ..., "projects": {...}}.
+    Синхронизация читает только нужные задачи и пишет только измененные:
+    upsert_tasks, delete_tasks и update_meta.
+    """
+
+    # Запись отдельных задач не переписывает все хранилище и безопасна
+    # при параллельной работе CLI (python -m bot.services.todoist_service)
+    partial_writes = False
+
+    @abstractmethod
+    def load(self) -> Dict:
+        """Загрузить все задачи и служебные поля"""
+
+    @abstractmethod
+    def save(self, content: Dict) -> None:
+        """Полностью заменить содержимое хранилища"""
+
+    @abstractmethod
+    def upsert_tasks(self, tasks: Iterable[Dict]) -> None:
+        """Вставить или заменить задачи по todoist_id
+
+        Задача без todoist_id или с только что присвоенным todoist_id
+        заменяет свою прежнюю версию без todoist_id (по content и created_at).
+        """
+
+    @abstractmethod
+    def delete_tasks(self, todoist_ids: Iterable[str]) -> None:
+        """Удалить задачи по todoist_id"""
+
+    @abstractmethod
+    def get_task(self, todoist_id: str) -> Optional[Dict]:
+        """Найти задачу по todoist_id"""
+
+    @abstractmethod
+    def get_tasks(self, todoist_ids: Iterable[str]) -> Dict[str, Dict]:
+        """Найти задачи по todoist_id: {todoist_id: задача}"""
+
+    @abstractmethod
+    def get_pending_tasks(self) -> List[Dict]:
+        """Задачи, которые еще не закрыты и не удалены в Todoist"""
+
+    @abstractmethod
+    def get_meta(self) -> Dict:
+        """Служебные поля (last_synced, sync_token, projects)"""
+
+    @abstractmethod
+    def update_meta(self, values: Dict) -> None:
+        """Обновить служебные поля"""
+
+    @contextmanager
+    def session(self) -> Iterator[None]:
+        """Группа операций одной синхронизации (хранилище может отложить запись до конца)"""
+        yield
+
+    def close(self) -> None:
+        """Освободить ресурсы хранилища"""
+
+
+class YamlTaskStore(TaskStore):
+    """Хранилище задач в одном YAML-файле (todoist.yml)
+
+    Файл читается и пишется целиком. Внутри session() все операции работают
+    с одним загруженным документом, а файл записывается один раз в конце —
+    синхронизация стоит одну загрузку и одну запись, как до выборочных методов.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._document: Optional[Dict] = None
+        self._dirty = False
+        self._depth = 0
+
+    @contextmanager
+    def session(self) -> Iterator[None]:
+        if self._depth == 0:
+            self._document = self._read()
+            self._dirty = False
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                # Записываем и после ошибки: созданные в Todoist задачи не должны потерять todoist_id
+                document, dirty = self._document, self._dirty
+                self._document, self._dirty = None, False
+                if dirty:
+                    self._write(document)
+
+    def load(self) -> Dict:
+        if self._document is not None:
+            return self._document
+        return self._read()
+
+    def save(self, content: Dict) -> None:
+        if self._depth:
+            self._document, self._dirty = content, True
+            return
+        self._write(content)
+
+    def _read(self) -> Dict:
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    content = yaml.safe_load(f)
+                    return content or {"tasks": []}
+            except Exception as e:
+                logger.error(f"Ошибка загрузки файла памяти: {e}")
+
+        return {"tasks": []}
+
+    def _write(self, content: Dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                yaml.dump(content, f, default_flow_style=False, allow_unicode=True)
+            logger.info(f"Задачи сохранены в {self.path}")
+        except Exception as e:
+            logger.error(f"Ошибка сохранения файла памяти: {e}")
+
+    def upsert_tasks(self, tasks: Iterable[Dict]) -> None:
+        tasks = list(tasks)
+        if not tasks:
+            return
+        content = self.load()
+        existing = content.setdefault("tasks", [])
+        by_id = {task['todoist_id']: index for index, task in enumerate(existing) if task.get('todoist_id')}
+        unlinked = {_identity(task): index for index, task in enumerate(existing) if not task.get('todoist_id')}
+
+        for task in tasks:
+            index = by_id.get(task.get('todoist_id')) if task.get('todoist_id') else None
+            if index is None:
+                index = unlinked.pop(_identity(task), None)
+            if index is not None:
+                existing[index] = task
+            else:
+                index = len(existing)
+                existing.append(task)
+            if task.get('todoist_id'):
+                by_id[task['todoist_id']] = index
+
+        self.save(content)
+
+    def delete_tasks(self, todoist_ids: Iterable[str]) -> None:
+        todoist_ids = set(todoist_ids)
+        if not todoist_ids:
+            return
+        content = self.load()
+        content["tasks"] = [
+            task for task in content.get("tasks", []) if task.get('todoist_id') not in todoist_ids
+        ]
+        self.save(content)
+
+    def get_task(self, todoist_id: str) -> Optional[Dict]:
+        for task in self.load().get("tasks", []):
+            if task.get('todoist_id') == todoist_id:
+                return task
+        return None
+
+    def get_tasks(self, todoist_ids: Iterable[str]) -> Dict[str, Dict]:
+        todoist_ids = set(todoist_ids)
+        if not todoist_ids:
+            return {}
+        return {
+            task['todoist_id']: task
+            for task in self.load().get("tasks", []) if task.get('todoist_id') in todoist_ids
+        }
+
+    def get_pending_tasks(self) -> List[Dict]:
+        return [task for task in self.load().get("tasks", []) if _is_pending(task)]
+
+    def get_meta(self) -> Dict:
+        return {key: value for key, value in self.load().items() if key in META_KEYS}
+
+    def update_meta(self, values: Dict) -> None:
+        content = self.load()
+        content.update(values)
+        self.save(content)
+
+
+def _unique_by_todoist_id(tasks: Iterable[Dict]) -> List[Dict]:
+    """Задачи без повторов todoist_id: повтор заменяет более раннюю версию на ее месте"""
+    positions: Dict[str, int] = {}
+    unique = []
+    for task in tasks:
+        todoist_id = task.get('todoist_id')
+        if todoist_id and todoist_id in positions:
+            unique[positions[todoist_id]] = task
+            continue
+        if todoist_id:
+            positions[todoist_id] = len(unique)
+        unique.append(task)
+    return unique
+
+
+class SQLiteTaskStore(TaskStore):
+    """Хранилище задач в SQLite (WAL) с индексами по todoist_id, completed_at, due_date и pending"""
+
+    partial_writes = True
+
+    # Ограничение числа параметров в одном запросе у старых версий SQLite
+    MAX_VARIABLES = 900
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Соединение используется и из цикла событий, и из рабочих потоков (asyncio.to_thread)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    pos INTEGER PRIMARY KEY,
+                    todoist_id TEXT UNIQUE,
+                    completed_at TEXT,
+                    due_date TEXT,
+                    pending INTEGER NOT NULL DEFAULT 1,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_tasks_completed_at ON tasks(completed_at);
+                CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+            # База, созданная до появления колонки pending: добавить и заполнить
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(tasks)")}
+            if "pending" not in columns:
+                self.conn.execute("ALTER TABLE tasks ADD COLUMN pending INTEGER NOT NULL DEFAULT 1")
+                rows = self.conn.execute("SELECT pos, data FROM tasks").fetchall()
+                self.conn.executemany(
+                    "UPDATE tasks SET pending = ? WHERE pos = ?",
+                    ((int(_is_pending(json.loads(data))), pos) for pos, data in rows),
+                )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_pending ON tasks(pending)")
+
+    @staticmethod
+    def _row(task: Dict) -> tuple:
+        return (
+            task.get('todoist_id'),
+            task.get('completed_at'),
+            task.get('due_date'),
+            int(_is_pending(task)),
+            json.dumps(task, ensure_ascii=False),
+        )
+
+    @_serialized
+    def load(self) -> Dict:
+        content = self.get_meta()
+        content["tasks"] = [
+            json.loads(data) for (data,) in self.conn.execute("SELECT data FROM tasks ORDER BY pos")
+        ]
+        return content
+
+    @_serialized
+    def save(self, content: Dict) -> None:
+        tasks = content.get("tasks", [])
+        unique = _unique_by_todoist_id(tasks)
+        if len(unique) != len(tasks):
+            # todoist_id уникален: повтор иначе отменил бы всю транзакцию
+            logger.warning(f"Повторяющиеся todoist_id: сохранено {len(unique)} задач из {len(tasks)}")
+
+        try:
+            with self.conn:
+                self.conn.execute("DELETE FROM tasks")
+                self.conn.executemany(
+                    "INSERT INTO tasks (todoist_id, completed_at, due_date, pending, data) VALUES (?, ?, ?, ?, ?)",
+                    (self._row(task) for task in unique),
+                )
+                self.conn.execute("DELETE FROM meta")
+                self.conn.executemany(
+                    "INSERT INTO meta (key, value) VALUES (?, ?)",
+                    ((key, json.dumps(content[key], ensure_ascii=False)) for key in META_KEYS if key in content),
+                )
+            logger.info(f"Задачи сохранены в {self.path}")
+        except Exception as e:
+            logger.error(f"Ошибка сохранения базы задач: {e}")
+
+    @_serialized
+    def upsert_tasks(self, tasks: Iterable[Dict]) -> None:
+        tasks = list(tasks)
+        if not tasks:
+            return
+        with self.conn:
+            # Задач без todoist_id мало (ждут экспорта), их ищем по content и created_at
+            unlinked = {
+                _identity(json.loads(data)): pos
+                for pos, data in self.conn.execute("SELECT pos, data FROM tasks WHERE todoist_id IS NULL")
+            }
+            for task in tasks:
+                pos = unlinked.pop(_identity(task), None)
+                if pos is not None:
+                    self.conn.execute(
+                        "UPDATE tasks SET todoist_id = ?, completed_at = ?, due_date = ?, pending = ?, data = ? "
+                        "WHERE pos = ?",
+                        (*self._row(task), pos),
+                    )
+                else:
+                    self.conn.execute(
+                        """
+                        INSERT INTO tasks (todoist_id, completed_at, due_date, pending, data) VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT(todoist_id) DO UPDATE SET
+                            completed_at = excluded.completed_at,
+                            due_date = excluded.due_date,
+                            pending = excluded.pending,
+                            data = excluded.data
+                        """,
+                        self._row(task),
+                    )
+
+    @_serialized
+    def delete_tasks(self, todoist_ids: Iterable[str]) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM tasks WHERE todoist_id = ?", ((todoist_id,) for todoist_id in todoist_ids)
+            )
+
+    @_serialized
+    def get_task(self, todoist_id: str) -> Optional[Dict]:
+        row = self.conn.execute("SELECT data FROM tasks WHERE todoist_id = ?", (todoist_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @_serialized
+    def get_tasks(self, todoist_ids: Iterable[str]) -> Dict[str, Dict]:
+        todoist_ids = list(todoist_ids)
+        found = {}
+        for offset in range(0, len(todoist_ids), self.MAX_VARIABLES):
+            chunk = todoist_ids[offset:offset + self.MAX_VARIABLES]
+            rows = self.conn.execute(
+                f"SELECT todoist_id, data FROM tasks WHERE todoist_id IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            found.update((todoist_id, json.loads(data)) for todoist_id, data in rows)
+        return found
+
+    @_serialized
+    def get_pending_tasks(self) -> List[Dict]:
+        rows = self.conn.execute("SELECT data FROM tasks WHERE pending = 1 ORDER BY pos")
+        return [json.loads(data) for (data,) in rows]
+
+    @_serialized
+    def get_tasks_due(self, due_date: str) -> List[Dict]:
+        """Активные задачи с указанной датой выполнения"""
+        rows = self.conn.execute(
+            "SELECT data FROM tasks WHERE due_date = ? AND completed_at IS NULL ORDER BY pos", (due_date,)
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    @_serialized
+    def get_meta(self) -> Dict:
+        return {key: json.loads(value) for key, value in self.conn.execute("SELECT key, value FROM meta")}
+
+    @_serialized
+    def update_meta(self, values: Dict) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                ((key, json.dumps(value, ensure_ascii=False)) for key, value in values.items()),
+            )
+
+    @_serialized
+    def close(self) -> None:
+        self.conn.close()
+
+
+def create_task_store(kind: str, directory: Path) -> TaskStore:
+    """Создать хранилище задач по типу ("yaml" или "sqlite")"""
+    directory = Path(directory)
+    if kind == "sqlite":
+        return SQLiteTaskStore(directory / "todoist.db")
+    return YamlTaskStore(directory / "todoist.yml")
+
+
+def main():
+    """Миграция задач между YAML и SQLite"""
+    if len(sys.argv) < 2 or sys.argv[1] not in ("migrate", "export"):
+        print("Использование: python -m bot.services.task_store [migrate|export] [директория]")
+        print("  migrate - перенести todoist.yml в todoist.db")
+        print("  export  - выгрузить todoist.db в todoist.yml")
+        return
+
+    directory = Path(sys.argv[2]) if len(sys.argv) > 2 else Path("memory/tasks")
+    yaml_store = YamlTaskStore(directory / "todoist.yml")
+    sqlite_store = SQLiteTaskStore(directory / "todoist.db")
+
+    try:
+        if sys.argv[1] == "migrate":
+            source, target = yaml_store, sqlite_store
+        else:
+            source, target = sqlite_store, yaml_store
+
+        content = source.load()
+        target.save(content)
+        print(f"✅ Перенесено задач: {len(content.get('tasks', []))} ({source.path} -> {target.path})")
+    finally:
+        sqlite_store.close()
+
+
+if __name__ == "__main__":
+    main()
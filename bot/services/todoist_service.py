@@ -3,16 +3,91 @@
 """
 
 import aiohttp
+import asyncio
+import json
 import logging
-import yaml
+import time
+import uuid
 import os
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from dataclasses import dataclass, asdict
 from pathlib import Path
 
+from .task_store import TaskStore, create_task_store
+from ..utils.rate_limit import RateLimiter, RetryHint, parse_retry_after
+
+try:
+    # orjson необязателен: разбирает ответы в несколько раз быстрее json
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+# Максимум команд в одном запросе к Sync API
+SYNC_BATCH_SIZE = 100
+
+# Операции экспорта -> типы команд Sync API
+SYNC_COMMAND_TYPES = {
+    "create": "item_add",
+    "update": "item_update",
+    "close": "item_close",
+    "delete": "item_delete",
+}
+
+
+# Временные ответы сервера, после которых запрос можно повторить
+RETRYABLE_STATUSES = {500, 502, 503, 504}
+
+# Время жизни кэша проектов и меток, сек
+CATALOG_TTL = 300.0
+
+# Сколько секунд список задач на сегодня считается свежим
+TODAY_TASKS_TTL = 60.0
+
+
+class TodoistAPIError(Exception):
+    """Todoist вернул ошибку"""
+    
+    def __init__(self, status: int):
+        super().__init__(f"Todoist API ошибка: {status}")
+        self.status = status
+
+
+class TodoistRateLimitError(TodoistAPIError):
+    """Todoist вернул 429 Too Many Requests"""
+    
+    def __init__(self, retry_after: Optional[float]):
+        super().__init__(429)
+        self.retry_after = retry_after
+
+
+@dataclass
+class CatalogCache:
+    """Закэшированный список проектов или меток"""
+    items: List[Dict]
+    etag: Optional[str] = None
+    fetched_at: float = 0.0
+
+
+@dataclass
+class TodayTasksCache:
+    """Закэшированный список задач на сегодня"""
+    day: str
+    tasks: List["TodoistTask"]
+    fetched_at: float
+
+
+@dataclass
+class TodayCacheMetrics:
+    """Счетчики кэша задач на сегодня"""
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    invalidations: int = 0
+
 
 @dataclass
 class MemoryTask:
@@ -29,31 +104,62 @@ class MemoryTask:
     to_delete: Optional[bool] = None
     deleted_at: Optional[str] = None
     deleted_from: Optional[str] = None
+    closed_at: Optional[str] = None
 
 
-@dataclass
 class TodoistTask:
-    """Модель задачи Todoist"""
-    id: str
-    content: str
-    description: Optional[str] = None
-    project_id: Optional[str] = None
-    section_id: Optional[str] = None
-    parent_id: Optional[str] = None
-    order: int = 0
-    labels: List[str] = None
-    priority: int = 1
-    due: Optional[Dict] = None
-    url: str = ""
-    comment_count: int = 0
-    created_at: str = ""
-    created_by: str = ""
-    assignee: Optional[str] = None
-    assigner: Optional[str] = None
-    responsible_uid: Optional[str] = None
-    sync_id: Optional[str] = None
-    completed_at: Optional[str] = None
-    added_at: str = ""
+    """Модель задачи Todoist (__slots__: без __dict__ на каждый экземпляр)"""
+    
+    __slots__ = (
+        "id", "content", "description", "project_id", "section_id", "parent_id",
+        "order", "labels", "priority", "due", "url", "comment_count", "created_at",
+        "created_by", "assignee", "assigner", "responsible_uid", "sync_id",
+        "completed_at", "added_at",
+    )
+    
+    def __init__(self, id: str, content: str, description: Optional[str] = None,
+                 project_id: Optional[str] = None, section_id: Optional[str] = None,
+                 parent_id: Optional[str] = None, order: int = 0, labels: List[str] = None,
+                 priority: int = 1, due: Optional[Dict] = None, url: str = "",
+                 comment_count: int = 0, created_at: str = "", created_by: str = "",
+                 assignee: Optional[str] = None, assigner: Optional[str] = None,
+                 responsible_uid: Optional[str] = None, sync_id: Optional[str] = None,
+                 completed_at: Optional[str] = None, added_at: str = ""):
+        self.id = id
+        self.content = content
+        self.description = description
+        self.project_id = project_id
+        self.section_id = section_id
+        self.parent_id = parent_id
+        self.order = order
+        self.labels = labels
+        self.priority = priority
+        self.due = due
+        self.url = url
+        self.comment_count = comment_count
+        self.created_at = created_at
+        self.created_by = created_by
+        self.assignee = assignee
+        self.assigner = assigner
+        self.responsible_uid = responsible_uid
+        self.sync_id = sync_id
+        self.completed_at = completed_at
+        self.added_at = added_at
+    
+    def __repr__(self) -> str:
+        return f"TodoistTask(id={self.id!r}, content={self.content!r})"
+    
+    @classmethod
+    def from_api(cls, data: Dict) -> "TodoistTask":
+        """Создать задачу из ответа Todoist API (поля передаются по порядку)"""
+        get = data.get
+        return cls(
+            get("id"), get("content", ""), get("description"), get("project_id"),
+            get("section_id"), get("parent_id"), get("order", 0), get("labels", []),
+            get("priority", 1), get("due"), get("url", ""), get("comment_count", 0),
+            get("created_at", ""), get("created_by", ""), get("assignee"), get("assigner"),
+            get("responsible_uid"), get("sync_id"), get("completed_at"), get("added_at", ""),
+        )
 
 
 class TodoistService:
@@ -62,68 +168,202 @@ class TodoistService:
     def __init__(self, config):
         self.api_token = config.todoist_api_token
         self.base_url = "https://api.todoist.com/rest/v2"
+        self.sync_url = "https://api.todoist.com/sync/v9/sync"
+        self.backend = getattr(config, "todoist_backend", "rest")
         self.headers = {
             "Authorization": f"Bearer {self.api_token}",
             "Content-Type": "application/json"
         }
         self.memory_path = Path("memory/tasks")
+        self.task_store_kind = getattr(config, "task_store", "yaml")
+        self._task_store: Optional[TaskStore] = None
+        
+        # Параметры пула соединений
+        self.pool_limit = getattr(config, "todoist_pool_limit", 20)
+        self.pool_limit_per_host = getattr(config, "todoist_pool_limit_per_host", 10)
+        self.keepalive_timeout = getattr(config, "todoist_keepalive_timeout", 30.0)
+        self.dns_cache_ttl = getattr(config, "todoist_dns_cache_ttl", 300)
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # Параметры массового экспорта
+        self.export_concurrency = getattr(config, "todoist_export_concurrency", 8)
+        
+        # Кэш проектов и меток: TTL + условные запросы по ETag
+        self.catalog_ttl = getattr(config, "todoist_catalog_ttl", CATALOG_TTL)
+        self._catalogs: Dict[str, CatalogCache] = {}
+        
+        # Кэш задач на сегодня: stale-while-revalidate, сброс при изменениях.
+        # Сервис привязан к одному токену, то есть к одному пользователю Todoist
+        self.today_ttl = getattr(config, "todoist_today_ttl", TODAY_TASKS_TTL)
+        self._today: Optional[TodayTasksCache] = None
+        self._today_generation = 0
+        self._today_refresh: Optional[asyncio.Task] = None
+        self._today_refresh_key: Optional[tuple] = None
+        self.today_metrics = TodayCacheMetrics()
+        
+        # Общий ограничитель частоты и повторы для всех запросов сервиса
+        self.limiter = RateLimiter(
+            "Todoist",
+            rate=getattr(config, "todoist_requests_per_second", 1000 / 900),
+            capacity=getattr(config, "todoist_request_burst", 1000),
+            max_retries=getattr(config, "todoist_rate_limit_retries", 3),
+        )
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Получить долгоживущую сессию с пулом соединений (создается лениво)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_limit,
+                limit_per_host=self.pool_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+            )
+        return self._session
+    
+    async def close(self) -> None:
+        """Закрыть сессию, освободить соединения пула и хранилище задач"""
+        if self._today_refresh is not None and not self._today_refresh.done():
+            self._today_refresh.cancel()
+            try:
+                await self._today_refresh
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._today_refresh = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("Сессия Todoist закрыта")
+        self._session = None
+        if self._task_store is not None:
+            self._task_store.close()
+            self._task_store = None
     
-    async def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Dict:
-        """Выполнить запрос к Todoist API"""
+    async def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None,
+                            base_url: Optional[str] = None, request_id: Optional[str] = None,
+                            headers: Optional[Dict] = None, meta: Optional[Dict] = None) -> Optional[Dict]:
+        """Выполнить запрос к Todoist API через общий ограничитель с повторами
+        
+        POST-запросы получают X-Request-Id, одинаковый для всех попыток: Todoist
+        не выполняет повторно запрос с уже виденным id, поэтому повтор
+        безопасен. Команды Sync API защищены своими uuid так же.
+        В meta (если передан) записывается ETag ответа; 304 возвращает None.
+        """
         if not self.api_token:
             raise ValueError("Todoist API токен не настроен")
         
-        url = f"{self.base_url}{endpoint}"
+        url = f"{base_url or self.base_url}{endpoint}"
+        headers = dict(headers or {})
+        if method == "POST":
+            headers["X-Request-Id"] = request_id or str(uuid.uuid4())
         
-        async with aiohttp.ClientSession() as session:
-            async with session.request(method, url, headers=self.headers, json=data) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    error_text = await response.text()
-                    logger.error(f"Todoist API ошибка: {response.status} - {error_text}")
-                    raise Exception(f"Todoist API ошибка: {response.status}")
+        return await self.limiter.call(
+            lambda: self._send_request(method, url, data, headers or None, meta),
+            classify=self._classify_error,
+        )
+    
+    async def _send_request(self, method: str, url: str, data: Optional[Dict],
+                            headers: Optional[Dict], meta: Optional[Dict] = None) -> Optional[Dict]:
+        """Одна попытка запроса к Todoist API"""
+        session = self._get_session()
+        async with session.request(method, url, json=data, headers=headers) as response:
+            if meta is not None:
+                meta["etag"] = response.headers.get("ETag")
+            if response.status == 200:
+                return await response.json(loads=json_loads)
+            elif response.status == 204:
+                return {}
+            elif response.status == 304:
+                return None
+            elif response.status == 429:
+                raise TodoistRateLimitError(parse_retry_after(response.headers.get("Retry-After")))
+            else:
+                error_text = await response.text()
+                logger.error(f"Todoist API ошибка: {response.status} - {error_text}")
+                raise TodoistAPIError(response.status)
+    
+    @staticmethod
+    def _classify_error(error: Exception) -> Optional[RetryHint]:
+        """Какие ошибки Todoist временные и можно ли их повторить"""
+        if isinstance(error, TodoistRateLimitError):
+            return RetryHint(retry_after=error.retry_after, throttled=True, not_applied=True)
+        if isinstance(error, TodoistAPIError):
+            return RetryHint() if error.status in RETRYABLE_STATUSES else None
+        if isinstance(error, aiohttp.ClientConnectorError):
+            return RetryHint(not_applied=True)
+        if isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError)):
+            return RetryHint()
+        return None
     
     async def get_today_tasks(self) -> List[TodoistTask]:
-        """Получить задачи на сегодня"""
+        """Получить задачи на сегодня
+        
+        Свежий кэш (моложе today_ttl) отдается сразу. Устаревший тоже отдается
+        сразу, а список обновляется в фоне. Ключ кэша — локальная дата, так
+        что после полуночи первый запрос идет в Todoist. create_task,
+        complete_task, update_task и другие изменения сбрасывают кэш.
+        """
+        today = datetime.now().strftime("%Y-%m-%d")
+        cached = self._today
+        if cached and cached.day == today:
+            if time.monotonic() - cached.fetched_at < self.today_ttl:
+                self.today_metrics.hits += 1
+            else:
+                self.today_metrics.stale_hits += 1
+                self._refresh_today_tasks(today)
+            return list(cached.tasks)
+        
+        self.today_metrics.misses += 1
         try:
-            today = datetime.now().strftime("%Y-%m-%d")
-            endpoint = f"/tasks?filter=due:{today}"
-            
-            tasks_data = await self._make_request("GET", endpoint)
-            
-            tasks = []
-            for task_data in tasks_data:
-                task = TodoistTask(
-                    id=task_data.get("id"),
-                    content=task_data.get("content", ""),
-                    description=task_data.get("description"),
-                    project_id=task_data.get("project_id"),
-                    section_id=task_data.get("section_id"),
-                    parent_id=task_data.get("parent_id"),
-                    order=task_data.get("order", 0),
-                    labels=task_data.get("labels", []),
-                    priority=task_data.get("priority", 1),
-                    due=task_data.get("due"),
-                    url=task_data.get("url", ""),
-                    comment_count=task_data.get("comment_count", 0),
-                    created_at=task_data.get("created_at", ""),
-                    created_by=task_data.get("created_by", ""),
-                    assignee=task_data.get("assignee"),
-                    assigner=task_data.get("assigner"),
-                    responsible_uid=task_data.get("responsible_uid"),
-                    sync_id=task_data.get("sync_id"),
-                    completed_at=task_data.get("completed_at"),
-                    added_at=task_data.get("added_at", "")
-                )
-                tasks.append(task)
-            
-            logger.info(f"Получено {len(tasks)} задач на сегодня")
-            return tasks
-            
-        except Exception as e:
-            logger.error(f"Ошибка при получении задач на сегодня: {e}")
-            return []
+            return list(await asyncio.shield(self._refresh_today_tasks(today)))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return []  # ошибка залогирована в _on_today_refreshed
+    
+    def _refresh_today_tasks(self, day: str) -> asyncio.Task:
+        """Запустить загрузку задач на day или вернуть уже идущую"""
+        key = (day, self._today_generation)
+        task = self._today_refresh
+        if task is None or task.done() or self._today_refresh_key != key:
+            task = asyncio.get_running_loop().create_task(self._fetch_today_tasks(*key))
+            task.add_done_callback(self._on_today_refreshed)
+            self._today_refresh, self._today_refresh_key = task, key
+        return task
+    
+    async def _fetch_today_tasks(self, day: str, generation: int) -> List[TodoistTask]:
+        tasks_data = await self._make_request("GET", f"/tasks?filter=due:{day}")
+        tasks = [TodoistTask.from_api(task_data) for task_data in tasks_data]
+        self.today_metrics.refreshes += 1
+        
+        # Изменение во время запроса делает ответ устаревшим — не кэшируем его
+        if generation == self._today_generation:
+            self._today = TodayTasksCache(day=day, tasks=tasks, fetched_at=time.monotonic())
+        
+        logger.info(f"Получено {len(tasks)} задач на сегодня")
+        return tasks
+    
+    @staticmethod
+    def _on_today_refreshed(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Ошибка при получении задач на сегодня: {task.exception()}")
+    
+    def invalidate_today_tasks(self) -> None:
+        """Сбросить кэш задач на сегодня (после изменения задач)"""
+        self._today = None
+        self._today_generation += 1
+        self.today_metrics.invalidations += 1
+    
+    def get_cache_stats(self) -> Dict[str, float]:
+        """Статистика кэша задач на сегодня"""
+        metrics = self.today_metrics
+        requests = metrics.hits + metrics.stale_hits + metrics.misses
+        return {
+            **asdict(metrics),
+            "hit_rate": (metrics.hits + metrics.stale_hits) / requests if requests else 0.0,
+        }
     
     async def get_upcoming_tasks(self, days: int = 7) -> List[TodoistTask]:
         """Получить предстоящие задачи"""
@@ -132,31 +372,7 @@ class TodoistService:
             
             tasks_data = await self._make_request("GET", endpoint)
             
-            tasks = []
-            for task_data in tasks_data:
-                task = TodoistTask(
-                    id=task_data.get("id"),
-                    content=task_data.get("content", ""),
-                    description=task_data.get("description"),
-                    project_id=task_data.get("project_id"),
-                    section_id=task_data.get("section_id"),
-                    parent_id=task_data.get("parent_id"),
-                    order=task_data.get("order", 0),
-                    labels=task_data.get("labels", []),
-                    priority=task_data.get("priority", 1),
-                    due=task_data.get("due"),
-                    url=task_data.get("url", ""),
-                    comment_count=task_data.get("comment_count", 0),
-                    created_at=task_data.get("created_at", ""),
-                    created_by=task_data.get("created_by", ""),
-                    assignee=task_data.get("assignee"),
-                    assigner=task_data.get("assigner"),
-                    responsible_uid=task_data.get("responsible_uid"),
-                    sync_id=task_data.get("sync_id"),
-                    completed_at=task_data.get("completed_at"),
-                    added_at=task_data.get("added_at", "")
-                )
-                tasks.append(task)
+            tasks = [TodoistTask.from_api(task_data) for task_data in tasks_data]
             
             logger.info(f"Получено {len(tasks)} предстоящих задач")
             return tasks
@@ -165,38 +381,18 @@ class TodoistService:
             logger.error(f"Ошибка при получении предстоящих задач: {e}")
             return []
     
-    async def create_task(self, content: str, **kwargs) -> TodoistTask:
-        """Создать новую задачу"""
+    async def create_task(self, content: str, request_id: Optional[str] = None, **kwargs) -> TodoistTask:
+        """Создать новую задачу (request_id — ключ идемпотентности X-Request-Id)"""
         try:
             task_data = {
                 "content": content,
                 **kwargs
             }
             
-            task_data = await self._make_request("POST", "/tasks", task_data)
-            
-            task = TodoistTask(
-                id=task_data.get("id"),
-                content=task_data.get("content", ""),
-                description=task_data.get("description"),
-                project_id=task_data.get("project_id"),
-                section_id=task_data.get("section_id"),
-                parent_id=task_data.get("parent_id"),
-                order=task_data.get("order", 0),
-                labels=task_data.get("labels", []),
-                priority=task_data.get("priority", 1),
-                due=task_data.get("due"),
-                url=task_data.get("url", ""),
-                comment_count=task_data.get("comment_count", 0),
-                created_at=task_data.get("created_at", ""),
-                created_by=task_data.get("created_by", ""),
-                assignee=task_data.get("assignee"),
-                assigner=task_data.get("assigner"),
-                responsible_uid=task_data.get("responsible_uid"),
-                sync_id=task_data.get("sync_id"),
-                completed_at=task_data.get("completed_at"),
-                added_at=task_data.get("added_at", "")
-            )
+            task_data = await self._make_request("POST", "/tasks", task_data, request_id=request_id)
+            
+            task = TodoistTask.from_api(task_data)
+            self.invalidate_today_tasks()
             
             logger.info(f"Создана задача в Todoist: {content}")
             return task
@@ -205,11 +401,62 @@ class TodoistService:
             logger.error(f"Ошибка при создании задачи: {e}")
             raise
     
+    async def create_tasks(self, items: List[Dict]) -> Dict[str, str]:
+        """Создать несколько задач, вернуть {id элемента: todoist_id} для созданных
+        
+        Элемент: id и temp_id (ключи идемпотентности), content и поля задачи в
+        fields. Бэкенд sync отправляет до SYNC_BATCH_SIZE команд item_add одним
+        запросом, rest — параллельные POST /tasks с X-Request-Id = id.
+        """
+        created = {}
+        
+        if self.backend == "sync":
+            for offset in range(0, len(items), SYNC_BATCH_SIZE):
+                batch = items[offset:offset + SYNC_BATCH_SIZE]
+                commands = [
+                    {"type": "item_add", "uuid": item["id"], "temp_id": item["temp_id"],
+                     "args": {"content": item["content"], **item.get("fields", {})}}
+                    for item in batch
+                ]
+                try:
+                    response = await self._make_request(
+                        "POST", "", {"commands": commands}, base_url=self.sync_url
+                    )
+                except Exception as e:
+                    logger.error(f"Ошибка пакета Sync API: {e}")
+                    continue
+                
+                sync_status = response.get("sync_status", {})
+                temp_id_mapping = response.get("temp_id_mapping", {})
+                for item in batch:
+                    todoist_id = temp_id_mapping.get(item["temp_id"])
+                    if sync_status.get(item["id"]) == "ok" and todoist_id:
+                        created[item["id"]] = todoist_id
+                    else:
+                        logger.error(f"Задача не создана: {item['content']}: {sync_status.get(item['id'])}")
+            if created:
+                self.invalidate_today_tasks()
+            return created
+        
+        semaphore = asyncio.Semaphore(self.export_concurrency)
+        
+        async def create(item: Dict) -> None:
+            async with semaphore:
+                try:
+                    task = await self.create_task(item["content"], request_id=item["id"], **item.get("fields", {}))
+                    created[item["id"]] = task.id
+                except Exception:
+                    pass  # ошибка уже залогирована в create_task
+        
+        await asyncio.gather(*(create(item) for item in items))
+        return created
+    
     async def complete_task(self, task_id: str) -> bool:
         """Завершить задачу"""
         try:
             endpoint = f"/tasks/{task_id}/close"
             await self._make_request("POST", endpoint)
+            self.invalidate_today_tasks()
             
             logger.info(f"Задача {task_id} завершена в Todoist")
             return True
@@ -224,28 +471,8 @@ class TodoistService:
             endpoint = f"/tasks/{task_id}"
             task_data = await self._make_request("POST", endpoint, kwargs)
             
-            task = TodoistTask(
-                id=task_data.get("id"),
-                content=task_data.get("content", ""),
-                description=task_data.get("description"),
-                project_id=task_data.get("project_id"),
-                section_id=task_data.get("section_id"),
-                parent_id=task_data.get("parent_id"),
-                order=task_data.get("order", 0),
-                labels=task_data.get("labels", []),
-                priority=task_data.get("priority", 1),
-                due=task_data.get("due"),
-                url=task_data.get("url", ""),
-                comment_count=task_data.get("comment_count", 0),
-                created_at=task_data.get("created_at", ""),
-                created_by=task_data.get("created_by", ""),
-                assignee=task_data.get("assignee"),
-                assigner=task_data.get("assigner"),
-                responsible_uid=task_data.get("responsible_uid"),
-                sync_id=task_data.get("sync_id"),
-                completed_at=task_data.get("completed_at"),
-                added_at=task_data.get("added_at", "")
-            )
+            task = TodoistTask.from_api(task_data)
+            self.invalidate_today_tasks()
             
             logger.info(f"Задача {task_id} обновлена в Todoist")
             return task
@@ -259,6 +486,7 @@ class TodoistService:
         try:
             endpoint = f"/tasks/{task_id}"
             await self._make_request("DELETE", endpoint)
+            self.invalidate_today_tasks()
             
             logger.info(f"Задача {task_id} удалена из Todoist")
             return True
@@ -267,185 +495,454 @@ class TodoistService:
             logger.error(f"Ошибка при удалении задачи: {e}")
             return False
     
+    async def _get_catalog(self, resource: str) -> List[Dict]:
+        """Проекты или метки из кэша; после TTL — условный запрос с If-None-Match"""
+        cached = self._catalogs.get(resource)
+        if cached and time.monotonic() - cached.fetched_at < self.catalog_ttl:
+            return cached.items
+        
+        headers = {"If-None-Match": cached.etag} if cached and cached.etag else None
+        meta = {}
+        data = await self._make_request("GET", f"/{resource}", headers=headers, meta=meta)
+        
+        if data is None and cached:
+            # 304 Not Modified: список не изменился, продлеваем TTL
+            cached.fetched_at = time.monotonic()
+            return cached.items
+        
+        if data is None:
+            # 304 или пустой ответ без кэша: сравнивать не с чем, кэш не заполняем
+            logger.error(f"Пустой ответ Todoist при получении {resource}")
+            return []
+        
+        self._catalogs[resource] = CatalogCache(data, meta.get("etag"), time.monotonic())
+        logger.info(f"Получено {len(data)} ({resource}) из Todoist")
+        return data
+    
+    def invalidate_catalog(self, resource: Optional[str] = None) -> None:
+        """Сбросить кэш проектов ("projects"), меток ("labels") или весь"""
+        if resource is None:
+            self._catalogs.clear()
+        else:
+            self._catalogs.pop(resource, None)
+    
     async def get_projects(self) -> List[Dict]:
-        """Получить список проектов"""
+        """Получить список проектов (из кэша, если он свежий)"""
         try:
-            projects_data = await self._make_request("GET", "/projects")
-            logger.info(f"Получено {len(projects_data)} проектов")
-            return projects_data
+            return await self._get_catalog("projects")
             
         except Exception as e:
             logger.error(f"Ошибка при получении проектов: {e}")
             return []
     
     async def get_labels(self) -> List[Dict]:
-        """Получить список меток"""
+        """Получить список меток (из кэша, если он свежий)"""
         try:
-            labels_data = await self._make_request("GET", "/labels")
-            logger.info(f"Получено {len(labels_data)} меток")
-            return labels_data
+            return await self._get_catalog("labels")
             
         except Exception as e:
             logger.error(f"Ошибка при получении меток: {e}")
             return []
     
-    def _ensure_memory_directory(self) -> None:
-        """Убедиться, что директория памяти существует"""
-        self.memory_path.mkdir(parents=True, exist_ok=True)
+    async def get_project_names(self) -> Dict[str, str]:
+        """Карта id проекта -> название (из кэша проектов)"""
+        return {project['id']: project['name'] for project in await self.get_projects()}
+    
+    @property
+    def task_store(self) -> TaskStore:
+        """Хранилище задач памяти (создается при первом обращении)"""
+        if self._task_store is None:
+            self._task_store = create_task_store(self.task_store_kind, self.memory_path)
+        return self._task_store
     
-    def _load_memory_tasks(self) -> Dict:
-        """Загрузить задачи из памяти"""
-        todoist_file = self.memory_path / "todoist.yml"
+    def _build_update_data(self, task: Dict, project_map: Dict[str, str]) -> Dict:
+        """Подготовить данные задачи памяти для создания/обновления в Todoist"""
+        update_data = {
+            "content": task['content'],
+            "priority": task.get('priority', 1)
+        }
         
-        if todoist_file.exists():
-            try:
-                with open(todoist_file, 'r', encoding='utf-8') as f:
-                    content = yaml.safe_load(f)
-                    return content or {"tasks": []}
-            except Exception as e:
-                logger.error(f"Ошибка загрузки файла памяти: {e}")
+        if task.get('description'):
+            update_data['description'] = task['description']
+        
+        if task.get('due_date'):
+            update_data['due_date'] = task['due_date']
+        
+        if task.get('labels'):
+            update_data['labels'] = task['labels']
         
-        return {"tasks": []}
+        if task.get('project'):
+            project_id = project_map.get(task['project'])
+            if project_id:
+                update_data['project_id'] = project_id
+        
+        return update_data
+    
+    @staticmethod
+    def _plan_export_action(task: Dict) -> Optional[str]:
+        """Определить операцию экспорта для задачи памяти"""
+        if task.get('to_delete'):
+            if task.get('todoist_id') and not task.get('deleted_at'):
+                return "delete"
+            return None
+        if task.get('completed_at'):
+            if task.get('todoist_id') and not task.get('closed_at'):
+                return "close"
+            return None
+        if task.get('todoist_id'):
+            return "update"
+        return "create"
     
-    def _save_memory_tasks(self, content: Dict) -> None:
-        """Сохранить задачи в память"""
-        self._ensure_memory_directory()
-        todoist_file = self.memory_path / "todoist.yml"
+    def _apply_export_result(self, task: Dict, action: str, todoist_id: Optional[str] = None) -> None:
+        """Отразить успешную операцию экспорта в задаче памяти"""
+        if action == "delete":
+            task['deleted_at'] = datetime.now().isoformat()
+            task['deleted_from'] = 'memory'
+            logger.info(f"Удалена задача: {task['content']}")
+        elif action == "close":
+            task['closed_at'] = datetime.now().isoformat()
+            logger.info(f"Закрыта задача: {task['content']}")
+        elif action == "update":
+            logger.info(f"Обновлена задача: {task['content']}")
+        elif action == "create":
+            task['todoist_id'] = todoist_id
+            logger.info(f"Создана задача: {task['content']}")
+    
+    async def _export_task(self, task: Dict, action: str, project_map: Dict[str, str]) -> Dict:
+        """Экспортировать одну задачу через REST, вернуть результат
+        
+        Повторы при 429 и временных ошибках выполняет ограничитель в _make_request.
+        """
+        result = {"content": task.get('content', 'Unknown'), "action": action, "ok": False, "error": None}
         
         try:
-            with open(todoist_file, 'w', encoding='utf-8') as f:
-                yaml.dump(content, f, default_flow_style=False, allow_unicode=True)
-            logger.info(f"Задачи сохранены в {todoist_file}")
+            todoist_id = task.get('todoist_id')
+            if action == "delete":
+                await self._make_request("DELETE", f"/tasks/{todoist_id}")
+            elif action == "close":
+                await self._make_request("POST", f"/tasks/{todoist_id}/close")
+            elif action == "update":
+                await self.update_task(todoist_id, **self._build_update_data(task, project_map))
+            else:
+                update_data = self._build_update_data(task, project_map)
+                update_data.pop("content")
+                new_task = await self.create_task(task['content'], **update_data)
+                todoist_id = new_task.id
+            
+            self._apply_export_result(task, action, todoist_id)
+            result["ok"] = True
+            
         except Exception as e:
-            logger.error(f"Ошибка сохранения файла памяти: {e}")
+            result["error"] = str(e)
+            logger.error(f"Ошибка обработки задачи {result['content']}: {e}")
+        
+        return result
+    
+    async def _export_rest(self, planned: List[tuple], project_map: Dict[str, str]) -> List[Dict]:
+        """Экспорт через REST v2: по запросу на задачу, параллельно с ограничением"""
+        semaphore = asyncio.Semaphore(self.export_concurrency)
+        
+        async def run(task: Dict, action: str) -> Dict:
+            async with semaphore:
+                return await self._export_task(task, action, project_map)
+        
+        return list(await asyncio.gather(*(run(task, action) for task, action in planned)))
+    
+    def _build_sync_command(self, task: Dict, action: str, project_map: Dict[str, str]) -> Dict:
+        """Построить команду Sync API для задачи памяти"""
+        command = {"type": SYNC_COMMAND_TYPES[action], "uuid": str(uuid.uuid4())}
+        
+        if action in ("delete", "close"):
+            command["args"] = {"id": task['todoist_id']}
+            return command
+        
+        args = self._build_update_data(task, project_map)
+        if "due_date" in args:
+            args["due"] = {"date": args.pop("due_date")}
+        
+        if action == "update":
+            # Sync API не переносит задачу между проектами в item_update
+            args.pop("project_id", None)
+            args["id"] = task['todoist_id']
+        else:
+            command["temp_id"] = str(uuid.uuid4())
+        
+        command["args"] = args
+        return command
+    
+    async def _export_sync(self, planned: List[tuple], project_map: Dict[str, str]) -> List[Dict]:
+        """Экспорт через Sync API: до SYNC_BATCH_SIZE команд в одном запросе"""
+        results = []
+        
+        for offset in range(0, len(planned), SYNC_BATCH_SIZE):
+            batch = planned[offset:offset + SYNC_BATCH_SIZE]
+            commands = [self._build_sync_command(task, action, project_map) for task, action in batch]
+            response = None
+            error = None
+            
+            try:
+                response = await self._make_request(
+                    "POST", "", {"commands": commands}, base_url=self.sync_url
+                )
+            except Exception as e:
+                error = str(e)
+                logger.error(f"Ошибка пакета Sync API: {e}")
+            
+            sync_status = (response or {}).get("sync_status", {})
+            temp_id_mapping = (response or {}).get("temp_id_mapping", {})
+            
+            for (task, action), command in zip(batch, commands):
+                result = {"content": task.get('content', 'Unknown'), "action": action, "ok": False, "error": error}
+                status = sync_status.get(command["uuid"])
+                
+                if status == "ok":
+                    self._apply_export_result(task, action, temp_id_mapping.get(command.get("temp_id")))
+                    result["ok"] = True
+                    result["error"] = None
+                elif status is not None:
+                    result["error"] = str(status)
+                    logger.error(f"Ошибка обработки задачи {result['content']}: {status}")
+                
+                results.append(result)
+        
+        return results
     
-    async def export_to_todoist(self) -> None:
-        """Экспорт задач из памяти в Todoist"""
+    async def export_to_todoist(self) -> Optional[Dict]:
+        """Экспорт задач из памяти в Todoist (REST параллельно или пакетами Sync API)"""
         try:
             # Получить проекты для создания карты
             projects = await self.get_projects()
             project_map = {project['name']: project['id'] for project in projects}
             
-            # Загрузить задачи из памяти
-            memory_content = self._load_memory_tasks()
-            tasks = memory_content.get("tasks", [])
-            
-            updated_count = 0
-            deleted_count = 0
-            
-            for task in tasks:
-                try:
-                    # Обработать удаление
-                    if task.get('to_delete') and task.get('todoist_id'):
-                        await self.delete_task(task['todoist_id'])
-                        task['deleted_at'] = datetime.now().isoformat()
-                        task['deleted_from'] = 'memory'
-                        deleted_count += 1
-                        logger.info(f"Удалена задача: {task['content']}")
-                        continue
-                    
-                    # Подготовить данные для обновления/создания
-                    update_data = {
-                        "content": task['content'],
-                        "priority": task.get('priority', 1)
-                    }
-                    
-                    if task.get('description'):
-                        update_data['description'] = task['description']
-                    
-                    if task.get('due_date'):
-                        update_data['due_date'] = task['due_date']
-                    
-                    if task.get('labels'):
-                        update_data['labels'] = task['labels']
-                    
-                    if task.get('project'):
-                        project_id = project_map.get(task['project'])
-                        if project_id:
-                            update_data['project_id'] = project_id
-                    
-                    # Создать или обновить задачу
-                    if task.get('todoist_id'):
-                        await self.update_task(task['todoist_id'], **update_data)
-                        logger.info(f"Обновлена задача: {task['content']}")
-                    else:
-                        new_task = await self.create_task(task['content'], **update_data)
-                        task['todoist_id'] = new_task.id
-                        logger.info(f"Создана задача: {task['content']}")
-                    
-                    updated_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Ошибка обработки задачи {task.get('content', 'Unknown')}: {e}")
-            
-            # Сохранить обновленные данные
-            memory_content['last_synced'] = datetime.now().isoformat()
-            self._save_memory_tasks(memory_content)
+            # Одна загрузка и одна запись хранилища на весь экспорт
+            with self.task_store.session():
+                # Загрузить задачи, которые еще не закрыты и не удалены в Todoist
+                tasks = self.task_store.get_pending_tasks()
+                
+                planned = []
+                for task in tasks:
+                    action = self._plan_export_action(task)
+                    if action:
+                        planned.append((task, action))
+                
+                started = time.perf_counter()
+                if self.backend == "sync":
+                    results = await self._export_sync(planned, project_map)
+                else:
+                    results = await self._export_rest(planned, project_map)
+                elapsed = time.perf_counter() - started
+                if any(r["ok"] for r in results):
+                    self.invalidate_today_tasks()
+                
+                # Сохранить только измененные задачи: созданные получили todoist_id,
+                # закрытые — closed_at, удаленные из Todoist удаляются и из памяти
+                done = [(task, action) for (task, action), r in zip(planned, results) if r["ok"]]
+                self.task_store.upsert_tasks(task for task, action in done if action in ("create", "close"))
+                self.task_store.delete_tasks(task['todoist_id'] for task, action in done if action == "delete")
+                self.task_store.update_meta({'last_synced': datetime.now().isoformat()})
+            
+            summary = {
+                "backend": self.backend,
+                "created": sum(1 for r in results if r["ok"] and r["action"] == "create"),
+                "updated": sum(1 for r in results if r["ok"] and r["action"] == "update"),
+                "closed": sum(1 for r in results if r["ok"] and r["action"] == "close"),
+                "deleted": sum(1 for r in results if r["ok"] and r["action"] == "delete"),
+                "failed": [r for r in results if not r["ok"]],
+                "elapsed": elapsed,
+                "throughput": len(results) / elapsed if elapsed > 0 else 0.0,
+            }
             
-            logger.info(f"✅ Экспорт завершен: {updated_count} обновлено, {deleted_count} удалено")
+            logger.info(
+                f"✅ Экспорт завершен ({self.backend}): {summary['created']} создано, "
+                f"{summary['updated']} обновлено, {summary['closed']} закрыто, "
+                f"{summary['deleted']} удалено, {len(summary['failed'])} ошибок "
+                f"за {elapsed:.2f} сек ({summary['throughput']:.1f} задач/сек)"
+            )
+            return summary
             
         except Exception as e:
             logger.error(f"Ошибка экспорта в Todoist: {e}")
+            return None
     
-    async def import_from_todoist(self) -> None:
-        """Импорт задач из Todoist в память"""
+    async def _sync_read(self, sync_token: str) -> Dict:
+        """Запросить изменения задач, проектов и меток через Sync API начиная с sync_token"""
+        return await self._make_request(
+            "POST", "",
+            {"sync_token": sync_token, "resource_types": ["items", "projects", "labels"]},
+            base_url=self.sync_url,
+        )
+    
+    async def _import_incremental(self) -> None:
+        """Инкрементальный импорт: применить к памяти только изменения с прошлого sync_token"""
+        meta = self.task_store.get_meta()
+        sync_token = meta.get('sync_token') or "*"
+        
         try:
-            # Получить активные задачи из Todoist
-            all_tasks = await self._make_request("GET", "/tasks")
-            projects = await self.get_projects()
-            project_map = {project['id']: project['name'] for project in projects}
-            
-            # Загрузить существующий контент
-            memory_content = self._load_memory_tasks()
-            existing_tasks = memory_content.get("tasks", [])
-            
-            # Создать множество текущих Todoist ID
-            todoist_ids = {task['id'] for task in all_tasks}
-            
-            # Проверить удаленные/завершенные задачи
-            for task in existing_tasks:
-                if task.get('todoist_id') and task['todoist_id'] not in todoist_ids:
+            response = await self._sync_read(sync_token)
+        except TodoistAPIError as e:
+            # 429 и 5xx уже повторены ограничителем — это не проблема токена
+            if sync_token == "*" or e.status == 429 or e.status in RETRYABLE_STATUSES:
+                raise
+            # Токен устарел или отозван — полная пересинхронизация
+            logger.warning(f"sync_token отклонен ({e}), выполняем полную синхронизацию")
+            response = await self._sync_read("*")
+        
+        full_sync = response.get('full_sync', sync_token == "*")
+        now = datetime.now().isoformat()
+        
+        # Карта проектов хранится рядом с задачами и обновляется дельтами
+        project_map = {} if full_sync else dict(meta.get('projects') or {})
+        for project in response.get('projects', []):
+            if project.get('is_deleted'):
+                project_map.pop(project['id'], None)
+            else:
+                project_map[project['id']] = project['name']
+        
+        # Кэш проектов и меток: полный снимок заменяет его, дельта сбрасывает
+        for resource in ("projects", "labels"):
+            if full_sync and resource in response:
+                entries = [entry for entry in response[resource] if not entry.get('is_deleted')]
+                self._catalogs[resource] = CatalogCache(entries, None, time.monotonic())
+            elif response.get(resource):
+                self.invalidate_catalog(resource)
+        
+        items = response.get('items', [])
+        by_id = self.task_store.get_tasks(item['id'] for item in items)
+        changed: Dict[str, Dict] = {}
+        removed_ids = set()
+        
+        for item in items:
+            item_id = item['id']
+            
+            if item.get('is_deleted'):
+                removed_ids.add(item_id)
+                changed.pop(item_id, None)
+                continue
+            
+            task = by_id.get(item_id)
+            if task is None:
+                task = {'content': item['content'], 'created_at': item.get('added_at') or now, 'todoist_id': item_id}
+                by_id[item_id] = task
+            
+            task['content'] = item['content']
+            task['priority'] = item.get('priority', 1)
+            task['project'] = project_map.get(item.get('project_id'))
+            task['labels'] = item.get('labels', [])
+            task['description'] = item.get('description')
+            task['due_date'] = item['due'].get('date') if item.get('due') else None
+            
+            if item.get('checked'):
+                if not task.get('completed_at'):
+                    task['completed_at'] = item.get('completed_at') or now
+                if not task.get('closed_at'):
+                    task['closed_at'] = task['completed_at']
+            elif task.get('closed_at'):
+                # Задача переоткрыта в Todoist; завершение без closed_at
+                # еще не выгружено, его не трогаем
+                task['completed_at'] = None
+                task.pop('closed_at', None)
+            changed[item_id] = task
+        
+        if full_sync:
+            # Полный снимок содержит только активные задачи: остальные уже закрыты
+            seen_ids = {item['id'] for item in items}
+            for task in self.task_store.get_pending_tasks():
+                todoist_id = task.get('todoist_id')
+                if todoist_id and todoist_id not in seen_ids:
                     if not task.get('completed_at'):
-                        task['completed_at'] = datetime.now().isoformat()
-            
-            # Удалить помеченные на удаление задачи
-            existing_tasks = [task for task in existing_tasks if not task.get('deleted_at')]
-            
-            # Конвертировать активные Todoist задачи в формат памяти
-            memory_tasks = []
-            for task in all_tasks:
-                memory_task = {
-                    'content': task['content'],
-                    'created_at': task['created_at'],
-                    'todoist_id': task['id'],
-                    'priority': task.get('priority', 1),
-                    'project': project_map.get(task.get('project_id')),
-                    'labels': task.get('labels', []),
-                    'description': task.get('description'),
-                    'due_date': task.get('due', {}).get('date') if task.get('due') else None,
-                    'completed_at': datetime.now().isoformat() if task.get('is_completed') else None
-                }
-                memory_tasks.append(memory_task)
-            
-            # Объединить с существующими завершенными задачами
-            completed_tasks = [task for task in existing_tasks if task.get('completed_at')]
-            all_tasks = memory_tasks + completed_tasks
-            
-            # Сохранить в файл памяти
-            memory_content = {
-                'last_synced': datetime.now().isoformat(),
-                'tasks': all_tasks
-            }
-            
-            self._save_memory_tasks(memory_content)
-            
-            active_count = len([t for t in all_tasks if not t.get('completed_at')])
-            completed_count = len(all_tasks) - active_count
-            
-            logger.info(f"✅ Импорт завершен: {len(all_tasks)} задач ({active_count} активных, {completed_count} завершенных)")
+                        task['completed_at'] = now
+                    if not task.get('closed_at'):
+                        task['closed_at'] = task['completed_at']
+                    changed[todoist_id] = task
+        
+        # Сначала задачи, потом sync_token: при сбое между ними дельта применится повторно
+        self.task_store.upsert_tasks(changed.values())
+        self.task_store.delete_tasks(removed_ids)
+        self.task_store.update_meta({
+            'projects': project_map,
+            'sync_token': response.get('sync_token', sync_token),
+            'last_synced': now,
+        })
+        
+        logger.info(
+            f"✅ Инкрементальный импорт завершен ({'полный' if full_sync else 'дельта'}): "
+            f"{len(items)} изменений, {len(changed)} задач записано, {len(removed_ids)} удалено"
+        )
+    
+    async def import_from_todoist(self) -> None:
+        """Импорт задач из Todoist в память
+        
+        Чтение через Sync API работает с тем же токеном при любом backend
+        экспорта, поэтому импорт всегда инкрементальный; полный импорт через
+        REST остается запасным путем.
+        """
+        with self.task_store.session():
+            try:
+                await self._import_incremental()
+                return
+            except Exception as e:
+                logger.warning(f"Инкрементальный импорт не удался ({e}), выполняем полный импорт через REST")
             
-        except Exception as e:
-            logger.error(f"Ошибка импорта из Todoist: {e}")
+            try:
+                await self._import_full()
+            except Exception as e:
+                logger.error(f"Ошибка импорта из Todoist: {e}")
+    
+    async def _import_full(self) -> None:
+        """Полный импорт через REST: все активные задачи и проекты"""
+        # Получить активные задачи из Todoist
+        all_tasks = await self._make_request("GET", "/tasks")
+        projects = await self.get_projects()
+        project_map = {project['id']: project['name'] for project in projects}
+        now = datetime.now().isoformat()
+        
+        # Создать множество текущих Todoist ID
+        todoist_ids = {task['id'] for task in all_tasks}
+        existing = self.task_store.get_tasks(todoist_ids)
+        changed = []
+        
+        # Задачи памяти, которых больше нет среди активных в Todoist, завершены или удалены
+        for task in self.task_store.get_pending_tasks():
+            if task.get('todoist_id') and task['todoist_id'] not in todoist_ids:
+                if not task.get('completed_at'):
+                    task['completed_at'] = now
+                if not task.get('closed_at'):
+                    task['closed_at'] = task['completed_at']
+                changed.append(task)
+        closed_count = len(changed)
+        
+        # Конвертировать активные Todoist задачи в формат памяти, записать только отличающиеся
+        for task in all_tasks:
+            memory_task = {
+                'content': task['content'],
+                'created_at': task['created_at'],
+                'todoist_id': task['id'],
+                'priority': task.get('priority', 1),
+                'project': project_map.get(task.get('project_id')),
+                'labels': task.get('labels', []),
+                'description': task.get('description'),
+                'due_date': task.get('due', {}).get('date') if task.get('due') else None,
+                'completed_at': now if task.get('is_completed') else None
+            }
+            current = existing.get(task['id'])
+            if current is not None and current.get('completed_at') and not current.get('closed_at'):
+                # Завершена локально и еще не выгружена в Todoist: не затираем завершение
+                memory_task['completed_at'] = current['completed_at']
+            if current is None or current.get('closed_at') or any(
+                current.get(key) != value for key, value in memory_task.items()
+            ):
+                if current is not None and current.get('closed_at'):
+                    # Переоткрытая в Todoist задача снова активна
+                    memory_task['closed_at'] = None
+                changed.append(memory_task)
+        
+        self.task_store.upsert_tasks(changed)
+        self.task_store.update_meta({'last_synced': now})
+        
+        logger.info(
+            f"✅ Импорт завершен: {len(all_tasks)} активных задач в Todoist, "
+            f"{len(changed) - closed_count} записано, {closed_count} завершено"
+        )
 
 
 async def main():
@@ -466,30 +963,33 @@ async def main():
     
     import sys
     
-    if len(sys.argv) > 1:
-        command = sys.argv[1]
-        
-        if command == "import":
-            await todoist_service.import_from_todoist()
-        elif command == "export":
-            await todoist_service.export_to_todoist()
-        else:
-            print("Использование: python -m bot.services.todoist_service [import|export]")
-    else:
-        print("Получение задач на сегодня...")
-        tasks = await todoist_service.get_today_tasks()
-        
-        if tasks:
-            print(f"\n📋 Найдено {len(tasks)} задач на сегодня:\n")
-            for i, task in enumerate(tasks, 1):
-                print(f"{i}. {task.content}")
-                if task.description:
-                    print(f"   📝 {task.description}")
-                if task.due:
-                    print(f"   📅 {task.due}")
-                print()
+    try:
+        if len(sys.argv) > 1:
+            command = sys.argv[1]
+            
+            if command == "import":
+                await todoist_service.import_from_todoist()
+            elif command == "export":
+                await todoist_service.export_to_todoist()
+            else:
+                print("Использование: python -m bot.services.todoist_service [import|export]")
         else:
-            print("Задачи на сегодня не найдены")
+            print("Получение задач на сегодня...")
+            tasks = await todoist_service.get_today_tasks()
+            
+            if tasks:
+                print(f"\n📋 Найдено {len(tasks)} задач на сегодня:\n")
+                for i, task in enumerate(tasks, 1):
+                    print(f"{i}. {task.content}")
+                    if task.description:
+                        print(f"   📝 {task.description}")
+                    if task.due:
+                        print(f"   📅 {task.due}")
+                    print()
+            else:
+                print("Задачи на сегодня не найдены")
+    finally:
+        await todoist_service.close()
 
 
 if __name__ == "__main__":
@@ -3,23 +3,310 @@
 """
 
 import os
+import stat
 import time
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from pathlib import Path
 import asyncio
+from dataclasses import dataclass, field
+
+from ..utils import inotify
 
 logger = logging.getLogger(__name__)
 
+# События inotify, после которых путь нужно перепроверить
+WATCH_MASK = (
+    inotify.IN_CREATE | inotify.IN_DELETE | inotify.IN_MODIFY | inotify.IN_CLOSE_WRITE
+    | inotify.IN_ATTRIB | inotify.IN_MOVED_FROM | inotify.IN_MOVED_TO
+    | inotify.IN_DELETE_SELF | inotify.IN_MOVE_SELF | inotify.IN_ONLYDIR
+)
+
+# Склейка событий: пачка обрабатывается после паузы DEBOUNCE секунд,
+# но не позже чем через DEBOUNCE_MAX секунд после первого события
+DEBOUNCE = 0.2
+DEBOUNCE_MAX = 2.0
+
+CREATED, MODIFIED, DELETED = "➕", "✏️", "🗑️"
+
+
+@dataclass
+class TreeScan:
+    """Результат одного обхода дерева памяти"""
+    files: Dict[str, Tuple[float, int]] = field(default_factory=dict)  # путь -> (mtime, размер)
+    directories: int = 0
+    total_size: int = 0
+
+
+def scan_tree(root: Path, start: str = "",
+              on_directory: Optional[Callable[[str], None]] = None) -> TreeScan:
+    """Обойти дерево за один проход os.scandir
+    
+    Тип записи берется из DirEntry без отдельного системного вызова, stat
+    делается один раз на файл. Как и раньше, не учитываются файлы и папки
+    со скрытым именем, но содержимое скрытых папок учитывается. on_directory
+    вызывается для каждой папки (относительный путь) до чтения ее содержимого.
+    """
+    scan = TreeScan()
+    stack = [start]
+    while stack:
+        relative = stack.pop()
+        if on_directory is not None:
+            on_directory(relative)
+        try:
+            entries = os.scandir(root / relative if relative else root)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                path = os.path.join(relative, entry.name) if relative else entry.name
+                hidden = entry.name.startswith('.')
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(path)
+                        if not hidden:
+                            scan.directories += 1
+                    elif not hidden and entry.is_file(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        scan.files[path] = (st.st_mtime, st.st_size)
+                        scan.total_size += st.st_size
+                except OSError:
+                    continue  # файл удален во время обхода
+    return scan
+
 
 class WatchService:
     """Сервис для мониторинга времени и изменений"""
     
-    def __init__(self, memory_path: str = "memory"):
+    def __init__(self, memory_path: str = "memory", debounce: float = DEBOUNCE):
         self.memory_path = Path(memory_path)
         self.last_check = datetime.now()
         self.file_timestamps = {}
+        
+        # Событийный режим (inotify): состояние дерева ведется инкрементально,
+        # а изменения копятся до следующего get_changed_files
+        self.debounce = debounce
+        self._inotify: Optional[inotify.Inotify] = None
+        self._watches: Dict[int, str] = {}
+        self._files: Dict[str, Tuple[float, int]] = {}
+        self._dirs: Set[str] = set()
+        self._total_size = 0
+        self._pending: Dict[str, str] = {}
+        self._dirty: Set[str] = set()
+        self._resync_needed = False
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._first_event_at = 0.0
+        self._changed = asyncio.Event()
+    
+    @property
+    def watching(self) -> bool:
+        """Работает ли событийный режим (inotify)"""
+        return self._inotify is not None
+    
+    @staticmethod
+    def _join(parent: str, name: str) -> str:
+        return os.path.join(parent, name) if parent else name
+    
+    def start_watching(self) -> bool:
+        """Включить событийный режим; False — inotify недоступен, остается опрос
+        
+        Нужен работающий цикл событий. Дерево сканируется один раз, дальше
+        файлы и размеры обновляются по событиям, без повторного обхода.
+        """
+        if self._inotify is not None:
+            return True
+        if not inotify.is_available() or not self.memory_path.exists():
+            logger.info("inotify недоступен, изменения отслеживаются опросом")
+            return False
+        
+        try:
+            self._inotify = inotify.Inotify()
+            self._files, self._dirs, self._total_size = {}, set(), 0
+            self._add_subtree("", report=False)
+        except OSError as e:
+            # Например, исчерпан лимит fs.inotify.max_user_watches
+            logger.warning(f"Не удалось включить inotify ({e}), изменения отслеживаются опросом")
+            self.stop_watching()
+            return False
+        
+        # Изменения относительно последней проверки опросом, как и раньше
+        for path, (mtime, _) in self._files.items():
+            if path not in self.file_timestamps:
+                self._pending[path] = CREATED
+            elif self.file_timestamps[path] != mtime:
+                self._pending[path] = MODIFIED
+        for path in self.file_timestamps:
+            if path not in self._files:
+                self._pending[path] = DELETED
+        
+        asyncio.get_running_loop().add_reader(self._inotify.fileno(), self._on_events)
+        logger.info(f"inotify: наблюдение за {len(self._watches)} каталогами, {len(self._files)} файлов")
+        return True
+    
+    def stop_watching(self) -> None:
+        """Выключить событийный режим и вернуться к опросу"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._inotify is not None:
+            if self._inotify.fd >= 0:
+                try:
+                    asyncio.get_running_loop().remove_reader(self._inotify.fileno())
+                except RuntimeError:
+                    pass
+            self._inotify.close()
+            self._inotify = None
+            self.file_timestamps = {path: mtime for path, (mtime, _) in self._files.items()}
+        self._watches.clear()
+        self._dirty.clear()
+    
+    def _watch_directory(self, relative: str) -> None:
+        wd = self._inotify.add_watch(str(self.memory_path / relative if relative else self.memory_path), WATCH_MASK)
+        self._watches[wd] = relative
+        if relative and not os.path.basename(relative).startswith('.'):
+            self._dirs.add(relative)
+    
+    def _add_subtree(self, root: str, report: bool = True) -> None:
+        """Наблюдать за каталогом root и всеми вложенными, учесть их файлы"""
+        # Наблюдение ставится до чтения каталога, чтобы не пропустить новые файлы
+        scan = scan_tree(self.memory_path, root, on_directory=self._watch_directory)
+        for path, entry in scan.files.items():
+            self._set_file(path, entry, report)
+    
+    def _record(self, path: str, change: str) -> None:
+        """Склеить изменение с еще не показанным изменением того же файла"""
+        previous = self._pending.get(path)
+        if change == DELETED and previous == CREATED:
+            del self._pending[path]
+        elif change == CREATED and previous == DELETED:
+            self._pending[path] = MODIFIED
+        elif previous != CREATED:
+            self._pending[path] = change
+    
+    def _update_file(self, path: str) -> None:
+        """Перечитать stat файла и обновить счетчики"""
+        if os.path.basename(path).startswith('.'):
+            return
+        try:
+            st = os.lstat(self.memory_path / path)
+        except OSError:
+            self._remove_path(path)
+            return
+        if stat.S_ISREG(st.st_mode):
+            self._set_file(path, (st.st_mtime, st.st_size))
+    
+    def _set_file(self, path: str, current: Tuple[float, int], report: bool = True) -> None:
+        previous = self._files.get(path)
+        if previous == current:
+            return
+        self._files[path] = current
+        self._total_size += current[1] - (previous[1] if previous else 0)
+        if report:
+            self._record(path, MODIFIED if previous else CREATED)
+    
+    def _remove_path(self, path: str) -> None:
+        """Файл или каталог исчез: убрать его (и все вложенное) из состояния"""
+        previous = self._files.pop(path, None)
+        if previous:
+            self._total_size -= previous[1]
+            self._record(path, DELETED)
+            return
+        
+        prefix = path + os.sep
+        for file_path in [p for p in self._files if p.startswith(prefix)]:
+            self._total_size -= self._files.pop(file_path)[1]
+            self._record(file_path, DELETED)
+        self._dirs = {d for d in self._dirs if d != path and not d.startswith(prefix)}
+        for wd, directory in list(self._watches.items()):
+            if directory == path or directory.startswith(prefix):
+                # Каталог перемещен за пределы дерева — наблюдение само не снимется
+                self._inotify.rm_watch(wd)
+                del self._watches[wd]
+    
+    def _on_events(self) -> None:
+        """Прочитать события inotify и отложить их обработку (склейка)"""
+        try:
+            events = self._inotify.read_events()
+        except OSError as e:
+            logger.error(f"Ошибка чтения inotify: {e}")
+            return
+        
+        for event in events:
+            if event.mask & inotify.IN_Q_OVERFLOW:
+                # Очередь ядра переполнилась, события потеряны — нужен полный пересчет
+                self._resync_needed = True
+                continue
+            if event.mask & inotify.IN_IGNORED:
+                self._watches.pop(event.wd, None)
+                continue
+            directory = self._watches.get(event.wd)
+            if directory is None:
+                continue
+            self._dirty.add(self._join(directory, event.name) if event.name else directory)
+        
+        if not (self._dirty or self._resync_needed):
+            return
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self._flush_handle is None:
+            self._first_event_at = now
+        else:
+            self._flush_handle.cancel()
+        delay = min(self.debounce, self._first_event_at + DEBOUNCE_MAX - now)
+        self._flush_handle = loop.call_later(max(delay, 0.0), self._flush)
+    
+    def _flush(self) -> None:
+        """Обработать накопленные пути: один stat на путь, сколько бы событий ни было"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._inotify is None:
+            return
+        
+        if self._resync_needed:
+            self._resync_needed = False
+            self._dirty.clear()
+            self._resync()
+        
+        dirty, self._dirty = self._dirty, set()
+        # Родительские каталоги раньше вложенных путей
+        for path in sorted(dirty, key=lambda p: p.count(os.sep)):
+            full_path = self.memory_path / path if path else self.memory_path
+            try:
+                is_dir = stat.S_ISDIR(os.lstat(full_path).st_mode)
+            except OSError:
+                self._remove_path(path)
+                continue
+            if is_dir:
+                if path not in self._watches.values():
+                    try:
+                        self._add_subtree(path)
+                    except OSError as e:
+                        logger.warning(f"inotify: не удалось наблюдать за {path}: {e}")
+            else:
+                self._update_file(path)
+        
+        if self._pending:
+            self._changed.set()
+    
+    def _resync(self) -> None:
+        """Полный пересчет дерева после переполнения очереди событий"""
+        logger.warning("Очередь inotify переполнена, дерево памяти пересканировано")
+        previous = self._files
+        for wd in list(self._watches):
+            self._inotify.rm_watch(wd)
+        self._watches.clear()
+        self._files, self._dirs, self._total_size = {}, set(), 0
+        self._add_subtree("", report=False)
+        for path, entry in self._files.items():
+            if path not in previous:
+                self._record(path, CREATED)
+            elif previous[path] != entry:
+                self._record(path, MODIFIED)
+        for path in previous:
+            if path not in self._files:
+                self._record(path, DELETED)
     
     def get_current_time_info(self) -> Dict[str, str]:
         """Получить текущую информацию о времени"""
@@ -60,28 +347,35 @@ class WatchService:
         except (OSError, FileNotFoundError):
             return 0
     
-    def scan_memory_files(self) -> Dict[str, float]:
-        """Сканировать файлы в памяти и получить их временные метки"""
-        timestamps = {}
-        
+    def scan(self) -> TreeScan:
+        """Один обход дерева памяти: времена, размеры и счетчики"""
         if not self.memory_path.exists():
             logger.warning(f"Путь к памяти не существует: {self.memory_path}")
-            return timestamps
+            return TreeScan()
+        return scan_tree(self.memory_path)
+    
+    def scan_memory_files(self) -> Dict[str, float]:
+        """Сканировать файлы в памяти и получить их временные метки"""
+        return {path: mtime for path, (mtime, _) in self.scan().files.items()}
+    
+    def get_changed_files(self, scan: Optional[TreeScan] = None) -> List[str]:
+        """Получить список измененных файлов с последней проверки
         
-        # Сканировать все файлы в памяти
-        for file_path in self.memory_path.rglob("*"):
-            if file_path.is_file() and not file_path.name.startswith('.'):
-                relative_path = str(file_path.relative_to(self.memory_path))
-                timestamps[relative_path] = self.get_file_timestamp(file_path)
+        scan — уже сделанный обход (например, для статистики), чтобы не
+        обходить дерево второй раз.
+        """
+        if self._inotify is not None:
+            self._flush()
+            changed_files = [f"{change} {path}" for path, change in self._pending.items()]
+            self._pending.clear()
+            self._changed.clear()
+            self.last_check = datetime.now()
+            return changed_files
         
-        return timestamps
-    
-    def get_changed_files(self) -> List[str]:
-        """Получить список измененных файлов с последней проверки"""
-        current_timestamps = self.scan_memory_files()
+        files = (scan or self.scan()).files
         changed_files = []
         
-        for file_path, timestamp in current_timestamps.items():
+        for file_path, (timestamp, _) in files.items():
             if file_path not in self.file_timestamps:
                 # Новый файл
                 changed_files.append(f"➕ {file_path}")
@@ -91,43 +385,31 @@ class WatchService:
         
         # Проверить удаленные файлы
         for file_path in self.file_timestamps:
-            if file_path not in current_timestamps:
+            if file_path not in files:
                 changed_files.append(f"🗑️ {file_path}")
         
         # Обновить временные метки
-        self.file_timestamps = current_timestamps
+        self.file_timestamps = {path: mtime for path, (mtime, _) in files.items()}
         self.last_check = datetime.now()
         
         return changed_files
     
-    def get_memory_stats(self) -> Dict[str, int]:
+    def get_memory_stats(self, scan: Optional[TreeScan] = None) -> Dict[str, int]:
         """Получить статистику файлов в памяти"""
-        if not self.memory_path.exists():
-            return {"files": 0, "directories": 0, "total_size": 0}
-        
-        file_count = 0
-        dir_count = 0
-        total_size = 0
-        
-        for item in self.memory_path.rglob("*"):
-            if item.is_file() and not item.name.startswith('.'):
-                file_count += 1
-                try:
-                    total_size += item.stat().st_size
-                except OSError:
-                    pass
-            elif item.is_dir() and not item.name.startswith('.'):
-                dir_count += 1
+        if self._inotify is not None:
+            self._flush()
+            return {"files": len(self._files), "directories": len(self._dirs), "total_size": self._total_size}
         
+        scan = scan or self.scan()
         return {
-            "files": file_count,
-            "directories": dir_count,
-            "total_size": total_size
+            "files": len(scan.files),
+            "directories": scan.directories,
+            "total_size": scan.total_size
         }
     
-    def format_memory_stats(self) -> str:
+    def format_memory_stats(self, scan: Optional[TreeScan] = None) -> str:
         """Форматировать статистику памяти для отображения"""
-        stats = self.get_memory_stats()
+        stats = self.get_memory_stats(scan)
         
         # Конвертировать размер в читаемый формат
         size_mb = stats["total_size"] / (1024 * 1024)
@@ -143,8 +425,10 @@ class WatchService:
     def get_system_status(self) -> str:
         """Получить полный статус системы"""
         time_info = self.format_time_info()
-        memory_stats = self.format_memory_stats()
-        changed_files = self.get_changed_files()
+        # Статистика и изменения — из одного обхода дерева (в режиме inotify обхода нет)
+        scan = None if self._inotify is not None else self.scan()
+        memory_stats = self.format_memory_stats(scan)
+        changed_files = self.get_changed_files(scan)
         
         status = f"{time_info}\n\n{memory_stats}"
         
@@ -159,7 +443,20 @@ class WatchService:
         return status
     
     async def monitor_changes(self, interval: int = 60) -> None:
-        """Мониторинг изменений в реальном времени"""
+        """Мониторинг изменений в реальном времени (inotify, иначе опрос раз в interval секунд)"""
+        if self.start_watching():
+            logger.info("Запуск мониторинга изменений через inotify")
+            try:
+                while True:
+                    await self._changed.wait()
+                    changed_files = self.get_changed_files()
+                    if changed_files:
+                        logger.info(f"Обнаружены изменения: {len(changed_files)} файлов")
+                        for change in changed_files:
+                            logger.info(f"  {change}")
+            finally:
+                self.stop_watching()
+        
         logger.info(f"Запуск мониторинга изменений с интервалом {interval} секунд")
         
         while True:
@@ -0,0 +1,43 @@
+"""
+Утилиты чтения файлов памяти
+"""
+
+import os
+from typing import AsyncIterator, Optional
+
+import aiofiles
+
+# Размер блока при чтении файла с конца
+REVERSE_BLOCK_SIZE = 64 * 1024
+
+
+async def read_lines_reversed(path: str, block_size: int = REVERSE_BLOCK_SIZE,
+                              end: Optional[int] = None) -> AsyncIterator[bytes]:
+    """Читать строки файла с конца блоками, не загружая файл целиком
+
+    Возвращает непустые строки (bytes, без перевода строки) от последней к
+    первой; end ограничивает чтение первыми end байтами файла. Стоимость
+    пропорциональна объему прочитанного хвоста, а не размеру файла.
+    """
+    async with aiofiles.open(path, 'rb') as f:
+        if end is None:
+            await f.seek(0, os.SEEK_END)
+            position = await f.tell()
+        else:
+            position = end
+        remainder = b""
+
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            await f.seek(position)
+            lines = (await f.read(read_size) + remainder).split(b"\n")
+
+            # Первая строка блока может быть неполной — дочитаем ее со следующим блоком
+            remainder = lines[0]
+            for line in reversed(lines[1:]):
+                if line:
+                    yield line
+
+        if remainder:
+            yield remainder
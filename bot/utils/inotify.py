@@ -0,0 +1,112 @@
+"""
+Минимальная обертка над Linux inotify через ctypes (без внешних зависимостей)
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Маски событий из <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0)
+
+# struct inotify_event: wd, mask, cookie, len, затем имя длиной len (с нулями)
+EVENT_HEADER = struct.Struct("iIII")
+READ_SIZE = 64 * 1024
+
+_libc: Optional[ctypes.CDLL] = None
+
+
+@dataclass
+class InotifyEvent:
+    """Событие inotify; name пустое, если событие относится к самому каталогу"""
+    wd: int
+    mask: int
+    cookie: int
+    name: str
+
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+    global _libc
+    if _libc is None and sys.platform.startswith("linux"):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+            _libc = libc
+        except (OSError, AttributeError):
+            return None
+    return _libc
+
+
+def is_available() -> bool:
+    """Есть ли inotify на этой платформе"""
+    return _load_libc() is not None
+
+
+class Inotify:
+    """Неблокирующий дескриптор inotify: добавление наблюдений и чтение событий"""
+
+    def __init__(self):
+        self._libc = _load_libc()
+        if self._libc is None:
+            raise OSError("inotify недоступен на этой платформе")
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def add_watch(self, path: str, mask: int) -> int:
+        """Наблюдать за каталогом или файлом; для уже наблюдаемого пути вернется тот же wd"""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), path)
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self) -> List[InotifyEvent]:
+        """Прочитать все накопившиеся события (без ожидания)"""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, READ_SIZE)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                events.append(InotifyEvent(wd, mask, cookie, name))
+        return events
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
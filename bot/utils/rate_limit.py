@@ -0,0 +1,156 @@
+"""
+Общий ограничитель частоты запросов и политика повторов для внешних API
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class RetryHint:
+    """Решение классификатора: ошибку можно повторить
+
+    throttled — ответ "слишком много запросов" (429, квота): все вызовы
+    клиента ставятся на паузу. not_applied — сервер гарантированно не выполнил
+    запрос, поэтому повтор безопасен даже для неидемпотентного вызова.
+    """
+    retry_after: Optional[float] = None
+    throttled: bool = False
+    not_applied: bool = False
+
+
+@dataclass
+class RateLimitMetrics:
+    """Счетчики ограничителя"""
+    calls: int = 0
+    queued: int = 0
+    throttled: int = 0
+    retried: int = 0
+    failed: int = 0
+    wait_time: float = 0.0
+
+
+class TokenBucket:
+    """Асинхронное ведро токенов
+
+    Вызов стоимостью cost ждет, пока в ведре наберется min(cost, capacity)
+    токенов, и списывает cost (баланс может уйти в минус — так дорогие
+    batch-вызовы не блокируются навсегда). rate <= 0 отключает ограничение.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def pause(self, seconds: float) -> None:
+        """Приостановить выдачу токенов (Retry-After от сервера)"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self, cost: float = 1.0) -> Optional[float]:
+        """Дождаться токенов; вернуть время ожидания в секундах или None, если ждать не пришлось"""
+        started = time.monotonic()
+        queued = self._lock.locked()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                delay = self._paused_until - now
+                if self.rate > 0:
+                    self._refill(now)
+                    needed = min(cost, self.capacity)
+                    if self.tokens < needed:
+                        delay = max(delay, (needed - self.tokens) / self.rate)
+                if delay <= 0:
+                    break
+                queued = True
+                await asyncio.sleep(delay)
+            if self.rate > 0:
+                self.tokens -= cost
+        return time.monotonic() - started if queued else None
+
+
+class RateLimiter:
+    """Ведро токенов и повторы с экспоненциальной задержкой для одного API
+
+    Клиент передает в call() корутинную функцию запроса и классификатор
+    ошибок: классификатор возвращает RetryHint для временных ошибок и None
+    для остальных. Неидемпотентные вызовы повторяются только если сервер
+    запрос не выполнил (RetryHint.not_applied). После исчерпания попыток
+    пробрасывается исходная ошибка.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float, max_retries: int = 3,
+                 base_delay: float = 0.5, max_delay: float = 30.0):
+        self.name = name
+        self.bucket = TokenBucket(rate, capacity)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.metrics = RateLimitMetrics()
+
+    def backoff(self, attempt: int) -> float:
+        """Экспоненциальная задержка с полным джиттером"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def acquire(self, cost: float = 1.0) -> None:
+        self.metrics.calls += 1
+        waited = await self.bucket.acquire(cost)
+        if waited is not None:
+            self.metrics.queued += 1
+            self.metrics.wait_time += waited
+
+    async def call(self, func: Callable[[], Awaitable[T]],
+                   classify: Callable[[Exception], Optional[RetryHint]],
+                   idempotent: bool = True, cost: float = 1.0) -> T:
+        """Выполнить вызов с ограничением частоты и повторами"""
+        attempt = 0
+        while True:
+            await self.acquire(cost)
+            try:
+                return await func()
+            except Exception as error:
+                hint = classify(error)
+                if hint is None:
+                    raise
+
+                delay = hint.retry_after if hint.retry_after is not None else self.backoff(attempt)
+                if hint.throttled:
+                    self.metrics.throttled += 1
+                    self.bucket.pause(delay)
+
+                if attempt >= self.max_retries or not (idempotent or hint.not_applied):
+                    self.metrics.failed += 1
+                    raise
+
+                attempt += 1
+                self.metrics.retried += 1
+                logger.warning(f"{self.name}: {error}; повтор {attempt}/{self.max_retries} "
+                               f"через {delay:.1f} сек")
+                if not hint.throttled:
+                    await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, float]:
+        return asdict(self.metrics)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Разобрать заголовок Retry-After (секунды); None, если его нет или он не число"""
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None